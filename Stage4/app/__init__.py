@@ -7,3 +7,8 @@ def create_app():
     CORS(app)
     app.register_blueprint(api_bp)
     return app
+
+def create_asgi_app(offload=None):
+    # Même API sur un serveur ASGI (voir v1/asgi.py)
+    from .v1.asgi import ApiApp
+    return ApiApp(offload=offload)
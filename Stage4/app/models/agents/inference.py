@@ -0,0 +1,235 @@
+"""
+inference.py
+
+Batched policy inference shared by the PPO agents of a process.
+
+Each PPOAgent used to call model.predict() on one observation per bot turn,
+so serving many games meant paying the torch call overhead once per turn.
+A BatchInferenceServer collects the observations submitted by concurrent
+games and runs one forward pass per tick: a batch is sent as soon as it
+holds max_batch_size observations, or max_wait seconds after its first
+observation arrived. Callers get a Future; blocking callers use predict(),
+asyncio callers can await asyncio.wrap_future(server.submit(obs)).
+
+Models are loaded once per process and path (load_policy), and
+get_inference_server() returns one server per model path, so every
+PPOAgent of a worker shares the same weights and the same batches.
+"""
+
+import inspect
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import zipfile
+from concurrent.futures import Future
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_PATH = os.environ.get(
+    "UNO_PPO_MODEL", os.path.join(os.path.dirname(os.path.abspath(__file__)), "ppo", "ppo_uno"))
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_MAX_WAIT = 0.002
+# Attente maximale d'une action par un agent : une erreur plutôt qu'un tour bloqué
+DEFAULT_PREDICT_TIMEOUT = 30.0
+
+_models: Dict[str, object] = {}
+_model_locks: Dict[str, threading.Lock] = {}
+_servers: Dict[Tuple[str, int, float], "BatchInferenceServer"] = {}
+_registry_lock = threading.Lock()
+
+
+def load_model(model_path: str = DEFAULT_MODEL_PATH):
+    """
+    Load a saved model with its algorithm: MaskablePPO (sb3_contrib) for
+    models trained with train_ppo.py --masked, else PPO. Not cached.
+
+    Args:
+        model_path (str): Path given to save().
+
+    Returns:
+        PPO | MaskablePPO: The model, on CPU.
+    """
+    path = model_path if model_path.endswith(".zip") or not os.path.exists(model_path + ".zip") else model_path + ".zip"
+    with zipfile.ZipFile(path) as archive:
+        policy_class = json.loads(archive.read("data")).get("policy_class", {})
+    # Import ici : torch n'est chargé que si un agent PPO est utilisé
+    if policy_class.get("__module__", "").startswith("sb3_contrib"):
+        from sb3_contrib import MaskablePPO as algorithm
+    else:
+        from stable_baselines3 import PPO as algorithm
+    return algorithm.load(model_path, device="cpu")
+
+
+def load_policy(model_path: str = DEFAULT_MODEL_PATH):
+    """
+    Load a saved stable_baselines3 PPO model, once per process and path.
+
+    Args:
+        model_path (str): Path given to PPO.save().
+
+    Returns:
+        PPO | MaskablePPO: The shared model.
+    """
+    model = _models.get(model_path)
+    if model is not None:
+        return model
+    # Un verrou par chemin : le chargement (plusieurs secondes avec torch) ne bloque pas les autres modèles
+    with _registry_lock:
+        path_lock = _model_locks.setdefault(model_path, threading.Lock())
+    with path_lock:
+        model = _models.get(model_path)
+        if model is None:
+            model = _models[model_path] = load_model(model_path)
+            logger.info("PPO model loaded from %s", model_path)
+        return model
+
+
+class BatchInferenceServer:
+    """
+    Runs the policy on batches of observations from concurrent callers.
+
+    Args:
+        model: Object with a stable_baselines3-style predict(obs, deterministic)
+            taking a batch of Dict observations.
+        max_batch_size (int): Maximum observations per forward pass.
+        max_wait (float): Seconds to wait for more observations after the
+            first one of a batch.
+        deterministic (bool): Greedy actions instead of sampling.
+
+    Attributes:
+        masked (bool): The model takes action masks (MaskablePPO); they are
+            passed with the observations to submit().
+    """
+
+    def __init__(self, model, max_batch_size: int = DEFAULT_MAX_BATCH_SIZE, max_wait: float = DEFAULT_MAX_WAIT,
+                 deterministic: bool = True):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.deterministic = deterministic
+        self.masked = "action_masks" in inspect.signature(model.predict).parameters
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._closed = False
+        self._batches = 0
+        self._requests = 0
+        self._largest_batch = 0
+        self._thread = threading.Thread(target=self._run, name="policy-inference", daemon=True)
+        self._thread.start()
+
+    def submit(self, obs: Dict[str, np.ndarray], action_mask: Optional[np.ndarray] = None) -> Future:
+        """
+        Queue one observation.
+
+        Args:
+            obs (Dict[str, np.ndarray]): One unbatched observation.
+            action_mask (Optional[np.ndarray]): Legal actions, used if the
+                model is masked (all actions allowed if None).
+
+        Returns:
+            Future: Resolves to the action (int).
+        """
+        if self._closed:
+            raise RuntimeError("Inference server is closed")
+        future: Future = Future()
+        self._queue.put((obs, action_mask, future))
+        return future
+
+    def predict(self, obs: Dict[str, np.ndarray], timeout: Optional[float] = None,
+                action_mask: Optional[np.ndarray] = None) -> int:
+        """Submit one observation and wait for its action."""
+        return self.submit(obs, action_mask).result(timeout)
+
+    def close(self) -> None:
+        """Stop the worker thread once the queued observations are served."""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._thread.join()
+
+    def metrics(self) -> Dict[str, float]:
+        """Observations served, forward passes, mean and largest batch size."""
+        return {
+            "requests": self._requests,
+            "batches": self._batches,
+            "mean_batch_size": self._requests / self._batches if self._batches else 0.0,
+            "largest_batch": self._largest_batch,
+        }
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            try:
+                self._run_batch(batch)
+            except Exception as e:
+                # Un batch en échec ne doit ni arrêter le thread ni laisser des appelants en attente
+                logger.exception("Policy inference batch failed")
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _run_batch(self, batch) -> None:
+        try:
+            keys = batch[0][0].keys()
+            obs = {key: np.stack([np.asarray(o[key]) for o, _, _ in batch]) for key in keys}
+            kwargs = {}
+            if self.masked and any(mask is not None for _, mask, _ in batch):
+                size = next(mask for _, mask, _ in batch if mask is not None).shape[0]
+                kwargs["action_masks"] = np.stack([mask if mask is not None else np.ones(size, dtype=bool)
+                                                   for _, mask, _ in batch])
+            actions, _ = self.model.predict(obs, deterministic=self.deterministic, **kwargs)
+        except Exception as e:
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+        self._batches += 1
+        self._requests += len(batch)
+        self._largest_batch = max(self._largest_batch, len(batch))
+        for (_, _, future), action in zip(batch, np.asarray(actions).reshape(len(batch))):
+            future.set_result(int(action))
+
+
+def get_inference_server(model_path: str = DEFAULT_MODEL_PATH, max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+                         max_wait: float = DEFAULT_MAX_WAIT) -> BatchInferenceServer:
+    """
+    Shared inference server of a model path (one per process and settings).
+
+    Args:
+        model_path (str): Path given to PPO.save().
+        max_batch_size (int): Maximum observations per forward pass.
+        max_wait (float): Seconds to wait for more observations per batch.
+
+    Returns:
+        BatchInferenceServer: The server, created on first use.
+    """
+    key = (model_path, max_batch_size, max_wait)
+    server = _servers.get(key)
+    if server is None:
+        model = load_policy(model_path)
+        with _registry_lock:
+            server = _servers.get(key)
+            if server is None:
+                server = _servers[key] = BatchInferenceServer(model, max_batch_size, max_wait)
+    return server
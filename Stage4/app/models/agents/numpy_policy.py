@@ -0,0 +1,155 @@
+"""
+numpy_policy.py
+
+Torch-free inference of PPO policies trained on UnoEnv.
+
+export_policy.py (app/scripts/training) writes the actor of a saved
+stable_baselines3 PPO model to an .npz file: the observation layout of its
+features extractor, the policy MLP and the action head. NumpyPolicy runs
+the same forward pass with NumPy, so API workers can serve PPO bots without
+importing torch. Its action log-probabilities match the torch policy to
+float32 precision, and its deterministic actions are the argmax, like
+PPO.predict().
+"""
+
+import json
+import os
+import threading
+from typing import Dict, Optional
+
+import numpy as np
+
+from app.models.uno.encodings import ALL_CARDS, DRAW_ACTION
+from app.models.uno.rules import legal_action_mask as hand_action_mask
+from app.models.uno.utils import encode_observation
+
+NUM_CARDS = len(ALL_CARDS)
+POLICY_FORMAT_VERSION = 1
+DEFAULT_POLICY_PATH = os.environ.get(
+    "UNO_PPO_POLICY", os.path.join(os.path.dirname(os.path.abspath(__file__)), "ppo", "ppo_uno.npz"))
+
+ACTIVATIONS = {
+    "tanh": np.tanh,
+    "relu": lambda x: np.maximum(x, 0.0),
+    "identity": lambda x: x,
+}
+
+_policies: Dict[str, "NumpyPolicy"] = {}
+_policies_lock = threading.Lock()
+
+
+class NumpyPolicy:
+    """
+    Actor of an exported PPO policy.
+
+    Args:
+        data (Dict[str, np.ndarray]): Arrays written by export_policy.py.
+    """
+
+    def __init__(self, data):
+        meta = json.loads(str(data["meta"]))
+        if meta.get("version") != POLICY_FORMAT_VERSION:
+            raise ValueError("Unsupported policy file version")
+        # (clé, "box" | "discrete", taille), dans l'ordre du features extractor
+        self.layout = [tuple(entry) for entry in meta["layout"]]
+        self.layers = [(np.ascontiguousarray(data[f"w{i}"].T), data[f"b{i}"], ACTIVATIONS[name])
+                       for i, name in enumerate(meta["activations"])]
+        self.action_w = np.ascontiguousarray(data["action_w"].T)
+        self.action_b = data["action_b"]
+        self.num_actions = self.action_b.shape[0]
+        # Politique entraînée avec masques d'actions (MaskablePPO)
+        self.masked = bool(meta.get("masked", False))
+
+    @classmethod
+    def load(cls, path: str) -> "NumpyPolicy":
+        with np.load(path) as data:
+            return cls({key: data[key] for key in data.files})
+
+    def features(self, obs: Dict[str, np.ndarray]) -> np.ndarray:
+        """Batch of observations -> features (Box aplatis, Discrete en one-hot)."""
+        batch = np.asarray(obs[self.layout[0][0]]).shape[0]
+        parts = []
+        for key, kind, size in self.layout:
+            value = np.asarray(obs[key])
+            if kind == "discrete":
+                one_hot = np.zeros((batch, size), dtype=np.float32)
+                one_hot[np.arange(batch), value.reshape(batch).astype(np.int64)] = 1.0
+                parts.append(one_hot)
+            else:
+                parts.append(value.reshape(batch, -1).astype(np.float32, copy=False))
+        return np.concatenate(parts, axis=1)
+
+    def logits(self, obs: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Action logits for a batch of observations.
+
+        Args:
+            obs (Dict[str, np.ndarray]): Observations with a leading batch dimension.
+
+        Returns:
+            np.ndarray: (batch, num_actions) float32 logits.
+        """
+        x = self.features(obs)
+        for w, b, activation in self.layers:
+            x = activation(x @ w + b)
+        return x @ self.action_w + self.action_b
+
+    def predict(self, obs: Dict[str, np.ndarray], action_mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Greedy actions for a batch of observations, like PPO.predict(deterministic=True).
+
+        Args:
+            obs (Dict[str, np.ndarray]): Observations with a leading batch dimension.
+            action_mask (Optional[np.ndarray]): (batch, num_actions) booleans,
+                False for actions that must not be chosen.
+
+        Returns:
+            np.ndarray: (batch,) actions.
+        """
+        logits = self.logits(obs)
+        if action_mask is not None:
+            logits = np.where(action_mask, logits, -np.inf)
+        return logits.argmax(axis=1)
+
+
+def load_numpy_policy(path: str = DEFAULT_POLICY_PATH) -> NumpyPolicy:
+    """Load an exported policy, once per process and path."""
+    with _policies_lock:
+        policy = _policies.get(path)
+        if policy is None:
+            policy = _policies[path] = NumpyPolicy.load(path)
+        return policy
+
+
+def legal_action_mask(state, player_idx: int) -> np.ndarray:
+    """Actions autorisées (rules.legal_action_mask) : cartes jouables de la main, sinon piocher."""
+    return hand_action_mask(state["hands"][player_idx], state["discard_pile"][-1], state["current_color"])
+
+
+class NumpyPolicyAgent:
+    """
+    Drop-in replacement of PPOAgent running an exported policy with NumPy.
+
+    Args:
+        policy_path (str): .npz file written by export_policy.py.
+        mask_actions (Optional[bool]): Choose among the legal actions only
+            (playable cards, or draw if there is none). Defaults to True for
+            policies trained with masks (train_ppo.py --masked) and False
+            otherwise, to act exactly like PPOAgent.
+    """
+
+    def __init__(self, policy_path: str = DEFAULT_POLICY_PATH, mask_actions: Optional[bool] = None):
+        self.policy = load_numpy_policy(policy_path)
+        self.mask_actions = self.policy.masked if mask_actions is None else mask_actions
+
+    def choose_action(self, state, player_idx):
+        """
+        Selects an action for the current player.
+
+        Returns:
+            int: action (id de la carte à jouer, DRAW_ACTION = piocher)
+        """
+        obs = {key: value[None] for key, value in encode_observation(state, player_idx).items()}
+        mask = legal_action_mask(state, player_idx)[None] if self.mask_actions else None
+        action = int(self.policy.predict(obs, mask)[0])
+        return action if action < NUM_CARDS else DRAW_ACTION
@@ -1,22 +1,62 @@
+import os
+from typing import Optional
+
+from app.models.agents.inference import (DEFAULT_MAX_BATCH_SIZE, DEFAULT_MAX_WAIT, DEFAULT_MODEL_PATH,
+                                         DEFAULT_PREDICT_TIMEOUT, BatchInferenceServer, get_inference_server)
+from app.models.uno.encodings import ALL_CARDS, DRAW_ACTION
+from app.models.uno.rules import legal_action_mask
+from app.models.uno.utils import encode_observation
+
+NUM_CARDS = len(ALL_CARDS)
+
+
 class PPOAgent:
     """
-    Placeholder for a Reinforcement Learning-based agent.
-    Expects a trained policy to be loaded or defined.
+    Agent using a PPO policy trained on UnoEnv (train_ppo.py).
+
+    The model is loaded once per process and shared by every PPOAgent: its
+    observations go through the process's BatchInferenceServer, which runs
+    one forward pass for the turns of all the games waiting on it. Models
+    trained with action masks (MaskablePPO) get the legal actions of the
+    turn with the observation.
     """
 
-    def __init__(self, model_path):
+    def __init__(self, model_path: str = DEFAULT_MODEL_PATH, server: Optional[BatchInferenceServer] = None,
+                 max_batch_size: int = DEFAULT_MAX_BATCH_SIZE, max_wait: float = DEFAULT_MAX_WAIT,
+                 timeout: float = DEFAULT_PREDICT_TIMEOUT):
         """
         Args:
-            model: Trained policy or neural network (optional for now).
+            model_path (str): Path of the saved model (PPO.save()).
+            server (Optional[BatchInferenceServer]): Server to use instead of
+                the shared one of model_path.
+            max_batch_size (int): Maximum observations per forward pass.
+            max_wait (float): Seconds a batch waits for more observations.
+            timeout (float): Seconds to wait for an action before raising
+                TimeoutError.
         """
-        self.model = PPO.load(model_path)
+        self.timeout = timeout
+        self.server = server if server is not None else get_inference_server(model_path, max_batch_size, max_wait)
 
     def choose_action(self, state, player_idx):
         """
-        Selects an action based on the current observation.
+        Selects an action for the current player.
 
-        For now, raises NotImplementedError.
+        Returns:
+            int: action (id de la carte à jouer, DRAW_ACTION = piocher)
         """
-        obs = encode_state(state, player_idx)
-        action, _ = self.model.predict(obs)
-        return int(action)
+        mask = None
+        if self.server.masked:
+            mask = legal_action_mask(state["hands"][player_idx], state["discard_pile"][-1], state["current_color"])
+        action = self.server.predict(encode_observation(state, player_idx), self.timeout, action_mask=mask)
+        return action if action < NUM_CARDS else DRAW_ACTION
+
+
+def make_ppo_agent():
+    """
+    Agent of agent_type "ppo": NumpyPolicyAgent if the policy was exported
+    to NumPy (export_policy.py), which avoids importing torch, else PPOAgent.
+    """
+    from app.models.agents.numpy_policy import DEFAULT_POLICY_PATH, NumpyPolicyAgent
+    if os.path.exists(DEFAULT_POLICY_PATH):
+        return NumpyPolicyAgent(DEFAULT_POLICY_PATH)
+    return PPOAgent()
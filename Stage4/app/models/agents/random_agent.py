@@ -1,7 +1,35 @@
+import random
+from typing import Optional
+
 import numpy as np
 
+from app.models.uno.rules import PLAYABLE
+from app.models.uno.encodings import DRAW_ACTION
+
 def choose_action(env, obs):
     """
     Chooses a random action from the environment's action space.
     """
     return env.action_space.sample()
+
+class RandomAgent:
+    """
+    Joue une carte jouable au hasard, pioche s'il n'y en a aucune.
+
+    Args:
+        seed (Optional[int]): graine du RNG propre à l'agent
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        self.rng = random.Random(seed)
+
+    def choose_action(self, game_state: dict, player_idx: int) -> int:
+        """
+        Returns:
+            int: action (id de la carte à jouer, DRAW_ACTION = piocher)
+        """
+        playable_row = PLAYABLE[game_state["discard_pile"][-1]][game_state["current_color"]]
+        playable = [card for card in game_state["hands"][player_idx] if playable_row[card]]
+        if not playable:
+            return DRAW_ACTION
+        return self.rng.choice(playable)
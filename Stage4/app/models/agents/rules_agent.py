@@ -1,6 +1,6 @@
-from app.models.uno.rules import is_playable
-from app.models.uno.encodings import CARD2IDX
-from app.models.uno.utils import encode_card, TOTAL_CARDS
+from app.models.uno.hand import BitsetHand
+from app.models.uno.rules import PLAYABLE
+from app.models.uno.encodings import DRAW_ACTION
 
 class RuleBasedAgent:
     def choose_action(self, game_state: dict, player_idx: int) -> int:
@@ -11,14 +11,21 @@ class RuleBasedAgent:
             player_idx (int): index du joueur courant
 
         Returns:
-            int: action (0-107 pour jouer une carte, 108 = piocher)
+            int: action (id de la carte à jouer, DRAW_ACTION = piocher)
         """
         hand = game_state["hands"][player_idx]
         top_card = game_state["discard_pile"][-1]
         current_color = game_state.get("current_color", None)
 
+        if isinstance(hand, BitsetHand):
+            playable = hand.playable_mask(top_card, current_color)
+            if playable:
+                return (playable & -playable).bit_length() - 1
+            return DRAW_ACTION
+
+        playable_row = PLAYABLE[top_card][current_color]
         for card in hand:
-            if is_playable(card, top_card, current_color):
-                return encode_card(card)
+            if playable_row[card]:
+                return card
 
-        return TOTAL_CARDS
+        return DRAW_ACTION
@@ -0,0 +1,159 @@
+"""
+self_play_vec_env.py
+
+Stable-Baselines3 VecEnv for self-play against a pool of frozen policies.
+
+Each sub-environment is a UnoEnv game where the learner holds one seat and
+the other seats (1 to 9) are played by an opponent policy sampled from the
+pool at every new game. After the learner's actions are applied, the opponent
+turns of all the games run in a flat loop: at each pass, the games waiting
+on the same opponent policy share one batched NumPy forward pass, until
+every game is back to the learner's turn (or over). Opponent moves never
+go through UnoEnv.step, so there is no recursion and no reward or
+observation computed for them.
+"""
+
+import random
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+from stable_baselines3.common.vec_env.base_vec_env import VecEnv, VecEnvIndices
+
+from app.models.envs.uno_env import UnoEnv
+from app.models.uno.rules import legal_action_mask
+
+WIN_REWARD = 1.0
+LOSS_REWARD = -1.0
+
+
+class SelfPlayVecEnv(VecEnv):
+    """
+    Run num_envs self-play games in this process.
+
+    Args:
+        pool: Opponent pool, with sample() returning a NumpyPolicy (see
+            app/scripts/training/opponent_pool.py). Snapshots added while
+            training are used from the next game on.
+        num_envs (int): Number of games.
+        seed (int): Seed of the deals, learner seats and opponent draws.
+        max_steps (int): Learner steps after which a game is truncated.
+        bitset_hands (bool): Games use BitsetHand hands.
+        num_players (int): Players per game, the learner included.
+    """
+
+    def __init__(self, pool, num_envs: int = 8, seed: int = 0, max_steps: int = 500, bitset_hands: bool = False,
+                 num_players: int = 2):
+        self.envs = [UnoEnv(seed=seed + i, bitset_hands=bitset_hands, num_players=num_players)
+                     for i in range(num_envs)]
+        super().__init__(num_envs, self.envs[0].observation_space, self.envs[0].action_space)
+        self.pool = pool
+        self.max_steps = max_steps
+        self.rngs = [random.Random(seed + i) for i in range(num_envs)]
+        self.learners = [0] * num_envs
+        self.opponents = [None] * num_envs
+        self.steps = np.zeros(num_envs, dtype=np.int64)
+        self._actions = None
+
+    def reset(self):
+        for i, seed in enumerate(self._seeds):
+            if seed is not None:
+                self.rngs[i].seed(seed)
+        for i in range(self.num_envs):
+            self._new_game(i)
+        self._play_opponents(range(self.num_envs))
+        self._reset_seeds()
+        self._reset_options()
+        self.reset_infos = [{"action_mask": env.action_masks()} for env in self.envs]
+        return self._obs()
+
+    def step_async(self, actions: np.ndarray) -> None:
+        self._actions = actions
+
+    def step_wait(self):
+        rewards = np.zeros(self.num_envs, dtype=np.float32)
+        for i, env in enumerate(self.envs):
+            rewards[i] = env._play_action(self.learners[i], int(self._actions[i]))
+        self.steps += 1
+        self._play_opponents([i for i, env in enumerate(self.envs) if env.game.winner is None])
+
+        dones = np.zeros(self.num_envs, dtype=bool)
+        infos: List[Dict[str, Any]] = [{} for _ in range(self.num_envs)]
+        finished = []
+        for i, env in enumerate(self.envs):
+            winner = env.game.winner
+            if winner is not None:
+                rewards[i] = WIN_REWARD if winner == self.learners[i] else LOSS_REWARD
+            truncated = winner is None and self.steps[i] >= self.max_steps
+            if winner is not None or truncated:
+                dones[i] = True
+                infos[i]["TimeLimit.truncated"] = truncated
+                infos[i]["terminal_observation"] = env._get_obs_player(self.learners[i])
+                infos[i]["winner"] = winner
+                self._new_game(i)
+                finished.append(i)
+        self._play_opponents(finished)
+        for i, env in enumerate(self.envs):
+            infos[i]["action_mask"] = env.action_masks()
+        return self._obs(), rewards, dones, infos
+
+    def _new_game(self, i: int) -> None:
+        """Deal a new game to env i, with a new learner seat and a new opponent."""
+        rng = self.rngs[i]
+        env = self.envs[i]
+        env.reset(seed=rng.randrange(2 ** 31))
+        self.learners[i] = rng.randrange(env.game.num_players)
+        self.opponents[i] = self.pool.sample()
+        self.steps[i] = 0
+
+    def _play_opponents(self, indices: Sequence[int]) -> None:
+        """Play the opponent turns of games `indices` until the learner's turn or the end of the game."""
+        waiting = [i for i in indices if self._opponent_turn(i)]
+        while waiting:
+            # Une passe avant par politique adverse, pour toutes les parties qui l'attendent
+            by_policy: Dict[int, List[int]] = {}
+            for i in waiting:
+                by_policy.setdefault(id(self.opponents[i]), []).append(i)
+            for group in by_policy.values():
+                policy = self.opponents[group[0]]
+                games = [self.envs[i].game for i in group]
+                obs = [self.envs[i]._get_obs_player(game.current_player) for i, game in zip(group, games)]
+                batch = {key: np.stack([np.asarray(o[key]) for o in obs]) for key in obs[0]}
+                mask = None
+                if policy.masked:
+                    mask = np.stack([legal_action_mask(game.hands[game.current_player], game.discard_pile[-1],
+                                                       game.current_color) for game in games])
+                actions = policy.predict(batch, mask)
+                for i, game, action in zip(group, games, actions):
+                    self.envs[i]._play_action(game.current_player, int(action))
+            waiting = [i for i in waiting if self._opponent_turn(i)]
+
+    def _opponent_turn(self, i: int) -> bool:
+        game = self.envs[i].game
+        return game.winner is None and game.current_player != self.learners[i]
+
+    def _obs(self) -> Dict[str, np.ndarray]:
+        obs = [env._get_obs_player(self.learners[i]) for i, env in enumerate(self.envs)]
+        return {key: np.stack([np.asarray(o[key]) for o in obs]) for key in obs[0]}
+
+    def close(self) -> None:
+        pass
+
+    def get_attr(self, attr_name: str, indices: VecEnvIndices = None) -> List[Any]:
+        return [getattr(self.envs[i], attr_name) for i in self._get_indices(indices)]
+
+    def set_attr(self, attr_name: str, value: Any, indices: VecEnvIndices = None) -> None:
+        for i in self._get_indices(indices):
+            setattr(self.envs[i], attr_name, value)
+
+    def env_method(self, method_name: str, *method_args, indices: VecEnvIndices = None, **method_kwargs) -> List[Any]:
+        return [getattr(self.envs[i], method_name)(*method_args, **method_kwargs) for i in self._get_indices(indices)]
+
+    def env_is_wrapped(self, wrapper_class, indices: VecEnvIndices = None) -> List[bool]:
+        return [False for _ in self._get_indices(indices)]
+
+    def _get_indices(self, indices: VecEnvIndices) -> Sequence[int]:
+        if indices is None:
+            return range(self.num_envs)
+        if isinstance(indices, int):
+            return [indices]
+        return indices
@@ -0,0 +1,122 @@
+"""
+shared_memory_vec_env.py
+
+Stable-Baselines3 VecEnv backed by Gymnasium's AsyncVectorEnv with shared
+memory.
+
+Workers write their observations straight into a shared buffer instead of
+pickling them through a pipe as SubprocVecEnv does.
+"""
+
+from typing import Any, Callable, List, Optional, Sequence
+
+import gymnasium as gym
+import numpy as np
+from gymnasium.error import AlreadyPendingCallError
+from gymnasium.vector import AsyncVectorEnv, AutoresetMode
+from gymnasium.vector.async_vector_env import AsyncState
+from stable_baselines3.common.vec_env.base_vec_env import VecEnv, VecEnvIndices
+
+
+class SharedMemoryVecEnv(VecEnv):
+    """
+    Run one environment per process, exchanging observations through shared memory.
+
+    Args:
+        env_fns (List[Callable[[], gym.Env]]): Environment constructors, one per worker.
+        context (Optional[str]): multiprocessing start method (default: platform default).
+    """
+
+    def __init__(self, env_fns: List[Callable[[], gym.Env]], context: Optional[str] = None):
+        self.venv = AsyncVectorEnv(
+            env_fns,
+            shared_memory=True,
+            context=context,
+            autoreset_mode=AutoresetMode.SAME_STEP,
+        )
+        super().__init__(len(env_fns), self.venv.single_observation_space, self.venv.single_action_space)
+        self._actions = None
+
+    def reset(self):
+        seeds = None if all(s is None for s in self._seeds) else self._seeds
+        options = self._options[0] if self._options[0] else None
+        obs, infos = self.venv.reset(seed=seeds, options=options)
+        self.reset_infos = self._split_infos(infos)
+        self._reset_seeds()
+        self._reset_options()
+        return obs
+
+    def step_async(self, actions: np.ndarray) -> None:
+        self._actions = actions
+
+    def step_wait(self):
+        obs, rewards, terminated, truncated, infos = self.venv.step(self._actions)
+        dones = terminated | truncated
+        final_obs = infos.pop("final_obs", None)
+        infos.pop("_final_obs", None)
+        infos.pop("final_info", None)
+        infos.pop("_final_info", None)
+        buf_infos = self._split_infos(infos)
+        for i in range(self.num_envs):
+            buf_infos[i]["TimeLimit.truncated"] = bool(truncated[i] and not terminated[i])
+            if dones[i] and final_obs is not None:
+                buf_infos[i]["terminal_observation"] = final_obs[i]
+        return obs, rewards.astype(np.float32), dones, buf_infos
+
+    def _split_infos(self, infos: dict) -> List[dict]:
+        # Gymnasium batches infos as {key: array, "_key": mask}; SB3 wants one dict per env
+        out: List[dict] = [{} for _ in range(self.num_envs)]
+        for key, values in infos.items():
+            if key.startswith("_"):
+                continue
+            mask = infos.get(f"_{key}", np.ones(self.num_envs, dtype=bool))
+            for i in np.flatnonzero(mask):
+                out[i][key] = values[i]
+        return out
+
+    def close(self) -> None:
+        self.venv.close()
+
+    def get_attr(self, attr_name: str, indices: VecEnvIndices = None) -> List[Any]:
+        return self._call_workers("_call", (attr_name, (), {}), indices)
+
+    def set_attr(self, attr_name: str, value: Any, indices: VecEnvIndices = None) -> None:
+        self._call_workers("_setattr", (attr_name, value), indices)
+
+    def env_method(self, method_name: str, *method_args, indices: VecEnvIndices = None, **method_kwargs) -> List[Any]:
+        return self._call_workers("_call", (method_name, method_args, method_kwargs), indices)
+
+    def _call_workers(self, command: str, data: Any, indices: VecEnvIndices) -> List[Any]:
+        """
+        Send one command of Gymnasium's worker protocol to the workers `indices` only.
+
+        AsyncVectorEnv.call and set_attr always address every worker; the
+        other workers are left alone here.
+        """
+        venv = self.venv
+        venv._assert_is_running()
+        if venv._state != AsyncState.DEFAULT:
+            raise AlreadyPendingCallError(
+                f"Calling `{command}` while waiting for a pending call to `{venv._state.value}` to complete.",
+                str(venv._state.value),
+            )
+        indices = self._get_indices(indices)
+        for i in indices:
+            venv.parent_pipes[i].send((command, data))
+        results = []
+        successes = [True] * self.num_envs
+        for i in indices:
+            result, successes[i] = venv.parent_pipes[i].recv()
+            results.append(result)
+        venv._raise_if_errors(successes)
+        return results
+
+    def env_is_wrapped(self, wrapper_class, indices: VecEnvIndices = None) -> List[bool]:
+        return [False for _ in self._get_indices(indices)]
+
+    def _get_indices(self, indices: VecEnvIndices) -> Sequence[int]:
+        if indices is None:
+            return range(self.num_envs)
+        if isinstance(indices, int):
+            return [indices]
+        return indices
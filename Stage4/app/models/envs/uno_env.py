@@ -6,32 +6,64 @@ UNO Gymnasium Environment
 This module implements a custom Gymnasium environment for the UNO card game.
 """
 
+import logging
+import random
+
 import numpy as np
 import gymnasium as gym
 from gymnasium import spaces
-from gymnasium.utils import seeding
 from typing import Optional, Tuple, Dict
 
 from app.models.uno.constants import COLORS
-from app.models.uno.deck import create_deck
 
-from app.models.uno.encodings import CARD2IDX, ALL_CARDS
+from app.models.uno.encodings import ALL_CARDS, COLOR2IDX, DRAW_ACTION, card_to_str
 from app.models.uno.game import Game
-from app.models.uno.rules import is_playable
-from app.models.uno.utils import encode_hand, encode_state, decode_card, normalize_top_card
+from app.models.uno.rules import PLAYABLE, legal_action_mask
+from app.models.uno.utils import MAX_OPPONENT_CARDS, encode_hand, encode_state, state_vector_size
 
 NUM_CARDS = len(ALL_CARDS)
 MAX_HAND_SIZE = 20
-TOTAL_CARDS = NUM_CARDS
+
+logger = logging.getLogger(__name__)
 
 
 class UnoEnv(gym.Env):
+    """
+    UNO with 2 to 10 players, from the point of view of the player to act.
+    The other players are played by opponent_agent_fn(env, state) -> action
+    if it is given, else they pass. Their turns run in a flat loop inside
+    step() until it is the learner's turn again or the game is over.
+
+    The observation is the learner's hand, the top card and the number of
+    cards of the next player (the one the learner's card affects), so
+    policies trained with 2 players take N-player observations as is.
+
+    Actions are card ids (play that card) or DRAW_ACTION (draw). Only a few
+    are legal at each step: action_masks(), also returned as
+    info["action_mask"] by reset() and step(), gives them for
+    sb3_contrib's MaskablePPO (train_ppo.py --masked).
+    """
+
     metadata = {"render_modes": ["human"]}
 
-    def __init__(self, seed: Optional[int] = None, opponent_agent_fn=None, verbose: bool = False):
+    def __init__(self, seed: Optional[int] = None, opponent_agent_fn=None, verbose: bool = False,
+                 bitset_hands: bool = False, copy_obs: bool = True, num_players: int = 2):
         super().__init__()
+        if not 2 <= num_players <= 10:
+            raise ValueError("num_players must be between 2 and 10")
         self._seed = seed
-        self.rng = np.random.default_rng(seed)
+        self.num_players = num_players
+        self.bitset_hands = bitset_hands
+        # copy_obs=False : l'observation "hand" est écrite dans un tampon préalloué réutilisé
+        # à chaque pas (sans allocation). À n'utiliser que si l'appelant copie l'observation,
+        # comme les VecEnv de SB3 et Gymnasium. L'observation de fin d'épisode est toujours
+        # une copie : les workers qui font l'autoreset (SubprocVecEnv, AsyncVectorEnv) la
+        # gardent comme terminal_observation / final_obs avant d'appeler reset().
+        self.copy_obs = copy_obs
+        self._hand_buf = np.zeros(NUM_CARDS, dtype=np.float32)
+        self._state_buf = np.zeros(state_vector_size(num_players), dtype=np.float32)
+        # RNG propre à l'environnement, partagé avec son Game
+        self.rng = random.Random(seed)
         self.verbose = verbose
         self.done = False
 
@@ -40,24 +72,31 @@ class UnoEnv(gym.Env):
         self.observation_space = spaces.Dict({
             "hand": spaces.Box(low=0.0, high=np.inf, shape=(len(ALL_CARDS),), dtype=np.float32),
             "top_card": spaces.Discrete(len(ALL_CARDS)),
-            "opponent_card_count": spaces.Discrete(100),
+            "opponent_card_count": spaces.Discrete(MAX_OPPONENT_CARDS + 1),
         })
 
         self.game = None
         self.opponent_agent_fn = opponent_agent_fn
 
     def reset(self, seed: Optional[int] = None, options: Optional[Dict] = None):
+        super().reset(seed=seed)
         self.done = False
-        self._seed = seed or self._seed
-        self.np_random, _ = seeding.np_random(self._seed)
+        # Le seed du constructeur n'initialise le RNG qu'une fois : sans seed explicite,
+        # chaque reset continue le flux du RNG et distribue une nouvelle donne
+        if seed is not None:
+            self._seed = seed
 
-        self.game = Game(num_players=2, seed=self._seed)
-        print(f"[DEBUG] Initialisation du Game avec agent_type = {self.game.agent_type}")
-        print(f"[DEBUG] Agents utilisés : {self.game.agents}")
+        if self.game is None:
+            self.game = Game(num_players=self.num_players, seed=self._seed, bitset_hands=self.bitset_hands, rng=self.rng)
+            if self.verbose:
+                logger.info("Game created with agent_type=%s, agents=%s", self.game.agent_type, self.game.agents)
+        else:
+            # Fast reset : réutilise le deck, les mains et la défausse du Game existant
+            self.game.reset(seed)
         self.game.start()
 
         obs = self._get_obs_player(self.game.current_player)
-        return obs, {}
+        return obs, {"action_mask": self.action_masks()}
 
     def step(self, action: int) -> Tuple[np.ndarray, float, bool, bool, Dict]:
         if self.done:
@@ -65,46 +104,70 @@ class UnoEnv(gym.Env):
             reward = [-1000.0] * len(self.game.agents)
             if winner is not None:
                 reward[winner] = 1.0
-            obs = encode_state(self.game.get_state(), self.game.current_player)
-            return obs, reward, self.done, False, {}
+            obs = self._get_obs()
+            return obs, reward, self.done, False, {"action_mask": self.action_masks()}
 
-        reward = 0.0
         player = self.game.current_player
+        reward = self._play_action(player, action)
+
+        # Vérifie si la partie est terminée
+        if self.game.winner is not None:
+            self.done = True
+            if self.verbose:
+                logger.info("Player %s wins!", self.game.get_winner())
+        truncated = False
+
+        # Tours des adversaires, à plat sur le Game (sans récompense ni observation)
+        game = self.game
+        while game.winner is None and game.current_player != player:
+            if self.opponent_agent_fn is not None:
+                self._play_action(game.current_player, self.opponent_agent_fn(self, game.get_state()))
+            else:
+                game.advance_turn()
+        self.done = done = game.winner is not None
+
+        obs = self._get_obs_player(player, copy=done)
+        return obs, reward, done, truncated, {"action_mask": self.action_masks()}
+
+    def _play_action(self, player: int, action: int) -> float:
+        """
+        Apply one action of the current player to the game: play the card if
+        it is in hand and playable, else draw one card and pass.
+
+        Returns:
+            float: Reward of the action for that player.
+        """
+        reward = 0.0
         hand = self.game.hands[player]
         top_card = self.game.discard_pile[-1]
         current_color = self.game.current_color
 
-        # Liste des cartes jouables
-        playable_cards = [
-            (i, card) for i, card in enumerate(hand)
-            if is_playable(card, top_card, current_color)
-        ]
-        has_playable = len(playable_cards) > 0
+        # Cartes jouables (ligne de la table précalculée)
+        playable_row = PLAYABLE[top_card][current_color]
+        if self.bitset_hands:
+            has_playable = hand.playable_mask(top_card, current_color) != 0
+        else:
+            has_playable = any(playable_row[card] for card in hand)
 
-        if action == TOTAL_CARDS:
+        if action == DRAW_ACTION:
             reward = -2.0 if has_playable else -0.1
             self.game.draw_cards(player, 1)
             self.game.advance_turn()
-        elif 0 <= action < TOTAL_CARDS:
-            try:
-                card_to_play = decode_card(action)
-                if self.verbose:
-                    print(f"[RuleBased] tries to play: {card_to_play} | top: {top_card} | color: {current_color}")
-            except Exception:
-                card_to_play = None
+        elif 0 <= action < NUM_CARDS:
+            card_to_play = int(action)
+            if self.verbose:
+                logger.info("Player %d tries to play: %s | top: %s | color: %s", player,
+                            card_to_str(card_to_play), card_to_str(top_card), COLORS[current_color])
 
             found = False
-            for idx, card in enumerate(hand):
-                if card_to_play and card == card_to_play and is_playable(card, top_card, current_color):
-                    try:
-                        result = self.game.play_turn(human_input=idx)
-                        reward = 1.0 if result else 0.5
-                        found = True
-                        break
-                    except Exception as e:
-                        if self.verbose:
-                            print(f"[Play failed] {e}")
-                        continue
+            if playable_row[card_to_play] and card_to_play in hand:
+                try:
+                    result = self.game.play_turn(human_input=hand.index(card_to_play))
+                    reward = 1.0 if result is not None else 0.5
+                    found = True
+                except Exception as e:
+                    if self.verbose:
+                        logger.info("Play failed: %s", e)
 
             if not found:
                 reward = -2.0 if has_playable else -1.0
@@ -114,60 +177,41 @@ class UnoEnv(gym.Env):
             reward = -2.0
             self.game.draw_cards(player, 1)
             self.game.advance_turn()
+        return reward
 
-        # Vérifie si la partie est terminée
-        state = self.game.get_state()
-        if state.get("winner") is not None or any(len(h) == 0 for h in self.game.hands):
-            self.done = True
-            if self.verbose:
-                print(f"[🏁] Player {self.game.get_winner()} wins!")
-        done = self.done
-        truncated = False
-
-        while not done and self.game.current_player != player:
-            if self.opponent_agent_fn is not None:
-                opponent = self.game.current_player
-                state = self.game.get_state()
-                action = self.opponent_agent_fn(self, state)
-                self.step(action)
-                self.done = self.game.get_winner() is not None
-                done = self.done
-            else:
-                self.game.advance_turn()
-                self.done = self.game.get_winner() is not None
-                done = self.done
+    def action_masks(self) -> np.ndarray:
+        """
+        Legal actions of the player to act (rules.legal_action_mask).
 
-        obs = self._get_obs_player(player)
-        return obs, reward, done, truncated, {}
+        Returns:
+            np.ndarray: Booleans of length NUM_CARDS + 1; only draw once the
+            game is over.
+        """
+        if self.game.winner is not None:
+            mask = np.zeros(NUM_CARDS + 1, dtype=bool)
+            mask[DRAW_ACTION] = True
+            return mask
+        return legal_action_mask(self.game.hands[self.game.current_player], self.game.discard_pile[-1],
+                                 self.game.current_color)
 
     def _get_obs(self) -> Dict:
-        return encode_state(self.game.get_state(), self.game.current_player)
+        out = None if self.copy_obs else self._state_buf
+        return encode_state(self.game.get_state(), self.game.current_player, out=out)
 
-    def _get_obs_player(self, player: int) -> Dict:
+    def _get_obs_player(self, player: int, copy: bool = False) -> Dict:
         player_hand = self.game.hands[player]
-        top_card = self.game.discard_pile[-1]
-        normalized_top_card = normalize_top_card(top_card)
-
-        try:
-            top_card_idx = CARD2IDX[normalized_top_card]
-        except KeyError:
-            raise ValueError(f"Top card '{normalized_top_card}' not found in CARD2IDX")
+        out = None if self.copy_obs or copy else self._hand_buf
 
+        next_player = (player + self.game.direction) % self.game.num_players
         return {
-            "hand": encode_hand(player_hand),
-            "top_card": top_card_idx,
-            "opponent_card_count": len(self.game.hands[1 - player])
+            "hand": encode_hand(player_hand, out=out),
+            "top_card": self.game.discard_pile[-1],
+            "opponent_card_count": min(len(self.game.hands[next_player]), MAX_OPPONENT_CARDS)
         }
 
     def render(self):
         self.game.print_board()
 
-    def set_current_color(self, color: str):
-        if color in COLORS:
-            self.current_color = color
-            return True
-        return False
-
     def set_current_color(self, color: str) -> bool:
         """
         Change the current color of the game (e.g., after playing a Wild card).
@@ -175,7 +219,7 @@ class UnoEnv(gym.Env):
         """
         if hasattr(self.game, "set_current_color"):
             return self.game.set_current_color(color)
-        if color in ["Red", "Yellow", "Blue", "Green"]:
-            self.game.current_color = color
+        if color in COLOR2IDX:
+            self.game.current_color = COLOR2IDX[color]
             return True
         return False
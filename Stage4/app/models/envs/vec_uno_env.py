@@ -0,0 +1,107 @@
+"""
+vec_uno_env.py
+
+Batched UNO Gymnasium VectorEnv
+
+Runs N UNO games in lockstep on top of the NumPy engine in
+app/models/uno/batch.py. Each sub-environment has the same observation and
+action spaces as UnoEnv; the learning agent is player 0 and the other
+players use the vectorized rule-based policy (lowest playable card).
+"""
+
+from typing import Any, Dict, Optional
+
+import numpy as np
+from gymnasium import spaces
+from gymnasium.vector import AutoresetMode, VectorEnv
+from gymnasium.vector.utils import batch_space
+
+from app.models.uno.batch import BatchedGames, DRAW_ACTION
+from app.models.uno.encodings import NUM_CARD_TYPES
+
+AGENT = 0
+
+
+class VecUnoEnv(VectorEnv):
+    """
+    Vectorized UnoEnv.
+
+    Rewards follow UnoEnv: 0.5 for a legal card (1.0 if it wins the game),
+    -0.1 for drawing without a playable card, -2.0 for drawing or playing
+    an illegal card while holding a playable one, -1.0 for an illegal card
+    otherwise. An opponent winning adds -1.0. Episodes are truncated after
+    `max_steps` agent steps. Sub-environments autoreset on the next step.
+    """
+
+    metadata = {"autoreset_mode": AutoresetMode.NEXT_STEP}
+
+    def __init__(self, num_envs: int = 8, num_players: int = 2, seed: Optional[int] = None, max_steps: int = 500):
+        self.num_envs = num_envs
+        self.num_players = num_players
+        self.max_steps = max_steps
+        self.engine = BatchedGames(num_envs, num_players=num_players, seed=seed)
+
+        self.single_action_space = spaces.Discrete(NUM_CARD_TYPES + 1)
+        self.single_observation_space = spaces.Dict({
+            "hand": spaces.Box(low=0.0, high=np.inf, shape=(NUM_CARD_TYPES,), dtype=np.float32),
+            "top_card": spaces.Discrete(NUM_CARD_TYPES),
+            "opponent_card_count": spaces.Discrete(100),
+        })
+        self.action_space = batch_space(self.single_action_space, num_envs)
+        self.observation_space = batch_space(self.single_observation_space, num_envs)
+
+        self._steps = np.zeros(num_envs, dtype=np.int64)
+        self._autoreset = np.zeros(num_envs, dtype=bool)
+
+    def reset(self, *, seed: Optional[int] = None, options: Optional[Dict[str, Any]] = None):
+        super().reset(seed=seed)
+        if seed is not None:
+            self.engine.rng = np.random.default_rng(seed)
+        self.engine.reset()
+        self._steps[:] = 0
+        self._autoreset[:] = False
+        return self._get_obs(), {}
+
+    def step(self, actions):
+        engine = self.engine
+        actions = np.asarray(actions, dtype=np.int64)
+        rewards = np.zeros(self.num_envs, dtype=np.float32)
+        terminated = np.zeros(self.num_envs, dtype=bool)
+        truncated = np.zeros(self.num_envs, dtype=bool)
+
+        resetting = np.flatnonzero(self._autoreset)
+        if resetting.size:
+            engine.reset(resetting)
+            self._steps[resetting] = 0
+
+        g = np.flatnonzero(~self._autoreset)
+        if g.size:
+            played, had_playable = engine.apply_actions(g, actions[g])
+            won = engine.winner[g] == AGENT
+            drew = actions[g] == DRAW_ACTION
+            rewards[g] = np.where(
+                played,
+                np.where(won, 1.0, 0.5),
+                np.where(had_playable, -2.0, np.where(drew, -0.1, -1.0)),
+            )
+
+            engine.play_until(g, AGENT)
+            lost = engine.winner[g] > AGENT
+            rewards[g[lost]] -= 1.0
+
+            self._steps[g] += 1
+            terminated[g] = engine.winner[g] >= 0
+            truncated[g] = ~terminated[g] & (self._steps[g] >= self.max_steps)
+
+        self._autoreset = terminated | truncated
+        return self._get_obs(), rewards, terminated, truncated, {}
+
+    def _get_obs(self) -> Dict[str, np.ndarray]:
+        engine = self.engine
+        rows = np.arange(self.num_envs)
+        opponent = (AGENT + engine.direction) % self.num_players
+        return {
+            "hand": engine.hands[:, AGENT].astype(np.float32),
+            "top_card": engine.top_card.copy(),
+            "opponent_card_count": np.minimum(engine.hand_sizes[rows, opponent], 99),
+        }
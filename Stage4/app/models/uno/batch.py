@@ -0,0 +1,269 @@
+"""
+batch.py
+
+Vectorized UNO engine running N games in lockstep on NumPy arrays.
+
+Each game is a row of the state arrays: hands are card-count matrices,
+decks are arrays of card ids with a read position, and the discard pile
+is kept as card counts plus the top card (only the counts are needed to
+reshuffle it). Play, draw, skip, reverse and +2/+4 effects are applied to
+a whole set of games with array operations.
+
+Rules follow the standard game: +2 and Wild +4 make the next player draw
+and lose their turn, Skip skips the next player, Reverse flips the
+direction (and acts as a Skip with two players). Effects are resolved as
+soon as the card is played. A Wild as first card only sets a random color.
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .constants import CARDS_PER_PLAYER, COLORS
+from .deck import FULL_DECK
+from .encodings import (
+    CARD_COLOR, CARD_RANK, CARDS_PER_COLOR, DRAW_ACTION, NO_COLOR, NUM_CARD_TYPES,
+    RANK_DRAW_TWO, RANK_REVERSE, RANK_SKIP, WILD, WILD_DRAW_FOUR
+)
+from .rules import PLAYABLE_MASK, PLAYABLE_TABLE
+
+DECK_SIZE: int = len(FULL_DECK)
+
+_FULL_DECK = np.array(FULL_DECK, dtype=np.int8)
+_CARD_COLOR = np.array(CARD_COLOR, dtype=np.int64)
+_CARD_RANK = np.array(CARD_RANK, dtype=np.int64)
+_CARD_IDS = np.arange(NUM_CARD_TYPES)
+# Cards the next player must draw after each card is played
+_CARD_DRAWS = np.where(_CARD_RANK == RANK_DRAW_TWO, 2, np.where(_CARD_IDS == WILD_DRAW_FOUR, 4, 0))
+_CARD_REVERSES = _CARD_RANK == RANK_REVERSE
+# Playable row per state: _PLAYABLE_BY_STATE[top_card, color] -> (NUM_CARD_TYPES,) bool
+_PLAYABLE_BY_STATE = np.ascontiguousarray(PLAYABLE_TABLE.transpose(1, 2, 0))
+# The same rows as uint64 bitmasks (54 card types fit in one word)
+_PLAYABLE_BITS = np.array(PLAYABLE_MASK, dtype=np.uint64)
+_CARD_BIT = np.array([1 << card for card in range(NUM_CARD_TYPES)], dtype=np.uint64)
+_ONE = np.uint64(1)
+
+
+def _lowest_card(bits: np.ndarray) -> np.ndarray:
+    """Card id of the lowest set bit of each mask, -1 for an empty mask."""
+    low = bits & (~bits + _ONE)
+    return np.frexp(low.astype(np.float64))[1] - 1
+
+
+class BatchedGames:
+    """
+    N independent UNO games stepped together.
+
+    Methods take an int array `games` of (unique) game indices so that
+    any subset of the batch can be advanced at once.
+
+    Attributes:
+        hands (np.ndarray): (N, P, NUM_CARD_TYPES) int8 card counts.
+        hand_bits (np.ndarray): (N, P) uint64 mask of the card types held.
+        hand_sizes (np.ndarray): (N, P) number of cards per player.
+        deck (np.ndarray): (N, 108) card ids, drawn from deck_pos up to deck_size.
+        discard (np.ndarray): (N, NUM_CARD_TYPES) card counts of the discard pile.
+        top_card, current_color, current_player, direction (np.ndarray): (N,) vectors.
+        winner (np.ndarray): (N,) index of the winner, -1 while the game runs.
+    """
+
+    def __init__(self, num_games: int, num_players: int = 2, seed: Optional[int] = None):
+        n, p = num_games, num_players
+        self.num_games = n
+        self.num_players = p
+        self.rng = np.random.default_rng(seed)
+
+        self.hands = np.zeros((n, p, NUM_CARD_TYPES), dtype=np.int8)
+        self.hand_bits = np.zeros((n, p), dtype=np.uint64)
+        self.hand_sizes = np.zeros((n, p), dtype=np.int64)
+        self.deck = np.zeros((n, DECK_SIZE), dtype=np.int8)
+        self.deck_pos = np.zeros(n, dtype=np.int64)
+        self.deck_size = np.zeros(n, dtype=np.int64)
+        self.discard = np.zeros((n, NUM_CARD_TYPES), dtype=np.int8)
+        self.top_card = np.zeros(n, dtype=np.int64)
+        self.current_color = np.zeros(n, dtype=np.int64)
+        self.current_player = np.zeros(n, dtype=np.int64)
+        self.direction = np.ones(n, dtype=np.int64)
+        self.winner = np.full(n, -1, dtype=np.int64)
+        self.turn = np.zeros(n, dtype=np.int64)
+
+        # Flat views for single-index gathers/scatters on (game, player[, card])
+        self._hands_flat = self.hands.reshape(-1)
+        self._bits_flat = self.hand_bits.reshape(-1)
+        self._sizes_flat = self.hand_sizes.reshape(-1)
+        # Seats to advance after each card: 2 when the next player is skipped
+        skips = (_CARD_RANK == RANK_SKIP) | (_CARD_DRAWS > 0) | (_CARD_REVERSES & (p == 2))
+        self._card_steps = np.where(skips, 2, 1)
+
+    def reset(self, games: Optional[np.ndarray] = None) -> None:
+        """
+        Shuffle, deal and turn the first card for the given games (all by default).
+        """
+        g = np.arange(self.num_games) if games is None else np.asarray(games)
+        k, p = len(g), self.num_players
+        if k == 0:
+            return
+
+        decks = self.rng.permuted(np.broadcast_to(_FULL_DECK, (k, DECK_SIZE)), axis=1)
+        self.deck[g] = decks
+
+        # Card counts via one bincount over (game, player, card) cells
+        dealt = decks[:, :p * CARDS_PER_PLAYER].astype(np.int64).reshape(k * p, CARDS_PER_PLAYER)
+        cells = dealt + (np.arange(k * p) * NUM_CARD_TYPES)[:, None]
+        hands = np.bincount(cells.ravel(), minlength=k * p * NUM_CARD_TYPES).reshape(k, p, NUM_CARD_TYPES)
+        self.hands[g] = hands
+        self.hand_bits[g] = ((hands > 0) * _CARD_BIT).sum(axis=2, dtype=np.uint64)
+        self.hand_sizes[g] = CARDS_PER_PLAYER
+
+        first = decks[:, p * CARDS_PER_PLAYER].astype(np.int64)
+        self.deck_pos[g] = p * CARDS_PER_PLAYER + 1
+        self.deck_size[g] = DECK_SIZE
+        self.discard[g] = 0
+        self.discard[g, first] = 1
+        self.top_card[g] = first
+        color = _CARD_COLOR[first]
+        self.current_color[g] = np.where(color == NO_COLOR, self.rng.integers(len(COLORS), size=k), color)
+        self.current_player[g] = 0
+        self.direction[g] = 1
+        self.winner[g] = -1
+        self.turn[g] = 0
+
+    def playable_mask(self, games: np.ndarray, players: np.ndarray) -> np.ndarray:
+        """(len(games), NUM_CARD_TYPES) bool mask of the cards each player can play."""
+        allowed = _PLAYABLE_BY_STATE[self.top_card[games], self.current_color[games]]
+        return (self.hands[games, players] > 0) & allowed
+
+    def playable_bits(self, games: np.ndarray, players: np.ndarray) -> np.ndarray:
+        """Same as playable_mask, as one uint64 bitmask per game."""
+        return self.hand_bits[games, players] & _PLAYABLE_BITS[self.top_card[games], self.current_color[games]]
+
+    def draw(self, games: np.ndarray, players: np.ndarray, counts=1) -> None:
+        """
+        Draw `counts` cards (an int, or one count per game) for players[i]
+        in games[i], reshuffling the discard pile into the deck of games
+        that run out.
+        """
+        if np.ndim(counts) == 0:
+            for _ in range(int(counts)):
+                self._draw_one(games, players)
+            return
+        remaining = np.asarray(counts, dtype=np.int64).copy()
+        for _ in range(int(remaining.max(initial=0))):
+            need = remaining > 0
+            remaining -= 1
+            self._draw_one(games[need], players[need])
+
+    def _draw_one(self, games: np.ndarray, players: np.ndarray) -> None:
+        empty = self.deck_pos[games] >= self.deck_size[games]
+        if empty.any():
+            self._reshuffle(games[empty])
+            ok = self.deck_pos[games] < self.deck_size[games]
+            games, players = games[ok], players[ok]
+
+        cards = self.deck[games, self.deck_pos[games]]
+        self.deck_pos[games] += 1
+        seat = games * self.num_players + players
+        self._hands_flat[seat * NUM_CARD_TYPES + cards] += 1
+        self._bits_flat[seat] |= _CARD_BIT[cards]
+        self._sizes_flat[seat] += 1
+
+    def _reshuffle(self, games: np.ndarray) -> None:
+        # Rare (a few times per long game), so done game by game
+        for g in games:
+            pile = self.discard[g].astype(np.int64)
+            pile[self.top_card[g]] -= 1
+            cards = np.repeat(_CARD_IDS, pile).astype(np.int8)
+            self.rng.shuffle(cards)
+            self.deck[g, :len(cards)] = cards
+            self.deck_pos[g] = 0
+            self.deck_size[g] = len(cards)
+            self.discard[g] = 0
+            self.discard[g, self.top_card[g]] = 1
+
+    def _advance(self, games: np.ndarray, steps) -> None:
+        self.current_player[games] = (
+            self.current_player[games] + self.direction[games] * steps
+        ) % self.num_players
+        self.turn[games] += 1
+
+    def apply_actions(self, games: np.ndarray, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Apply one action for the current player of each game.
+
+        An action is a card id to play or DRAW_ACTION. A card that is not in
+        hand or not playable counts as a draw. Drawing takes one card and
+        passes the turn.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: `played` (the card was legal and
+            played) and `had_playable` (the player had a playable card).
+        """
+        games = np.asarray(games)
+        actions = np.asarray(actions, dtype=np.int64)
+        players = self.current_player[games]
+        playable = self.playable_bits(games, players)
+        had_playable = playable != 0
+        cards = np.minimum(actions, NUM_CARD_TYPES - 1)
+        played = (actions < NUM_CARD_TYPES) & ((playable & _CARD_BIT[cards]) != 0)
+
+        drawing = ~played
+        if drawing.any():
+            g = games[drawing]
+            self.draw(g, players[drawing])
+            self._advance(g, 1)
+        if played.any():
+            self._play(games[played], players[played], cards[played])
+        return played, had_playable
+
+    def _play(self, games: np.ndarray, players: np.ndarray, cards: np.ndarray) -> None:
+        p = self.num_players
+        seat = games * p + players
+        cell = seat * NUM_CARD_TYPES + cards
+        self._hands_flat[cell] -= 1
+        emptied = self._hands_flat[cell] == 0
+        self._bits_flat[seat[emptied]] &= ~_CARD_BIT[cards[emptied]]
+        self._sizes_flat[seat] -= 1
+        self.discard[games, cards] += 1
+        self.top_card[games] = cards
+
+        # Wilds: the player picks the color they hold the most of (random if none)
+        color = _CARD_COLOR[cards]
+        wild = color == NO_COLOR
+        if wild.any():
+            held = self.hands[games[wild], players[wild], :WILD].reshape(-1, len(COLORS), CARDS_PER_COLOR).sum(axis=2)
+            chosen = held.argmax(axis=1)
+            none_held = held.max(axis=1) == 0
+            chosen[none_held] = self.rng.integers(len(COLORS), size=int(none_held.sum()))
+            color = color.copy()
+            color[wild] = chosen
+        self.current_color[games] = color
+
+        won = self._sizes_flat[seat] == 0
+        if won.any():
+            self.winner[games[won]] = players[won]
+
+        if p > 2:
+            self.direction[games[_CARD_REVERSES[cards]]] *= -1
+        draw_count = _CARD_DRAWS[cards]
+        victims = (draw_count > 0) & ~won
+        if victims.any():
+            g = games[victims]
+            nxt = (players[victims] + self.direction[g]) % p
+            self.draw(g, nxt, draw_count[victims])
+        self._advance(games, self._card_steps[cards])
+
+    def rule_based_actions(self, games: np.ndarray) -> np.ndarray:
+        """Lowest-id playable card for the current player of each game, else DRAW_ACTION."""
+        card = _lowest_card(self.playable_bits(games, self.current_player[games]))
+        return np.where(card >= 0, card, DRAW_ACTION)
+
+    def play_until(self, games: np.ndarray, player: int) -> None:
+        """
+        Let the rule-based policy play for every other player until it is
+        `player`'s turn again or the game is over.
+        """
+        g = np.asarray(games)
+        g = g[(self.winner[g] < 0) & (self.current_player[g] != player)]
+        while g.size:
+            self.apply_actions(g, self.rule_based_actions(g))
+            g = g[(self.winner[g] < 0) & (self.current_player[g] != player)]
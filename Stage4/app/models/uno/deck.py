@@ -6,6 +6,7 @@ for the UNO game.
 
 Functions:
 - create_deck: Generates a shuffled deck of cards.
+- refill_deck: Refills an existing deck in place with a shuffled deck.
 - reshuffle_discard_pile: Reshuffles the discard pile into the deck when
   the deck is empty.
 """
@@ -13,45 +14,72 @@ Functions:
 import random
 import time
 from typing import List, Optional
-from .constants import COLORS, VALUES, SPECIAL_CARDS, WILD_CARDS
+from .constants import COLORS
+from .encodings import CARDS_PER_COLOR, WILD, WILD_DRAW_FOUR
 
+# Card ids of a full 108-card deck, in the historical build order (per color:
+# one 0, two of each 1-9 and special, then the wilds) so that seeded shuffles
+# deal the same games as before.
+FULL_DECK: List[int] = []
+for _color in range(len(COLORS)):
+    FULL_DECK.append(_color * CARDS_PER_COLOR)
+    for _rank in range(1, CARDS_PER_COLOR):
+        FULL_DECK.extend([_color * CARDS_PER_COLOR + _rank] * 2)
+FULL_DECK.extend([WILD] * 4)
+FULL_DECK.extend([WILD_DRAW_FOUR] * 4)
 
-def create_deck(seed: Optional[int] = None) -> List[str]:
+
+def create_deck(seed: Optional[int] = None, rng: Optional[random.Random] = None) -> List[int]:
     """
     Generates a shuffled deck of UNO cards.
 
     Args:
         seed (Optional[int]): Seed for random number generator.
             If None, uses current time.
+        rng (Optional[random.Random]): Generator to shuffle with. It is
+            reseeded with `seed` when one is given. If None, a private
+            generator is created, so the global random module is untouched.
 
     Returns:
-        List[str]: A list representing the shuffled deck of cards.
+        List[int]: A list of card ids representing the shuffled deck.
     """
-    deck = []
-    for color in COLORS:
-        deck.append(f"{color} 0")
-        for value in VALUES:
-            deck.extend([f"{color} {value}"] * 2)
-        for special in SPECIAL_CARDS:
-            deck.extend([f"{color} {special}"] * 2)
-    for card in WILD_CARDS:
-        deck.extend([card] * 4)
-
-        if seed is not None:
-            random.seed(seed)
-        else:
-            random.seed()
-
-    random.shuffle(deck)
+    deck: List[int] = []
+    refill_deck(deck, seed, rng)
     return deck
 
-def reshuffle_discard_pile(deck: List[str], discard_pile: List[str]) -> None:
+def refill_deck(deck: List[int], seed: Optional[int] = None, rng: Optional[random.Random] = None) -> None:
+    """
+    Refills an existing deck list in place with a full shuffled deck, so a
+    new game can reuse the buffer of the previous one.
+
+    Args:
+        deck (List[int]): The deck to refill (its content is replaced).
+        seed (Optional[int]): Seed for random number generator.
+            If None, uses current time (or continues `rng` as is).
+        rng (Optional[random.Random]): Generator to shuffle with. It is
+            reseeded with `seed` when one is given. If None, a private
+            generator is created.
+
+    Returns:
+        None
+    """
+    deck[:] = FULL_DECK
+    if rng is None:
+        rng = random.Random(seed)
+    elif seed is not None:
+        rng.seed(seed)
+
+    rng.shuffle(deck)
+
+def reshuffle_discard_pile(deck: List[int], discard_pile: List[int], rng: Optional[random.Random] = None) -> None:
     """
     Reshuffles the discard pile into the deck when the deck is empty.
 
     Args:
-        deck (List[str]): The current deck of cards.
-        discard_pile (List[str]): The current discard pile.
+        deck (List[int]): The current deck of cards.
+        discard_pile (List[int]): The current discard pile.
+        rng (Optional[random.Random]): Generator to shuffle with (the game's
+            own RNG). If None, falls back to the global random module.
 
     Returns:
         None
@@ -60,7 +88,7 @@ def reshuffle_discard_pile(deck: List[str], discard_pile: List[str]) -> None:
         return
 
     top_card = discard_pile.pop()
-    random.shuffle(discard_pile)
+    (rng or random).shuffle(discard_pile)
     deck.extend(discard_pile)
     discard_pile.clear()
     discard_pile.append(top_card)
@@ -1,3 +1,5 @@
+from typing import List, Tuple
+
 from .constants import COLORS, VALUES, SPECIAL_CARDS, WILD_CARDS
 
 ALL_CARDS = []
@@ -11,3 +13,70 @@ ALL_CARDS.extend(WILD_CARDS)
 
 CARD2IDX = {card: idx for idx, card in enumerate(ALL_CARDS)}
 IDX2CARD = {idx: card for card, idx in CARD2IDX.items()}
+
+# Compact card ids
+#
+# The engine handles cards as small ints indexing ALL_CARDS. A colored card
+# is `color * CARDS_PER_COLOR + rank` and the two wild cards come last, so
+# color and rank are plain table lookups. Strings only exist at the API and
+# display edges (see card_to_str / str_to_card).
+NUM_CARD_TYPES: int = len(ALL_CARDS)
+CARDS_PER_COLOR: int = 1 + len(VALUES) + len(SPECIAL_CARDS)
+
+# Action ids of agents and environments: a card id plays that card, and the
+# id right after the last card type draws.
+DRAW_ACTION: int = NUM_CARD_TYPES
+
+WILD: int = CARD2IDX["Wild"]
+WILD_DRAW_FOUR: int = CARD2IDX["Wild +4"]
+
+RANK_DRAW_TWO: int = 1 + len(VALUES) + SPECIAL_CARDS.index("+2")
+RANK_REVERSE: int = 1 + len(VALUES) + SPECIAL_CARDS.index("Reverse")
+RANK_SKIP: int = 1 + len(VALUES) + SPECIAL_CARDS.index("Skip")
+
+NO_COLOR: int = -1
+COLOR2IDX = {color: idx for idx, color in enumerate(COLORS)}
+
+# Wild cards have no color and a rank of their own (their id), so they never
+# match a colored card by rank.
+CARD_COLOR: Tuple[int, ...] = tuple(
+    i // CARDS_PER_COLOR if i < WILD else NO_COLOR for i in range(NUM_CARD_TYPES)
+)
+CARD_RANK: Tuple[int, ...] = tuple(
+    i % CARDS_PER_COLOR if i < WILD else i for i in range(NUM_CARD_TYPES)
+)
+CARD_POINTS: Tuple[int, ...] = tuple(
+    50 if i >= WILD else (20 if CARD_RANK[i] > len(VALUES) else CARD_RANK[i])
+    for i in range(NUM_CARD_TYPES)
+)
+
+
+def card_to_str(card: int) -> str:
+    """Convert a card id to its display name, e.g. 14 -> 'Green 1'."""
+    return ALL_CARDS[card]
+
+
+def cards_to_str(cards: List[int]) -> List[str]:
+    """Convert a list of card ids to display names."""
+    return [ALL_CARDS[card] for card in cards]
+
+
+def str_to_card(card: str) -> int:
+    """
+    Convert a card name to its id. Colored wilds such as 'Red Wild +4' map to
+    the plain wild card.
+
+    Raises:
+        KeyError: If the name is not a valid card.
+    """
+    parts = card.split()
+    if len(parts) > 1 and parts[0] in COLOR2IDX and parts[1] == "Wild":
+        card = " ".join(parts[1:])
+    if card not in CARD2IDX:
+        raise KeyError(f"Card '{card}' not in CARD2IDX")
+    return CARD2IDX[card]
+
+
+def color_to_str(color):
+    """Convert a color index to its name (None stays None)."""
+    return None if color is None else COLORS[color]
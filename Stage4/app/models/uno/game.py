@@ -1,93 +1,316 @@
 from typing import List, Optional
+from array import array
 import random
+import struct
 import time
 import logging
 
 from app.models.uno.constants import (
     COLORS, VALUES, SPECIAL_CARDS, WILD_CARDS, CARDS_PER_PLAYER
 )
-from app.models.uno.deck import create_deck, reshuffle_discard_pile
-from app.models.uno.rules import is_playable, calculate_score
+from app.models.uno.deck import refill_deck, reshuffle_discard_pile
+from app.models.uno.encodings import (
+    CARD_COLOR, CARD_RANK, COLOR2IDX, NO_COLOR, WILD_DRAW_FOUR,
+    RANK_SKIP, RANK_REVERSE, NUM_CARD_TYPES
+)
+from app.models.uno.hand import BitsetHand
+from app.models.uno.rules import PLAYABLE, calculate_score
+from app.models.uno.state import GameState
 
 from app.models.agents.rules_agent import RuleBasedAgent
-# from app.models.agents.random_agent import RandomAgent
-# from app.models.agents.ppo_agent import PPOAgent
+from app.models.agents.random_agent import RandomAgent
+from app.models.agents.ppo_agent import make_ppo_agent
+
+# Format binaire de Game.snapshot() (little-endian) :
+# en-tête fixe, taille de chaque main (uint8), puis les ids des cartes en uint8
+# (pioche, défausse, mains : 108 octets au total), puis l'état optionnel du RNG.
+SNAPSHOT_MAGIC = b"UNO"
+SNAPSHOT_VERSION = 2
+_SNAPSHOT_HEADER = struct.Struct("<3sBBBBBbbBBIIbBBB")
+_RNG_STATE_WORDS = 625
+_RNG_TAIL = struct.Struct("<Bd")
+AGENT_TYPES = ("rulesbased", "random", "ppo")
+_FLAG_BITSET, _FLAG_SKIP_NEXT, _FLAG_SKIP_CURRENT, _FLAG_EVENTS, _FLAG_AWAITING_COLOR = 1, 2, 4, 8, 16
+
+# Journal des événements (record_events=True) : tuples (turn, player, type, value)
+# play : value = id de la carte jouée ; draw : tuple des ids piochés ;
+# color : index de la couleur choisie (player = None si choisie via set_current_color)
+EVENT_PLAY = "play"
+EVENT_DRAW = "draw"
+EVENT_COLOR = "color"
 
 class Game:
-    def __init__(self, num_players: int = 2, seed: Optional[int] = None, agent_type: str = "rulesbased", agents=None):
+    def __init__(self, num_players: int = 2, seed: Optional[int] = None, agent_type: str = "rulesbased", agents=None,
+                 bitset_hands: bool = False, rng: Optional[random.Random] = None, record_events: bool = False):
         self.num_players = num_players
-        self.seed = seed
+        # record_events: garde le journal des coups (self.events) pour les réponses delta de l'API
+        self.events: Optional[List[tuple]] = [] if record_events else None
+        # RNG propre à la partie (mélanges et choix de couleur), jamais le module random global
+        self.rng = rng if rng is not None else random.Random()
         self.agent_type = agent_type
-        self.deck = create_deck(seed)
-        self.hands: List[List[str]] = [[] for _ in range(num_players)]
-        self.discard_pile: List[str] = []
+        # bitset_hands: mains stockées en BitsetHand (comptes + masque) au lieu de listes
+        self.bitset_hands = bitset_hands
+        self.deck: List[int] = []
+        self.hands: List[List[int]] = [self._new_hand() for _ in range(num_players)]
+        self.discard_pile: List[int] = []
+        self.reset(seed)
+
+        self.agents = agents if agents is not None else self._default_agents(num_players, agent_type)
+
+    @staticmethod
+    def _default_agents(num_players: int, agent_type: str) -> list:
+        # Joueur 0 = humain (None), les autres selon agent_type
+        agents = [None]  # Joueur 0 (humain)
+        for _ in range(1, num_players):
+            if agent_type == "random":
+                agents.append(RandomAgent())
+            elif agent_type == "ppo":
+                # Politique NumPy exportée si disponible, sinon modèle SB3 partagé
+                agents.append(make_ppo_agent())
+            else:
+                agents.append(RuleBasedAgent())
+        return agents
+
+    def _new_hand(self, cards=()):
+        return BitsetHand(cards) if self.bitset_hands else list(cards)
+
+    @classmethod
+    def _blank(cls, num_players: int, agent_type: str, bitset_hands: bool, agents, rng: random.Random) -> "Game":
+        # Partie vide sans mélange du deck, à remplir par restore()
+        game = cls.__new__(cls)
+        game.num_players = num_players
+        game.rng = rng
+        game.agent_type = agent_type
+        game.bitset_hands = bitset_hands
+        game.deck = []
+        game.hands = [game._new_hand() for _ in range(num_players)]
+        game.discard_pile = []
+        game.events = None
+        game.seed = None
+        game.agents = agents
+        game._state = None
+        return game
+
+    def snapshot(self, include_rng: bool = False) -> bytes:
+        """
+        Serializes the game to a compact fixed-layout bytes object.
+
+        The layout is a fixed header (players, agent type, flags, current
+        player, direction, color, pending draws, passes, turn, winner and
+        pile sizes), one size byte per hand, then every card id as a uint8:
+        deck, discard pile, then each hand. Agents and the event log are not
+        included (a restored game records events again from its turn on).
+
+        Args:
+            include_rng (bool): Append the game RNG state (2.5 kB) so that a
+                restored game draws and chooses colors exactly like this one.
+
+        Returns:
+            bytes: The snapshot.
+        """
+        flags = ((_FLAG_BITSET if self.bitset_hands else 0)
+                 | (_FLAG_SKIP_NEXT if self.skip_next else 0)
+                 | (_FLAG_SKIP_CURRENT if self.skip_current_player else 0)
+                 | (_FLAG_EVENTS if self.events is not None else 0)
+                 | (_FLAG_AWAITING_COLOR if self.awaiting_color else 0))
+        header = _SNAPSHOT_HEADER.pack(
+            SNAPSHOT_MAGIC, SNAPSHOT_VERSION, self.num_players, AGENT_TYPES.index(self.agent_type), flags,
+            self.current_player, self.direction,
+            NO_COLOR if self.current_color is None else self.current_color,
+            self.draw_two_next, self.draw_four_next, self.consecutive_passes, self.turn,
+            -1 if self.winner is None else self.winner,
+            len(self.deck), len(self.discard_pile), include_rng,
+        )
+        parts = [header, bytes(self.hand_sizes), bytes(self.deck), bytes(self.discard_pile)]
+        parts.extend(bytes(hand) for hand in self.hands)
+        if include_rng:
+            _, mt, gauss_next = self.rng.getstate()
+            parts.append(array("I", mt).tobytes())
+            parts.append(_RNG_TAIL.pack(gauss_next is not None, gauss_next or 0.0))
+        return b"".join(parts)
+
+    def restore(self, data: bytes) -> None:
+        """
+        Puts the game in the state of a snapshot, reusing the existing deck,
+        hands and discard pile buffers. The snapshot must have the same
+        number of players and hand type. Agents are kept.
+
+        Args:
+            data (bytes): A snapshot from Game.snapshot().
+        """
+        (magic, version, num_players, agent_code, flags, current_player, direction, current_color,
+         draw_two_next, draw_four_next, consecutive_passes, turn, winner, deck_size, discard_size,
+         has_rng) = _SNAPSHOT_HEADER.unpack_from(data)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError("Not a Game snapshot")
+        if num_players != self.num_players or bool(flags & _FLAG_BITSET) != self.bitset_hands:
+            raise ValueError("Snapshot does not match this game's players or hand type")
+
+        pos = _SNAPSHOT_HEADER.size
+        sizes = data[pos:pos + num_players]
+        pos += num_players
+        self.deck[:] = data[pos:pos + deck_size]
+        pos += deck_size
+        self.discard_pile[:] = data[pos:pos + discard_size]
+        pos += discard_size
+        for hand, size in zip(self.hands, sizes):
+            if self.bitset_hands:
+                hand.clear()
+                hand.extend(data[pos:pos + size])
+            else:
+                hand[:] = data[pos:pos + size]
+            pos += size
+        if has_rng:
+            mt = array("I")
+            mt.frombytes(data[pos:pos + _RNG_STATE_WORDS * mt.itemsize])
+            pos += _RNG_STATE_WORDS * mt.itemsize
+            has_gauss, gauss = _RNG_TAIL.unpack_from(data, pos)
+            self.rng.setstate((3, tuple(mt), gauss if has_gauss else None))
+
+        self.agent_type = AGENT_TYPES[agent_code]
+        self.hand_sizes = list(sizes)
+        self.current_player = current_player
+        self.direction = direction
+        self.current_color = None if current_color == NO_COLOR else current_color
+        self.draw_two_next = draw_two_next
+        self.draw_four_next = draw_four_next
+        self.skip_next = bool(flags & _FLAG_SKIP_NEXT)
+        self.skip_current_player = bool(flags & _FLAG_SKIP_CURRENT)
+        self.awaiting_color = bool(flags & _FLAG_AWAITING_COLOR)
+        self.consecutive_passes = consecutive_passes
+        self.turn = turn
+        self.winner = None if winner < 0 else winner
+        self.events = [] if flags & _FLAG_EVENTS else None
+        self.events_start_turn = turn
+        self._state = None
+
+    @classmethod
+    def from_snapshot(cls, data: bytes, agents=None) -> "Game":
+        """
+        Builds a new game from a snapshot.
+
+        Args:
+            data (bytes): A snapshot from Game.snapshot().
+            agents (Optional[list]): Agents of the new game. If None, they are
+                created from the snapshot's agent type as in __init__.
+
+        Returns:
+            Game: The restored game.
+        """
+        num_players, agent_code, flags = struct.unpack_from("<BBB", data, 4)
+        agent_type = AGENT_TYPES[agent_code]
+        if agents is None:
+            agents = cls._default_agents(num_players, agent_type)
+        game = cls._blank(num_players, agent_type, bool(flags & _FLAG_BITSET), agents, random.Random())
+        game.restore(data)
+        return game
+
+    def clone(self, rng: Optional[random.Random] = None) -> "Game":
+        """
+        Returns an independent copy of the game (snapshot + restore). Agents
+        are shared with this game.
+
+        Args:
+            rng (Optional[random.Random]): RNG of the copy. If None, the copy
+                gets its own copy of this game's RNG state and will play out
+                exactly like this game. Passing an RNG skips that copy, which
+                is most of the cost of a clone (useful for search rollouts).
+
+        Returns:
+            Game: The copy.
+        """
+        if rng is None:
+            rng = random.Random.__new__(random.Random)
+            rng.setstate(self.rng.getstate())
+        game = Game._blank(self.num_players, self.agent_type, self.bitset_hands, self.agents, rng)
+        game.restore(self.snapshot())
+        game.seed = self.seed
+        return game
+
+    def reset(self, seed: Optional[int] = None) -> None:
+        """
+        Puts the game back to its initial state for a new round, reusing the
+        existing deck, hands and discard pile buffers (refilled in place) and
+        keeping the agents. Call start() afterwards to deal.
+
+        Args:
+            seed (Optional[int]): Seed for the game RNG. If None, the RNG
+                keeps its current stream.
+        """
+        self.seed = seed
+        refill_deck(self.deck, seed, self.rng)
+        for hand in self.hands:
+            hand.clear()
+        self.discard_pile.clear()
         self.current_player = 0
         self.direction = 1
         self.draw_two_next = 0
         self.draw_four_next = 0
         self.skip_next = False
         self.skip_current_player = False
+        # Wild joué par un humain : la couleur attend /choose_color
+        self.awaiting_color = False
         self.consecutive_passes = 0
         self.turn = 0
-        self.current_color = None
-        
-        if agents is not None:
-            self.agents = agents
-        else:
-            # Joueur 0 = humain (None), les autres selon agent_type
-            self.agents = [None]  # Joueur 0 (humain)
-            for _ in range(1, num_players):
-                if agent_type == "random":
-                    self.agents.append(RandomAgent())
-                # elif agent_type == "ppo":
-                #     self.agents.append(PPOAgent())
-                else:
-                    self.agents.append(RuleBasedAgent())
+        self.current_color: Optional[int] = None
+        # Suivis incrémentalement à chaque mouvement de cartes (pas de scan des mains)
+        self.hand_sizes: List[int] = [0] * self.num_players
+        self.winner: Optional[int] = None
+        self._state: Optional[GameState] = None
+        # Premier tour couvert par le journal des événements
+        self.events_start_turn = 0
+        if self.events is not None:
+            self.events.clear()
 
     def start(self):
-        for i in range(self.num_players):
-            self.hands[i] = [self.deck.pop() for _ in range(CARDS_PER_PLAYER)]
+        deck = self.deck
+        for hand in self.hands:
+            for _ in range(CARDS_PER_PLAYER):
+                hand.append(deck.pop())
+        self.hand_sizes = [len(hand) for hand in self.hands]
+        self._state = None
         first_card = self.deck.pop()
         self.discard_pile.append(first_card)
 
-        if first_card.startswith("Wild"):
-            self.current_color = random.choice(COLORS)
-            if "+4" in first_card:
+        if CARD_COLOR[first_card] == NO_COLOR:
+            self.current_color = self.rng.randrange(len(COLORS))
+            if self.events is not None:
+                self.events.append((self.turn, None, EVENT_COLOR, self.current_color))
+            if first_card == WILD_DRAW_FOUR:
                 self.draw_four_next = 1
         else:
-            self.current_color = first_card.split()[0]  # Couleur du premier card
+            self.current_color = CARD_COLOR[first_card]  # Couleur du premier card
 
     def handle_first_card(self):
         """
         Handles the first card in the discard pile if it is a special card.
         """
-        if self.discard_pile[-1].startswith("Wild"):
-            new_color = random.choice(COLORS)
-            if "+4" in self.discard_pile[-1]:
-                self.discard_pile[-1] = f"{new_color} Wild +4"
+        if CARD_COLOR[self.discard_pile[-1]] == NO_COLOR:
+            self._state = None
+            self.current_color = self.rng.randrange(len(COLORS))
+            if self.discard_pile[-1] == WILD_DRAW_FOUR:
                 self.draw_four_next = 1
-            else:
-                self.discard_pile[-1] = f"{new_color} Wild"
 
-    def get_state(self) -> dict:
+    def get_state(self) -> GameState:
         """
         Returns the current state of the game.
 
+        The view is built once per state change and the same object is
+        returned until the game moves again. Cards are int ids and the color
+        is an index into COLORS; use app.v1.serializers.serialize_state to get
+        the display form.
+
         Returns:
-            dict: Current game state with information about players, deck, discard pile, hands, current player, direction, and turn.
-        """
-        return {
-            "num_players": self.num_players,
-            "deck_size": len(self.deck),
-            "discard_pile": self.discard_pile,
-            "hands": self.hands,
-            "current_player": self.current_player,
-            "current_color": self.current_color,
-            "direction": self.direction,
-            "turn": self.turn,
-            "cards_left": [len(h) for h in self.hands],
-            "winner": self.get_winner(),
-        }
+            GameState: Read-only mapping with the number of players, deck size, discard pile, hands, current player, color, direction, turn, cards left and winner.
+        """
+        state = self._state
+        if state is None:
+            state = self._state = GameState(
+                self.num_players, len(self.deck), self.discard_pile, self.hands,
+                self.current_player, self.current_color, self.direction, self.turn,
+                tuple(self.hand_sizes), self.winner,
+            )
+        return state
 
     def draw_cards(self, player_idx: int, count: int) -> int:
         """
@@ -98,12 +321,22 @@ class Game:
             count (int): Number of cards to draw.
         """
         drawn = 0
+        hand = self.hands[player_idx]
+        cards = [] if self.events is not None else None
         for _ in range(count):
             if not self.deck:
-                reshuffle_discard_pile(self.deck, self.discard_pile)
+                reshuffle_discard_pile(self.deck, self.discard_pile, self.rng)
             if self.deck:
-                self.hands[player_idx].append(self.deck.pop())
+                card = self.deck.pop()
+                hand.append(card)
                 drawn += 1
+                if cards is not None:
+                    cards.append(card)
+        if drawn:
+            self.hand_sizes[player_idx] += drawn
+            self._state = None
+            if cards is not None:
+                self.events.append((self.turn, player_idx, EVENT_DRAW, tuple(cards)))
         return drawn
 
     def play_turn(self, human_input: Optional[int] = None) -> Optional[int]:
@@ -141,8 +374,14 @@ class Game:
             return None
 
         # Liste des cartes jouables (index et cartes)
-        playable = [(i, card) for i, card in enumerate(hand) if is_playable(card, top_card, self.current_color)]
-        logging.debug(f"[DEBUG] Playable cards for player {player}: {[c for _, c in playable]}")
+        playable_row = PLAYABLE[top_card][self.current_color]
+        if self.bitset_hands:
+            # Un seul AND sur le masque de la main
+            playable = hand.playable_mask(top_card, self.current_color)
+            logging.debug("[DEBUG] Playable card mask for player %d: %#x", player, playable)
+        else:
+            playable = [i for i, card in enumerate(hand) if playable_row[card]]
+            logging.debug("[DEBUG] Playable card indices for player %d: %s", player, playable)
 
         # Cas : le joueur peut jouer une carte
         if playable:
@@ -150,8 +389,8 @@ class Game:
                 # Vérifie que l'index est dans la main
                 if not isinstance(human_input, int) or human_input < 0 or human_input >= len(hand):
                     raise ValueError("Card index out of bounds.")
-                card_str = hand[human_input]
-                if (human_input, card_str) not in playable:
+                chosen_card = hand[human_input]
+                if not playable_row[chosen_card]:
                     raise ValueError("Card is not playable.")
                 chosen_idx = human_input
                 is_human = True
@@ -159,41 +398,60 @@ class Game:
                 # Agent IA ou auto : choisit la première carte jouable
                 if self.agents and self.agents[player]:
                     agent = self.agents[player]
-                    idx = agent.choose_action(self.get_state(), player)
-                    if idx is None or idx < 0 or idx >= len(hand) or (idx, hand[idx]) not in playable:
+                    # Les agents renvoient l'id de la carte à jouer (DRAW_ACTION ou plus = piocher)
+                    card = agent.choose_action(self.get_state(), player)
+                    if card is None or not 0 <= card < NUM_CARD_TYPES or not playable_row[card] or card not in hand:
                         self.draw_cards(player, 1)
                         self.advance_turn()
                         return None
-                    chosen_idx = idx
+                    chosen_card = int(card)
+                    chosen_idx = None if self.bitset_hands else hand.index(chosen_card)
                     is_human = False
                 else:
-                    chosen_idx = playable[0][0]
+                    if self.bitset_hands:
+                        chosen_idx = None
+                        chosen_card = (playable & -playable).bit_length() - 1
+                    else:
+                        chosen_idx = playable[0]
+                        chosen_card = hand[chosen_idx]
                     is_human = False
 
-            # Joue la carte
-            chosen_card = hand[chosen_idx]
-            del hand[chosen_idx]
+            # Joue la carte (une BitsetHand retire par carte, une liste par index pour garder l'ordre)
+            if self.bitset_hands:
+                hand.remove(chosen_card)
+            else:
+                del hand[chosen_idx]
             self.discard_pile.append(chosen_card)
+            self._state = None
+            if self.events is not None:
+                self.events.append((self.turn, player, EVENT_PLAY, chosen_card))
+            self.hand_sizes[player] -= 1
+            if not self.hand_sizes[player]:
+                self.winner = player
 
             # Effets spéciaux
-            if "Skip" in chosen_card:
+            rank = CARD_RANK[chosen_card]
+            if rank == RANK_SKIP:
                 self.skip_next = True
-            elif "Reverse" in chosen_card:
+            elif rank == RANK_REVERSE:
                 self.direction *= -1 if self.num_players > 2 else 1
                 if self.num_players == 2:
                     self.skip_next = True
-            elif "Wild +4" in chosen_card or "Wild" in chosen_card:
+            elif CARD_COLOR[chosen_card] == NO_COLOR:
                 if not is_human:
                     # Si IA : choisis une couleur automatiquement
-                    from app.models.uno.constants import COLORS
-                    colors_in_hand = [card.split()[0] for card in self.hands[player] if card.split()[0] in COLORS]
+                    colors_in_hand = [CARD_COLOR[card] for card in self.hands[player] if CARD_COLOR[card] != NO_COLOR]
                     if colors_in_hand:
-                        self.current_color = random.choice(colors_in_hand)
+                        self.current_color = self.rng.choice(colors_in_hand)
                     else:
-                        self.current_color = random.choice(COLORS)
-                # Si humain : NE CHANGE PAS current_color ici, attend l'appel à /choose_color
+                        self.current_color = self.rng.randrange(len(COLORS))
+                    if self.events is not None:
+                        self.events.append((self.turn, player, EVENT_COLOR, self.current_color))
+                else:
+                    # Si humain : NE CHANGE PAS current_color ici, attend l'appel à /choose_color
+                    self.awaiting_color = True
             else:
-                self.current_color = chosen_card.split()[0]
+                self.current_color = CARD_COLOR[chosen_card]
 
         else:
             # Aucune carte jouable : pioche automatiquement
@@ -201,15 +459,39 @@ class Game:
             self.consecutive_passes += 1
 
         # Vérifie la victoire
-        if not self.hands[player]:
+        if self.winner == player:
             return player
 
         self.advance_turn()
         return None
 
+    def auto_play(self, max_turns: int = 1000) -> int:
+        """
+        Plays turns until a human decision is needed: it is the turn of a
+        player without an agent (unless that turn is only a pending skip or
+        draw penalty), a human Wild awaits its color, the game is over, or
+        `max_turns` turns were played.
+
+        Args:
+            max_turns (int): Maximum number of play_turn calls.
+
+        Returns:
+            int: Number of turns played.
+        """
+        played = 0
+        while played < max_turns and self.winner is None and not self.awaiting_color:
+            if not (self.agents and self.agents[self.current_player]):
+                pending = self.draw_four_next or self.draw_two_next or self.skip_next or self.skip_current_player
+                if not pending:
+                    break
+            self.play_turn()
+            played += 1
+        return played
+
     def advance_turn(self):
         self.current_player = (self.current_player + self.direction) % self.num_players
         self.turn += 1
+        self._state = None
 
     def calculate_scores(self) -> List[int]:
         """
@@ -221,14 +503,36 @@ class Game:
         scores = [calculate_score(self.hands, winner_idx=i) for i in range(self.num_players)]
         return scores
 
+    def events_since(self, turn: int) -> Optional[List[tuple]]:
+        """
+        Returns the logged events from `turn` on (the events of that turn
+        included), oldest first.
+
+        Args:
+            turn (int): First turn to include.
+
+        Returns:
+            Optional[List[tuple]]: (turn, player, type, value) tuples, or None
+            if events are not recorded or the log does not reach back to `turn`.
+        """
+        if self.events is None or turn < self.events_start_turn:
+            return None
+        events = self.events
+        # Journal trié par tour : recherche du premier événement >= turn depuis la fin
+        i = len(events)
+        while i and events[i - 1][0] >= turn:
+            i -= 1
+        return events[i:]
+
     def get_winner(self) -> Optional[int]:
-        for i, hand in enumerate(self.hands):
-            if len(hand) == 0:
-                return i
-        return None
+        return self.winner
 
     def set_current_color(self, color: str):
-        if color in COLORS:
-            self.current_color = color
+        if color in COLOR2IDX:
+            self.current_color = COLOR2IDX[color]
+            self.awaiting_color = False
+            self._state = None
+            if self.events is not None:
+                self.events.append((self.turn, None, EVENT_COLOR, self.current_color))
             return True
         return False
@@ -0,0 +1,173 @@
+"""
+hand.py
+
+Compact hand representation for the UNO engine.
+
+BitsetHand stores a hand as per-card-type counts plus an int bitmask of the
+card types present, so adding or removing a card is O(1) and the playable
+cards for a (top card, color) state come from a single AND against
+rules.PLAYABLE_MASK.
+"""
+
+from typing import Iterable, Iterator, List
+
+import numpy as np
+
+from .encodings import NUM_CARD_TYPES
+from .rules import PLAYABLE_MASK
+
+_EMPTY_COUNTS = bytes(NUM_CARD_TYPES)
+_CARD_BYTES = [bytes((card,)) for card in range(NUM_CARD_TYPES)]
+
+
+class BitsetHand:
+    """
+    Hand of card ids backed by a count array and a bitmask.
+
+    It behaves like a list of card ids sorted by id: len(), iteration,
+    indexing, `del hand[i]`, append() and remove() all work, so Game and the
+    agents can use it in place of a plain list. Hand indices therefore refer
+    to the sorted order, not the order in which cards were drawn.
+    """
+
+    __slots__ = ("counts", "mask", "size", "_view")
+
+    def __init__(self, cards: Iterable[int] = ()):
+        self.counts = bytearray(NUM_CARD_TYPES)
+        self._view = np.frombuffer(self.counts, dtype=np.uint8)
+        self.mask = 0
+        self.size = 0
+        for card in cards:
+            self.append(card)
+
+    def append(self, card: int) -> None:
+        self.counts[card] += 1
+        self.mask |= 1 << card
+        self.size += 1
+
+    def extend(self, cards: Iterable[int]) -> None:
+        counts = self.counts
+        mask = self.mask
+        n = 0
+        for card in cards:
+            counts[card] += 1
+            mask |= 1 << card
+            n += 1
+        self.mask = mask
+        self.size += n
+
+    def remove(self, card: int) -> None:
+        n = self.counts[card]
+        if not n:
+            raise ValueError(f"Card {card} not in hand")
+        self.counts[card] = n - 1
+        if n == 1:
+            self.mask &= ~(1 << card)
+        self.size -= 1
+
+    def clear(self) -> None:
+        self.counts[:] = _EMPTY_COUNTS
+        self.mask = 0
+        self.size = 0
+
+    def copy(self) -> "BitsetHand":
+        hand = BitsetHand()
+        hand.counts[:] = self.counts
+        hand.mask = self.mask
+        hand.size = self.size
+        return hand
+
+    def index(self, card: int) -> int:
+        """Position of the first copy of `card` in the sorted hand."""
+        if not self.counts[card]:
+            raise ValueError(f"Card {card} not in hand")
+        return sum(self.counts[:card])
+
+    def playable_mask(self, top_card: int, current_color: int) -> int:
+        """Bitmask of the card types in hand that can be played."""
+        return self.mask & PLAYABLE_MASK[top_card][current_color]
+
+    def playable_indices(self, top_card: int, current_color: int) -> List[int]:
+        """Hand indices of the playable cards (same result as rules.get_playable_cards_with_indices)."""
+        playable = self.mask & PLAYABLE_MASK[top_card][current_color]
+        if not playable:
+            return []
+        counts = self.counts
+        indices = []
+        pos = 0
+        mask = self.mask
+        while mask:
+            low = mask & -mask
+            card = low.bit_length() - 1
+            n = counts[card]
+            if playable & low:
+                indices.extend(range(pos, pos + n))
+            pos += n
+            mask ^= low
+        return indices
+
+    def counts_view(self) -> np.ndarray:
+        """Live uint8 view of the per-card counts (no copy); it follows every append/remove."""
+        return self._view
+
+    def to_vector(self) -> np.ndarray:
+        """Card-count vector of length NUM_CARD_TYPES (float32), as encode_hand returns."""
+        return self._view.astype(np.float32)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __bool__(self) -> bool:
+        return self.size > 0
+
+    def __contains__(self, card: int) -> bool:
+        return bool(self.mask >> card & 1)
+
+    def __iter__(self) -> Iterator[int]:
+        counts = self.counts
+        mask = self.mask
+        while mask:
+            low = mask & -mask
+            card = low.bit_length() - 1
+            for _ in range(counts[card]):
+                yield card
+            mask ^= low
+
+    def __bytes__(self) -> bytes:
+        # Ids des cartes (uint8) dans l'ordre trié, pour Game.snapshot()
+        counts = self.counts
+        mask = self.mask
+        out = bytearray()
+        while mask:
+            low = mask & -mask
+            card = low.bit_length() - 1
+            out += _CARD_BYTES[card] * counts[card]
+            mask ^= low
+        return bytes(out)
+
+    def __getitem__(self, idx: int) -> int:
+        if idx < 0:
+            idx += self.size
+        if not 0 <= idx < self.size:
+            raise IndexError("hand index out of range")
+        counts = self.counts
+        mask = self.mask
+        while mask:
+            low = mask & -mask
+            card = low.bit_length() - 1
+            idx -= counts[card]
+            if idx < 0:
+                return card
+            mask ^= low
+        raise IndexError("hand index out of range")
+
+    def __delitem__(self, idx: int) -> None:
+        self.remove(self[idx])
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, BitsetHand):
+            return self.counts == other.counts
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"BitsetHand({list(self)})"
@@ -3,101 +3,138 @@ rules.py
 
 This module contains functions to determine the playability of cards and
 calculate scores in a UNO game.
+
+Cards are compact int ids (see encodings.py) and colors are indices into
+COLORS.
 """
 
-from typing import List
+from typing import List, Tuple
+
+import numpy as np
+
+from .constants import COLORS
+from .encodings import CARD_COLOR, CARD_RANK, CARD_POINTS, NO_COLOR, NUM_CARD_TYPES
 
 
-def is_playable(card: str, top_card: str, current_color: str) -> bool:
+def _compute_playable(card: int, top_card: int, current_color: int) -> bool:
+    card_color = CARD_COLOR[card]
+    return (
+        card_color == NO_COLOR
+        or card_color == current_color
+        or CARD_RANK[card] == CARD_RANK[top_card]
+    )
+
+# Playability lookup tables, built once at import.
+#
+# PLAYABLE_TABLE[card, top_card, color] is the full boolean table (for
+# vectorized code), PLAYABLE[top_card][color] is the per-card row as a tuple
+# of bools (fastest to index from Python) and PLAYABLE_MASK[top_card][color]
+# the same row as an int bitmask, bit `card` set if the card can be played.
+PLAYABLE_TABLE: np.ndarray = np.array([
+    [[_compute_playable(card, top, color) for color in range(len(COLORS))]
+     for top in range(NUM_CARD_TYPES)]
+    for card in range(NUM_CARD_TYPES)
+], dtype=bool)
+PLAYABLE_TABLE.setflags(write=False)
+
+PLAYABLE: Tuple[Tuple[Tuple[bool, ...], ...], ...] = tuple(
+    tuple(tuple(bool(v) for v in PLAYABLE_TABLE[:, top, color]) for color in range(len(COLORS)))
+    for top in range(NUM_CARD_TYPES)
+)
+PLAYABLE_MASK: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(sum(1 << card for card, ok in enumerate(row) if ok) for row in rows)
+    for rows in PLAYABLE
+)
+
+
+def is_playable(card: int, top_card: int, current_color: int) -> bool:
     """
     Determine if a card is playable based on the current color or the top card.
 
     Args:
-        card (str): The card to check.
-        top_card (str): The top card of the discard pile.
-        current_color (str): The active color in play.
+        card (int): The card to check.
+        top_card (int): The top card of the discard pile.
+        current_color (int): The active color in play.
 
     Returns:
         bool: True if the card is playable, False otherwise.
     """
-    card_parts = card.split()
-    top_parts = top_card.split()
-
-    if not card_parts or not top_parts:
-        return False
-
-    if card_parts[0] == 'Wild':
-        return True
-
-    card_color = card_parts[0]
-    card_value = " ".join(card_parts[1:]) if len(card_parts) > 1 else None
-
-    top_color = top_parts[0]
-    top_value = " ".join(top_parts[1:]) if len(top_parts) > 1 else None
-
-    return card_color == current_color or card_value == top_value
+    return PLAYABLE[top_card][current_color][card]
 
-def get_playable_cards(hand: List[str], top_card: str, current_color: str) -> List[str]:
+def get_playable_cards(hand: List[int], top_card: int, current_color: int) -> List[int]:
     """
     Get a list of playable cards from a hand based on the top card and current color.
 
     Args:
-        hand (List[str]): The player's hand of cards.
-        top_card (str): The top card of the discard pile.
-        current_color (str): The active color in play.
+        hand (List[int]): The player's hand of cards.
+        top_card (int): The top card of the discard pile.
+        current_color (int): The active color in play.
 
     Returns:
-        List[str]: A list of playable cards.
+        List[int]: A list of playable cards.
     """
-    return [
-        card for card in hand
-        if is_playable(card, top_card, current_color)
-    ]
+    row = PLAYABLE[top_card][current_color]
+    return [card for card in hand if row[card]]
 
-def get_playable_cards_with_indices(hand: List[str], top_card: str, current_color: str) -> List[int]:
+def get_playable_cards_with_indices(hand: List[int], top_card: int, current_color: int) -> List[int]:
     """
     Get indices of playable cards from a hand based on the top card and current color.
 
     Args:
-        hand (List[str]): The player's hand of cards.
-        top_card (str): The top card of the discard pile.
-        current_color (str): The active color in play.
+        hand (List[int]): The player's hand of cards.
+        top_card (int): The top card of the discard pile.
+        current_color (int): The active color in play.
 
     Returns:
         List[int]: A list of indices of playable cards.
     """
-    return [
-        i for i, card in enumerate(hand)
-        if is_playable(card, top_card, current_color)
-    ]
+    row = PLAYABLE[top_card][current_color]
+    return [i for i, card in enumerate(hand) if row[card]]
 
-def calculate_card_points(card: str) -> int:
+def legal_action_mask(hand: List[int], top_card: int, current_color: int) -> np.ndarray:
+    """
+    Legal actions of a player, in UnoEnv's action ids: a card id plays that
+    card, NUM_CARD_TYPES draws. The playable cards of the hand are legal;
+    drawing is legal only when none is (drawing with a playable card in
+    hand is penalized like an illegal move).
+
+    Args:
+        hand (List[int] | BitsetHand): The player's hand of cards.
+        top_card (int): The top card of the discard pile.
+        current_color (int): The active color in play.
+
+    Returns:
+        np.ndarray: Boolean mask of length NUM_CARD_TYPES + 1, never empty.
+    """
+    mask = np.zeros(NUM_CARD_TYPES + 1, dtype=bool)
+    if hasattr(hand, "counts_view"):
+        mask[:NUM_CARD_TYPES] = hand.counts_view() > 0
+    else:
+        mask[hand] = True
+    mask[:NUM_CARD_TYPES] &= PLAYABLE_TABLE[:, top_card, current_color]
+    if not mask.any():
+        mask[NUM_CARD_TYPES] = True
+    return mask
+
+def calculate_card_points(card: int) -> int:
     """
     Calculate the points of a given card.
 
     Args:
-        card (str): The card to calculate points for.
+        card (int): The card to calculate points for.
 
     Returns:
         int: The points of the card.
     """
-    if card.startswith("Wild"):
-        return 50
-    elif "+2" in card or "Skip" in card or "Reverse" in card:
-        return 20
-    else:
-        try:
-            return int(card.split()[1])
-        except (IndexError, ValueError):
-            return 0
+    return CARD_POINTS[card]
 
-def calculate_score(hands: List[List[str]], winner_idx: int) -> int:
+def calculate_score(hands: List[List[int]], winner_idx: int) -> int:
     """
     Calculate the total score of the game by summing the points of the
     remaining cards in all hands except the winner's.
 
     Args:
-        hands (List[List[str]]): A list of hands, where each hand is a list
+        hands (List[List[int]]): A list of hands, where each hand is a list
             of cards.
         winner_idx (int): The index of the winning hand.
 
@@ -105,7 +142,7 @@ def calculate_score(hands: List[List[str]], winner_idx: int) -> int:
         int: The total score.
     """
     return sum(
-        calculate_card_points(card)
+        CARD_POINTS[card]
         for i, hand in enumerate(hands)
         if i != winner_idx
         for card in hand
@@ -0,0 +1,64 @@
+"""
+state.py
+
+Read-only view of a game state.
+
+Game.get_state() returns a GameState built once per state change and
+shared by every reader until the next change (agents, encoders, API). It
+reads like the dict the engine used to return (state["hands"],
+state.get("winner"), dict(state)), without allocating a dict per call.
+"""
+
+from collections.abc import Mapping
+from typing import Iterator, List, Optional, Sequence
+
+_FIELDS = (
+    "num_players", "deck_size", "discard_pile", "hands", "current_player",
+    "current_color", "direction", "turn", "cards_left", "winner",
+)
+
+
+class GameState(Mapping):
+    """
+    Snapshot of the scalar game fields plus references to the engine's
+    hands and discard pile.
+
+    The hands and discard pile are the live engine containers, not copies:
+    readers must not mutate them, and should call Game.get_state() again
+    after the game moves on.
+    """
+
+    __slots__ = _FIELDS
+
+    def __init__(self, num_players: int, deck_size: int, discard_pile: List[int], hands: Sequence,
+                 current_player: int, current_color: Optional[int], direction: int, turn: int,
+                 cards_left: tuple, winner: Optional[int]):
+        self.num_players = num_players
+        self.deck_size = deck_size
+        self.discard_pile = discard_pile
+        self.hands = hands
+        self.current_player = current_player
+        self.current_color = current_color
+        self.direction = direction
+        self.turn = turn
+        self.cards_left = cards_left
+        self.winner = winner
+
+    @property
+    def top_card(self) -> int:
+        return self.discard_pile[-1]
+
+    def __getitem__(self, key: str):
+        if key in _FIELDS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(_FIELDS)
+
+    def __len__(self) -> int:
+        return len(_FIELDS)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{k}={getattr(self, k)!r}" for k in _FIELDS)
+        return f"GameState({fields})"
@@ -1,77 +1,48 @@
 # utils.py
 
-from typing import Dict, List
-from .constants import COLORS, VALUES, SPECIAL_CARDS, WILD_CARDS
-from .encodings import ALL_CARDS, CARD2IDX, IDX2CARD
-
-
-# Encodage/décodage des cartes
-CARD_ENCODING: Dict[str, int] = {}
-CARD_DECODING: Dict[int, str] = {}
-
-_card_id = 0
-
-# Cartes "0" (une seule par couleur)
-for color in COLORS:
-    card = f"{color} 0"
-    CARD_ENCODING[card] = _card_id
-    CARD_DECODING[_card_id] = card
-    _card_id += 1
-
-# Cartes numérotées 1-9 (deux par couleur)
-for color in COLORS:
-    for value in VALUES:
-        card = f"{color} {value}"
-        for _ in range(2):
-            CARD_ENCODING[card] = _card_id
-            CARD_DECODING[_card_id] = card
-            _card_id += 1
-
-# Cartes spéciales couleur (deux par couleur)
-for color in COLORS:
-    for special in SPECIAL_CARDS:
-        card = f"{color} {special}"
-        for _ in range(2):
-            CARD_ENCODING[card] = _card_id
-            CARD_DECODING[_card_id] = card
-            _card_id += 1
-
-# Cartes Wild (4 exemplaires)
-for wild in WILD_CARDS:
-    for _ in range(4):
-        CARD_ENCODING[wild] = _card_id
-        CARD_DECODING[_card_id] = wild
-        _card_id += 1
-
-TOTAL_CARDS = _card_id  # = 108
+from typing import Dict, List, Optional
 
 import numpy as np
 
+from .encodings import DRAW_ACTION, IDX2CARD, NUM_CARD_TYPES, str_to_card
+from .hand import BitsetHand
+
+
 def encode_card(card_str: str) -> int:
-    """Convertit une carte en entier unique"""
-    return CARD_ENCODING[card_str]
+    """Convertit une carte en son id compact (voir encodings.py)"""
+    return str_to_card(card_str)
 
 def decode_card(card_id: int) -> str:
-    """Convertit un entier en carte"""
-    if card not in CARD2IDX:
-        raise KeyError(f"Card '{card}' not in CARD2IDX")
-    return CARD_DECODING[card_id]
+    """Convertit un id de carte en nom de carte"""
+    if card_id not in IDX2CARD:
+        raise KeyError(f"Card id '{card_id}' not in IDX2CARD")
+    return IDX2CARD[card_id]
 
-def encode_hand(hand: List[str]) -> np.ndarray:
+def encode_hand(hand: List[int], out: Optional[np.ndarray] = None) -> np.ndarray:
     """
-    Encode une main de cartes en vecteur de fréquences (longueur = TOTAL_CARDS)
+    Encode une main de cartes en vecteur de fréquences (longueur = NUM_CARD_TYPES)
+
+    Une BitsetHand tient déjà ses comptes à jour à chaque pioche/jeu : l'encodage
+    est alors une simple copie de ses comptes, sans reconstruire le vecteur.
 
     Args:
-        hand (List[str]): Liste des cartes
+        hand (List[int] | BitsetHand): Liste des ids de cartes
+        out (Optional[np.ndarray]): Tampon float32 de longueur NUM_CARD_TYPES
+            à remplir sur place au lieu d'allouer un nouveau tableau
 
     Returns:
-        np.ndarray: Vecteur de fréquences (float32)
+        np.ndarray: Vecteur de fréquences (float32), `out` s'il est fourni
     """
-    vec = np.zeros(len(CARD2IDX), dtype=np.float32)
-    for card in hand:
-        norm_card = normalize_card(card)
-        vec[CARD2IDX[norm_card]] += 1
-    return vec
+    if out is None:
+        if isinstance(hand, BitsetHand):
+            return hand.to_vector()
+        return np.bincount(hand, minlength=NUM_CARD_TYPES).astype(np.float32)
+
+    if isinstance(hand, BitsetHand):
+        np.copyto(out, hand.counts_view())
+    else:
+        out[:] = np.bincount(hand, minlength=NUM_CARD_TYPES)
+    return out
 
 def decode_hand(encoded_hand: List[int]) -> List[str]:
     """
@@ -85,22 +56,29 @@ def decode_hand(encoded_hand: List[int]) -> List[str]:
     """
     return [decode_card(cid) for cid in encoded_hand if cid != -1]
 
-def encode_state(game_state: dict, player_idx: int) -> np.ndarray:
+def state_vector_size(num_players: int) -> int:
+    """Longueur du vecteur produit par encode_state pour `num_players` joueurs"""
+    return 2 * NUM_CARD_TYPES + num_players
+
+def encode_state(game_state: dict, player_idx: int, out: Optional[np.ndarray] = None) -> np.ndarray:
     """
     Encode l'état du jeu pour un joueur donné.
 
     Args:
         game_state (dict): état brut du jeu (format retourné par Game.get_state())
         player_idx (int): index du joueur courant
+        out (Optional[np.ndarray]): Tampon float32 de longueur
+            state_vector_size(num_players) à remplir sur place (aucune allocation)
 
     Returns:
-        np.ndarray: vecteur représentant l'état
+        np.ndarray: vecteur représentant l'état, `out` s'il est fourni
     """
-    from .utils import encode_card, encode_hand, TOTAL_CARDS
+    if out is not None:
+        return _encode_state_into(game_state, player_idx, out)
 
     # Main du joueur
     hand = game_state["hands"][player_idx]
-    hand_vec = encode_hand(hand)  # (108,)
+    hand_vec = encode_hand(hand)  # (NUM_CARD_TYPES,)
 
     # Correction : déduire la top_card depuis discard_pile si non présente
     if "top_card" in game_state:
@@ -110,13 +88,9 @@ def encode_state(game_state: dict, player_idx: int) -> np.ndarray:
     else:
         top_card = None
 
-    top_card_vec = np.zeros(TOTAL_CARDS, dtype=np.float32)
+    top_card_vec = np.zeros(NUM_CARD_TYPES, dtype=np.float32)
     if top_card is not None:
-        try:
-            top_card_id = encode_card(top_card)
-            top_card_vec[top_card_id] = 1.0  # One-hot
-        except Exception:
-            pass
+        top_card_vec[top_card] = 1.0  # One-hot
 
     # Nombre de cartes restantes pour chaque joueur
     num_players = len(game_state["hands"])
@@ -131,6 +105,27 @@ def encode_state(game_state: dict, player_idx: int) -> np.ndarray:
 
     return state_vector
 
+def _encode_state_into(game_state: dict, player_idx: int, out: np.ndarray) -> np.ndarray:
+    # Même disposition que encode_state : [main | top_card one-hot | tailles des mains]
+    hands = game_state["hands"]
+    encode_hand(hands[player_idx], out=out[:NUM_CARD_TYPES])
+
+    top_vec = out[NUM_CARD_TYPES:2 * NUM_CARD_TYPES]
+    top_vec.fill(0.0)
+    if "top_card" in game_state:
+        top_card = game_state["top_card"]
+    elif game_state.get("discard_pile"):
+        top_card = game_state["discard_pile"][-1]
+    else:
+        top_card = None
+    if top_card is not None:
+        top_vec[top_card] = 1.0
+
+    base = 2 * NUM_CARD_TYPES
+    for i, hand in enumerate(hands):
+        out[base + i] = len(hand) if i != player_idx else 0
+    return out
+
 def decode_action(index: int) -> str:
     """
     Convertit un index d'action en nom de carte, ou 'DRAW' si c'est l'action piocher.
@@ -141,7 +136,7 @@ def decode_action(index: int) -> str:
     Returns:
         str: carte jouée ou 'DRAW'
     """
-    if index == TOTAL_CARDS:
+    if index == DRAW_ACTION:
         return "DRAW"
     return decode_card(index)
 
@@ -157,3 +152,25 @@ def normalize_top_card(card: str) -> str:
     if parts[0] in {"Red", "Green", "Blue", "Yellow"} and "Wild" in card:
         return " ".join(parts[1:])
     return card
+
+MAX_OPPONENT_CARDS = 99
+
+def encode_observation(game_state: dict, player_idx: int) -> Dict[str, np.ndarray]:
+    """
+    Observation de UnoEnv pour le joueur player_idx, à partir de l'état du
+    jeu : comptes de la main, carte du dessus et nombre de cartes du joueur
+    suivant. C'est l'entrée des politiques entraînées sur UnoEnv.
+
+    Args:
+        game_state (dict): état du jeu (Game.get_state())
+        player_idx (int): index du joueur courant
+
+    Returns:
+        Dict[str, np.ndarray]: observation au format de UnoEnv.observation_space
+    """
+    next_player = (player_idx + game_state["direction"]) % game_state["num_players"]
+    return {
+        "hand": encode_hand(game_state["hands"][player_idx]),
+        "top_card": np.int64(game_state["discard_pile"][-1]),
+        "opponent_card_count": np.int64(min(len(game_state["hands"][next_player]), MAX_OPPONENT_CARDS)),
+    }
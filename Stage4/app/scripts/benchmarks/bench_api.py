@@ -0,0 +1,78 @@
+"""
+bench_api.py
+
+Flask API throughput benchmark.
+
+Drives /api/play_turn through the Flask test client (no network), starting a
+new game whenever the current one ends, and reports requests per second.
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
+
+from app import create_app
+
+
+def bench_play_turn(requests: int = 2000, num_players: int = 2, seed: int = 0, max_turns: int = 500) -> dict:
+    """
+    POST /api/play_turn `requests` times with automatic play (human_input null).
+
+    Args:
+        requests (int): Number of play_turn requests.
+        num_players (int): Players per game.
+        seed (int): Base seed, game i uses seed + i.
+        max_turns (int): Start a new game after this many requests without a winner.
+
+    Returns:
+        dict: Number of requests, games started, elapsed seconds and requests per second.
+    """
+    app = create_app()
+    app.config["TESTING"] = True
+    client = app.test_client()
+
+    def new_game(i):
+        resp = client.post("/api/start_game", json={"num_players": num_players, "seed": seed + i})
+        return resp.get_json()["data"]["game_id"]
+
+    games = 1
+    game_id = new_game(0)
+    turns = 0
+    elapsed = 0.0
+    for _ in range(requests):
+        start = time.perf_counter()
+        resp = client.post("/api/play_turn", json={"game_id": game_id, "human_input": None})
+        data = resp.get_json()["data"]
+        elapsed += time.perf_counter() - start
+        turns += 1
+        if data.get("winner") is not None or turns >= max_turns:
+            client.delete(f"/api/delete_game/{game_id}")
+            game_id = new_game(games)
+            games += 1
+            turns = 0
+    client.delete(f"/api/delete_game/{game_id}")
+    return {
+        "endpoint": "/api/play_turn",
+        "requests": requests,
+        "games": games,
+        "seconds": elapsed,
+        "requests_per_sec": requests / elapsed if elapsed else 0.0,
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the Flask /api/play_turn endpoint.")
+    parser.add_argument("-n", "--requests", type=int, default=2000, help="Number of requests.")
+    parser.add_argument("-p", "--players", type=int, default=2, help="Players per game.")
+    parser.add_argument("-s", "--seed", type=int, default=0, help="Base seed.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    result = bench_play_turn(requests=args.requests, num_players=args.players, seed=args.seed)
+    print(f"{result['endpoint']}: {result['requests']} requests in {result['seconds']:.3f}s "
+          f"-> {result['requests_per_sec']:,.0f} req/sec")
@@ -0,0 +1,123 @@
+"""
+bench_engine.py
+
+Core engine throughput benchmark.
+
+Plays seeded games with Game.play_turn and reports how many turns per second
+the engine sustains for a given number of players. Also measures raw
+is_playable calls and full games with the rule-based agents.
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
+
+from app.models.uno.deck import create_deck
+from app.models.uno.game import Game
+from app.models.uno.rules import is_playable
+
+
+def bench_turns(num_players: int = 2, games: int = 200, max_turns: int = 1000, seed: int = 0,
+                bitset_hands: bool = False) -> dict:
+    """
+    Play `games` games and measure raw Game.play_turn throughput.
+
+    Args:
+        num_players (int): Number of players per game.
+        games (int): Number of games to play.
+        max_turns (int): Safety cap on turns per game.
+        seed (int): Base seed, game i uses seed + i.
+        bitset_hands (bool): Use BitsetHand hands instead of lists.
+
+    Returns:
+        dict: Number of turns played, elapsed seconds and turns per second.
+    """
+    turns = 0
+    elapsed = 0.0
+    for i in range(games):
+        game = Game(num_players=num_players, seed=seed + i, bitset_hands=bitset_hands)
+        game.start()
+        start = time.perf_counter()
+        for _ in range(max_turns):
+            turns += 1
+            if game.play_turn() is not None:
+                break
+        elapsed += time.perf_counter() - start
+    return {
+        "num_players": num_players,
+        "games": games,
+        "turns": turns,
+        "seconds": elapsed,
+        "turns_per_sec": turns / elapsed if elapsed else 0.0,
+    }
+
+
+def bench_is_playable(calls: int = 200000, seed: int = 0) -> dict:
+    """
+    Call rules.is_playable `calls` times on (card, top card, color) triples
+    drawn from a shuffled deck.
+
+    Returns:
+        dict: Number of calls, elapsed seconds and calls per second.
+    """
+    deck = create_deck(seed=seed)
+    triples = [(deck[i % 108], deck[(i * 7 + 3) % 108], i % 4) for i in range(1024)]
+    rounds, rest = divmod(calls, len(triples))
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for card, top, color in triples:
+            is_playable(card, top, color)
+    for card, top, color in triples[:rest]:
+        is_playable(card, top, color)
+    elapsed = time.perf_counter() - start
+    return {"calls": calls, "seconds": elapsed, "calls_per_sec": calls / elapsed if elapsed else 0.0}
+
+
+def bench_games(num_players: int = 2, games: int = 200, max_turns: int = 1000, seed: int = 0) -> dict:
+    """
+    Play `games` full games with the rule-based agents (Game setup included).
+
+    Returns:
+        dict: Games played, games that hit `max_turns` without a winner,
+        elapsed seconds and games per second.
+    """
+    capped = 0
+    start = time.perf_counter()
+    for i in range(games):
+        game = Game(num_players=num_players, seed=seed + i, agent_type="rulesbased")
+        game.start()
+        for _ in range(max_turns):
+            if game.play_turn() is not None:
+                break
+        else:
+            capped += 1
+    elapsed = time.perf_counter() - start
+    return {
+        "num_players": num_players,
+        "games": games,
+        "capped_games": capped,
+        "seconds": elapsed,
+        "games_per_sec": games / elapsed if elapsed else 0.0,
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark Game.play_turn throughput.")
+    parser.add_argument("-p", "--players", type=int, nargs="+", default=[2, 4, 10], help="Player counts to benchmark.")
+    parser.add_argument("-g", "--games", type=int, default=200, help="Games per player count.")
+    parser.add_argument("-t", "--max-turns", type=int, default=1000, help="Max turns per game.")
+    parser.add_argument("-s", "--seed", type=int, default=0, help="Base seed.")
+    parser.add_argument("--bitset", action="store_true", help="Use bitset hands.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    for n in args.players:
+        result = bench_turns(num_players=n, games=args.games, max_turns=args.max_turns, seed=args.seed,
+                             bitset_hands=args.bitset)
+        print(f"{n} players: {result['turns']} turns in {result['seconds']:.3f}s "
+              f"-> {result['turns_per_sec']:,.0f} turns/sec")
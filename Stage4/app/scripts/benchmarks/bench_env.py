@@ -0,0 +1,105 @@
+"""
+bench_env.py
+
+UnoEnv throughput benchmark: resets per second and steps per second with
+random actions, and encode_state calls per second.
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
+
+from app.models.envs.uno_env import UnoEnv
+from app.models.uno.game import Game
+from app.models.uno.utils import encode_state, state_vector_size
+
+
+def bench_resets(resets: int = 5000, seed: int = 0) -> dict:
+    """
+    Call UnoEnv.reset `resets` times on one environment.
+
+    Returns:
+        dict: Number of resets, elapsed seconds and resets per second.
+    """
+    env = UnoEnv(seed=seed)
+    env.reset()
+    start = time.perf_counter()
+    for _ in range(resets):
+        env.reset()
+    elapsed = time.perf_counter() - start
+    return {"resets": resets, "seconds": elapsed, "resets_per_sec": resets / elapsed}
+
+
+def bench_steps(steps: int = 20000, max_episode_steps: int = 500, seed: int = 0) -> dict:
+    """
+    Step one UnoEnv `steps` times with random actions, resetting on episode end.
+
+    Returns:
+        dict: Number of steps, elapsed seconds and steps per second.
+    """
+    env = UnoEnv(seed=seed)
+    env.reset()
+    rng = np.random.default_rng(seed)
+    actions = rng.integers(env.action_space.n, size=steps)
+    length = 0
+    start = time.perf_counter()
+    for action in actions:
+        _, _, done, truncated, _ = env.step(int(action))
+        length += 1
+        if done or truncated or length >= max_episode_steps:
+            env.reset()
+            length = 0
+    elapsed = time.perf_counter() - start
+    return {"steps": steps, "seconds": elapsed, "steps_per_sec": steps / elapsed}
+
+
+def bench_encode_state(calls: int = 50000, num_players: int = 2, seed: int = 0, use_out: bool = False) -> dict:
+    """
+    Call encode_state `calls` times on the states of a seeded game.
+
+    Args:
+        use_out (bool): Encode into a preallocated buffer (out=).
+
+    Returns:
+        dict: Number of calls, elapsed seconds and calls per second.
+    """
+    game = Game(num_players=num_players, seed=seed, agents=[None] * num_players)
+    game.start()
+    states = []
+    for _ in range(64):
+        # Copie des mains : la vue GameState référence les mains vivantes
+        state = dict(game.get_state(), hands=[list(h) for h in game.hands])
+        states.append((state, game.current_player))
+        if game.play_turn() is not None:
+            break
+    out = np.zeros(state_vector_size(num_players), dtype=np.float32) if use_out else None
+    rounds, rest = divmod(calls, len(states))
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for state, player in states:
+            encode_state(state, player, out=out)
+    for state, player in states[:rest]:
+        encode_state(state, player, out=out)
+    elapsed = time.perf_counter() - start
+    return {"calls": calls, "out": use_out, "seconds": elapsed, "calls_per_sec": calls / elapsed if elapsed else 0.0}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark UnoEnv reset and step throughput.")
+    parser.add_argument("-r", "--resets", type=int, default=5000, help="Number of resets.")
+    parser.add_argument("-n", "--steps", type=int, default=20000, help="Number of steps.")
+    parser.add_argument("-s", "--seed", type=int, default=0, help="Seed.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    resets = bench_resets(resets=args.resets, seed=args.seed)
+    steps = bench_steps(steps=args.steps, seed=args.seed)
+    print(f"reset: {resets['resets_per_sec']:,.0f} resets/sec")
+    print(f"step:  {steps['steps_per_sec']:,.0f} steps/sec")
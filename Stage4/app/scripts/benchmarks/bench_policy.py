@@ -0,0 +1,138 @@
+"""
+bench_policy.py
+
+PPO policy inference benchmark: stable_baselines3 / torch against the
+NumPy export (NumpyPolicy).
+
+Reports the latency of one-observation and batched greedy predictions, and,
+in a fresh process for each path, the time and peak memory (RSS) needed to
+import the inference code and load the policy, which is what every API
+worker pays at startup. Without --model, an untrained policy with the
+default architecture is saved to a temporary directory and used.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
+
+from app.models.uno.game import Game
+from app.models.uno.utils import encode_observation
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../'))
+
+# Code exécuté dans un process neuf : temps d'import + chargement et pic de mémoire
+_STARTUP_CODE = """
+import json, resource, sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+if {backend!r} == "torch":
+    from stable_baselines3 import PPO
+    PPO.load({path!r}, device="cpu")
+else:
+    from app.models.agents.numpy_policy import NumpyPolicy
+    NumpyPolicy.load({path!r})
+elapsed = time.perf_counter() - start
+# VmHWM (Linux) : pic du process lui-même ; ru_maxrss hérite du parent à travers fork/exec
+try:
+    with open("/proc/self/status") as f:
+        peak_kb = next(int(line.split()[1]) for line in f if line.startswith("VmHWM:"))
+except OSError:
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{"seconds": elapsed, "max_rss_mb": peak_kb / 1024}}))
+"""
+
+
+def sample_observations(count: int, seed: int = 0) -> list:
+    observations = []
+    for i in range(count):
+        game = Game(num_players=2, seed=seed + i)
+        game.start()
+        for _ in range(i % 10):
+            game.play_turn()
+        observations.append(encode_observation(game.get_state(), game.current_player))
+    return observations
+
+
+def startup_cost(backend: str, path: str) -> dict:
+    code = _STARTUP_CODE.format(root=ROOT, backend=backend, path=path)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def _latency(predict, observations, batch_size: int, repeats: int) -> float:
+    batches = [{key: np.stack([obs[key] for obs in observations[i:i + batch_size]]) for key in observations[0]}
+               for i in range(0, len(observations), batch_size)]
+    predict(batches[0])
+    start = time.perf_counter()
+    for r in range(repeats):
+        predict(batches[r % len(batches)])
+    return (time.perf_counter() - start) / repeats
+
+
+def bench_policy(model_path: str = None, repeats: int = 2000, batch_size: int = 64, seed: int = 0,
+                 startup: bool = True) -> dict:
+    """
+    Compare the torch and NumPy inference paths of a PPO policy.
+
+    Args:
+        model_path (str): Saved PPO model; an untrained one if None.
+        repeats (int): Predictions timed per measurement.
+        batch_size (int): Observations per batched prediction.
+        seed (int): Seed of the sampled game states.
+        startup (bool): Also measure import + load time and peak RSS.
+
+    Returns:
+        dict: Microseconds per prediction (single / batched) for each path,
+        and startup seconds and peak RSS in MB when measured.
+    """
+    from stable_baselines3 import PPO
+    from app.models.agents.numpy_policy import NumpyPolicy
+    from app.scripts.training.export_policy import export_policy
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if model_path is None:
+            from app.models.envs.uno_env import UnoEnv
+            model_path = os.path.join(tmp, "ppo_uno")
+            PPO("MultiInputPolicy", UnoEnv(seed=seed), seed=seed, device="cpu").save(model_path)
+        policy_path = export_policy(model_path, os.path.join(tmp, "ppo_uno.npz"))
+
+        model = PPO.load(model_path, device="cpu")
+        policy = NumpyPolicy.load(policy_path)
+        observations = sample_observations(batch_size * 4, seed)
+        torch_predict = lambda obs: model.predict(obs, deterministic=True)
+        numpy_predict = policy.predict
+
+        results = {"batch_size": batch_size, "torch": {}, "numpy": {}}
+        for name, predict in (("torch", torch_predict), ("numpy", numpy_predict)):
+            results[name]["single_us"] = _latency(predict, observations, 1, repeats) * 1e6
+            results[name]["batch_us"] = _latency(predict, observations, batch_size, max(repeats // 10, 1)) * 1e6
+            if startup:
+                cost = startup_cost(name, model_path if name == "torch" else policy_path)
+                results[name]["startup_seconds"] = cost["seconds"]
+                results[name]["max_rss_mb"] = cost["max_rss_mb"]
+    return results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark torch vs NumPy PPO policy inference.")
+    parser.add_argument("-m", "--model", help="Saved PPO model (default: an untrained one).")
+    parser.add_argument("-n", "--repeats", type=int, default=2000, help="Predictions per measurement.")
+    parser.add_argument("-b", "--batch-size", type=int, default=64, help="Observations per batch.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = bench_policy(args.model, args.repeats, args.batch_size)
+    for name in ("torch", "numpy"):
+        r = results[name]
+        print(f"{name:5s}: {r['single_us']:8.1f} us/obs single, {r['batch_us']:8.1f} us/batch of {results['batch_size']}, "
+              f"startup {r['startup_seconds']:.2f}s, peak RSS {r['max_rss_mb']:.0f} MB")
@@ -0,0 +1,76 @@
+"""
+bench_snapshot.py
+
+Checkpoint cost benchmark: Game.snapshot / Game.restore / Game.clone versus
+copy.deepcopy, on a game taken mid-play, plus the snapshot size.
+"""
+
+import os
+import sys
+import copy
+import time
+import pickle
+import random
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
+
+from app.models.uno.game import Game
+
+
+def _rate(fn, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    elapsed = time.perf_counter() - start
+    return repeats / elapsed if elapsed else 0.0
+
+
+def bench_snapshot(num_players: int = 4, repeats: int = 20000, turns: int = 20, seed: int = 0,
+                   bitset_hands: bool = False) -> dict:
+    """
+    Measure snapshot, restore, clone (own RNG copy or shared RNG) and deepcopy rates on one seeded game
+    after `turns` turns.
+
+    Returns:
+        dict: Operations per second for each method and the snapshot sizes
+        in bytes (with and without RNG state, and pickle for reference).
+    """
+    game = Game(num_players=num_players, seed=seed, bitset_hands=bitset_hands)
+    game.start()
+    for _ in range(turns):
+        if game.play_turn() is not None:
+            break
+    data = game.snapshot()
+    target = game.clone()
+    rng = random.Random(seed)
+    return {
+        "num_players": num_players,
+        "bitset_hands": bitset_hands,
+        "snapshot_per_sec": _rate(game.snapshot, repeats),
+        "restore_per_sec": _rate(lambda: target.restore(data), repeats),
+        "clone_per_sec": _rate(game.clone, repeats),
+        "clone_shared_rng_per_sec": _rate(lambda: game.clone(rng=rng), repeats),
+        "deepcopy_per_sec": _rate(lambda: copy.deepcopy(game), max(1, repeats // 10)),
+        "snapshot_bytes": len(data),
+        "snapshot_with_rng_bytes": len(game.snapshot(include_rng=True)),
+        "pickle_bytes": len(pickle.dumps(game)),
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark Game snapshot/restore/clone against deepcopy.")
+    parser.add_argument("-p", "--players", type=int, default=4, help="Number of players.")
+    parser.add_argument("-n", "--repeats", type=int, default=20000, help="Operations per method.")
+    parser.add_argument("-s", "--seed", type=int, default=0, help="Seed.")
+    parser.add_argument("--bitset", action="store_true", help="Use bitset hands.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    result = bench_snapshot(num_players=args.players, repeats=args.repeats, seed=args.seed, bitset_hands=args.bitset)
+    for key in ("snapshot", "restore", "clone", "clone_shared_rng", "deepcopy"):
+        print(f"{key:16s}: {result[key + '_per_sec']:>12,.0f} /sec")
+    print(f"size: snapshot {result['snapshot_bytes']} B, with RNG {result['snapshot_with_rng_bytes']} B, "
+          f"pickle {result['pickle_bytes']} B")
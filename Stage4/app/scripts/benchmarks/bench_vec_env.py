@@ -0,0 +1,95 @@
+"""
+bench_vec_env.py
+
+Environment throughput benchmark: N separate UnoEnv instances stepped in a
+Python loop versus one VecUnoEnv holding N games, both with random actions.
+"""
+
+import os
+import sys
+import io
+import time
+import argparse
+import contextlib
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
+
+from app.models.envs.uno_env import UnoEnv
+from app.models.envs.vec_uno_env import VecUnoEnv
+
+
+def bench_uno_envs(num_envs: int = 64, steps: int = 200, max_episode_steps: int = 500, seed: int = 0) -> dict:
+    """
+    Step `num_envs` UnoEnv instances `steps` times each.
+
+    Returns:
+        dict: Env steps, elapsed seconds and env steps per second.
+    """
+    rng = np.random.default_rng(seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        envs = [UnoEnv(seed=seed + i) for i in range(num_envs)]
+        for env in envs:
+            env.reset()
+        lengths = [0] * num_envs
+
+        start = time.perf_counter()
+        for _ in range(steps):
+            actions = rng.integers(envs[0].action_space.n, size=num_envs)
+            for i, env in enumerate(envs):
+                _, _, done, truncated, _ = env.step(int(actions[i]))
+                lengths[i] += 1
+                if done or truncated or lengths[i] >= max_episode_steps:
+                    env.reset()
+                    lengths[i] = 0
+        elapsed = time.perf_counter() - start
+    return {
+        "env": "UnoEnv",
+        "num_envs": num_envs,
+        "env_steps": num_envs * steps,
+        "seconds": elapsed,
+        "steps_per_sec": num_envs * steps / elapsed,
+    }
+
+
+def bench_vec_env(num_envs: int = 64, steps: int = 200, max_episode_steps: int = 500, seed: int = 0) -> dict:
+    """
+    Step one VecUnoEnv of `num_envs` games `steps` times.
+
+    Returns:
+        dict: Env steps, elapsed seconds and env steps per second.
+    """
+    env = VecUnoEnv(num_envs=num_envs, seed=seed, max_steps=max_episode_steps)
+    env.reset(seed=seed)
+    env.action_space.seed(seed)
+
+    start = time.perf_counter()
+    for _ in range(steps):
+        env.step(env.action_space.sample())
+    elapsed = time.perf_counter() - start
+    return {
+        "env": "VecUnoEnv",
+        "num_envs": num_envs,
+        "env_steps": num_envs * steps,
+        "seconds": elapsed,
+        "steps_per_sec": num_envs * steps / elapsed,
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark UnoEnv against VecUnoEnv.")
+    parser.add_argument("-n", "--num-envs", type=int, nargs="+", default=[256, 1024, 4096], help="Batch sizes to benchmark.")
+    parser.add_argument("--steps", type=int, default=200, help="Steps per environment.")
+    parser.add_argument("-s", "--seed", type=int, default=0, help="Base seed.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    for n in args.num_envs:
+        ref = bench_uno_envs(num_envs=n, steps=args.steps, seed=args.seed)
+        vec = bench_vec_env(num_envs=n, steps=args.steps, seed=args.seed)
+        print(f"N={n}: UnoEnv {ref['steps_per_sec']:,.0f} steps/sec | "
+              f"VecUnoEnv {vec['steps_per_sec']:,.0f} steps/sec | "
+              f"x{vec['steps_per_sec'] / ref['steps_per_sec']:.1f}")
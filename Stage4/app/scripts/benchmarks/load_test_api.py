@@ -0,0 +1,188 @@
+"""
+load_test_api.py
+
+Concurrent load test of the API, Flask (WSGI) against the ASGI app.
+
+Both apps are driven in process, without network: `concurrency` clients
+each play their own game through /api/play_turn (a new game when one ends).
+Flask clients are threads sharing the app, as under a threaded WSGI server;
+ASGI clients are tasks on one event loop. Reports requests per second.
+
+What is measured is the app side of a request: routing, JSON decoding, the
+handler, the game store and JSON encoding, plus each server model's
+concurrency (threads under the GIL vs one event loop). Both clients do the
+same minimal work: call_wsgi builds a raw WSGI environ and call_asgi a raw
+ASGI scope, and both join the response body. HTTP parsing, sockets and the
+server process (gunicorn, uvicorn) are not measured.
+
+    python Stage4/app/scripts/benchmarks/load_test_api.py -c 50 -n 100
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import threading
+from typing import Dict, Tuple
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
+
+from app import create_app, create_asgi_app
+from app.v1.asgi import call_asgi
+
+
+def call_wsgi(app, method: str, path: str, json_body=None) -> Tuple[int, Dict[str, str], bytes]:
+    """
+    In-process WSGI client, the counterpart of asgi.call_asgi: send one
+    request to `app` through a raw environ and collect the whole response.
+    Unlike Flask's test client, no request builder or response wrapper runs
+    on the client side.
+
+    Returns:
+        Tuple[int, Dict[str, str], bytes]: Status, headers and body.
+    """
+    body = b"" if json_body is None else json.dumps(json_body).encode()
+    environ = {
+        "REQUEST_METHOD": method, "SCRIPT_NAME": "", "PATH_INFO": path, "QUERY_STRING": "",
+        "SERVER_NAME": "127.0.0.1", "SERVER_PORT": "80", "SERVER_PROTOCOL": "HTTP/1.1", "REMOTE_ADDR": "127.0.0.1",
+        "wsgi.version": (1, 0), "wsgi.url_scheme": "http", "wsgi.input": io.BytesIO(body), "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True, "wsgi.multiprocess": False, "wsgi.run_once": False,
+    }
+    if json_body is not None:
+        environ["CONTENT_TYPE"] = "application/json"
+        environ["CONTENT_LENGTH"] = str(len(body))
+    response = {"status": 0, "headers": {}}
+
+    def start_response(status, headers, exc_info=None):
+        response["status"] = int(status.split(" ", 1)[0])
+        response["headers"] = dict(headers)
+
+    chunks = app(environ, start_response)
+    try:
+        data = b"".join(chunks)
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()
+    return response["status"], response["headers"], data
+
+
+def _result(server: str, concurrency: int, requests: int, games: int, elapsed: float) -> dict:
+    return {
+        "server": server,
+        "concurrency": concurrency,
+        "requests": requests,
+        "games": games,
+        "seconds": elapsed,
+        "requests_per_sec": requests / elapsed if elapsed else 0.0,
+    }
+
+
+def load_test_flask(concurrency: int = 20, requests_per_client: int = 100, num_players: int = 2,
+                    seed: int = 0) -> dict:
+    """
+    `concurrency` threads send `requests_per_client` play_turn requests
+    each to the Flask app (call_wsgi).
+
+    Returns:
+        dict: Server, concurrency, requests, games started, elapsed seconds and requests per second.
+    """
+    app = create_app()
+    games = [0] * concurrency
+    barrier = threading.Barrier(concurrency + 1)
+
+    def client_thread(rank):
+        def new_game():
+            _, _, body = call_wsgi(app, "POST", "/api/start_game",
+                                   {"num_players": num_players, "seed": seed + rank * 1000 + games[rank]})
+            games[rank] += 1
+            return json.loads(body)["data"]["game_id"]
+
+        game_id = new_game()
+        barrier.wait()
+        for _ in range(requests_per_client):
+            _, _, body = call_wsgi(app, "POST", "/api/play_turn", {"game_id": game_id, "fields": "compact"})
+            if json.loads(body)["data"].get("winner") is not None:
+                call_wsgi(app, "DELETE", f"/api/delete_game/{game_id}")
+                game_id = new_game()
+        barrier.wait()
+        call_wsgi(app, "DELETE", f"/api/delete_game/{game_id}")
+
+    threads = [threading.Thread(target=client_thread, args=(rank,)) for rank in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    barrier.wait()
+    elapsed = time.perf_counter() - start
+    for thread in threads:
+        thread.join()
+    return _result("flask", concurrency, concurrency * requests_per_client, sum(games), elapsed)
+
+
+def load_test_asgi(concurrency: int = 20, requests_per_client: int = 100, num_players: int = 2,
+                   seed: int = 0) -> dict:
+    """
+    `concurrency` tasks on one event loop send `requests_per_client`
+    play_turn requests each to the ASGI app (call_asgi).
+
+    Returns:
+        dict: Server, concurrency, requests, games started, elapsed seconds and requests per second.
+    """
+    app = create_asgi_app()
+    games = [0] * concurrency
+
+    async def new_game(rank):
+        _, _, body = await call_asgi(app, "POST", "/api/start_game",
+                                     {"num_players": num_players, "seed": seed + rank * 1000 + games[rank]})
+        games[rank] += 1
+        return json.loads(body)["data"]["game_id"]
+
+    async def client_task(rank, game_id):
+        for _ in range(requests_per_client):
+            _, _, body = await call_asgi(app, "POST", "/api/play_turn", {"game_id": game_id, "fields": "compact"})
+            if json.loads(body)["data"].get("winner") is not None:
+                await call_asgi(app, "DELETE", f"/api/delete_game/{game_id}")
+                game_id = await new_game(rank)
+        return game_id
+
+    async def main():
+        game_ids = [await new_game(rank) for rank in range(concurrency)]
+        start = time.perf_counter()
+        game_ids = await asyncio.gather(*(client_task(rank, game_id) for rank, game_id in enumerate(game_ids)))
+        elapsed = time.perf_counter() - start
+        for game_id in game_ids:
+            await call_asgi(app, "DELETE", f"/api/delete_game/{game_id}")
+        return elapsed
+
+    elapsed = asyncio.run(main())
+    return _result("asgi", concurrency, concurrency * requests_per_client, sum(games), elapsed)
+
+
+def compare(concurrency: int = 20, requests_per_client: int = 100, num_players: int = 2, seed: int = 0) -> dict:
+    """Run both load tests with the same parameters. asgi_speedup is ASGI req/s over Flask req/s."""
+    flask_result = load_test_flask(concurrency, requests_per_client, num_players, seed)
+    asgi_result = load_test_asgi(concurrency, requests_per_client, num_players, seed)
+    speedup = asgi_result["requests_per_sec"] / flask_result["requests_per_sec"] if flask_result["requests_per_sec"] else 0.0
+    return {"flask": flask_result, "asgi": asgi_result, "asgi_speedup": speedup}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compare Flask and ASGI API throughput under concurrent clients.")
+    parser.add_argument("-c", "--concurrency", type=int, default=20, help="Concurrent clients (one game each).")
+    parser.add_argument("-n", "--requests", type=int, default=100, help="play_turn requests per client.")
+    parser.add_argument("-p", "--players", type=int, default=2, help="Players per game.")
+    parser.add_argument("-s", "--seed", type=int, default=0, help="Base seed.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = compare(args.concurrency, args.requests, args.players, args.seed)
+    for name in ("flask", "asgi"):
+        r = results[name]
+        print(f"{name:5s}: {r['requests']} requests from {r['concurrency']} clients in {r['seconds']:.3f}s "
+              f"-> {r['requests_per_sec']:,.0f} req/sec")
+    print(f"ASGI / Flask: {results['asgi_speedup']:.2f}x")
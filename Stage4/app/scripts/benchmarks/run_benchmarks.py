@@ -0,0 +1,131 @@
+"""
+run_benchmarks.py
+
+Benchmark suite entry point.
+
+Runs the engine, environment and API throughput benchmarks (the API suite
+includes the Flask / ASGI load test) and emits one JSON document, so results
+can be stored and compared between commits:
+
+    python Stage4/app/scripts/benchmarks/run_benchmarks.py -o bench.json
+    python Stage4/app/scripts/benchmarks/run_benchmarks.py --only engine env --quick
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
+
+from app.scripts.benchmarks.bench_api import bench_play_turn
+from app.scripts.benchmarks.bench_engine import bench_games, bench_is_playable, bench_turns
+from app.scripts.benchmarks.bench_env import bench_encode_state, bench_steps
+from app.scripts.benchmarks.bench_policy import bench_policy
+from app.scripts.benchmarks.load_test_api import compare as load_test_api
+from app.scripts.benchmarks.bench_snapshot import bench_snapshot
+
+PLAYER_COUNTS = (2, 4, 10)
+
+# Taille des benchmarks : complète par défaut, réduite avec --quick
+SIZES = {
+    "full": {"calls": 200000, "games": 200, "steps": 20000, "encode": 50000, "requests": 2000, "snapshots": 20000,
+             "clients": 20, "inferences": 2000},
+    "quick": {"calls": 20000, "games": 20, "steps": 2000, "encode": 5000, "requests": 200, "snapshots": 2000,
+              "clients": 5, "inferences": 200},
+}
+
+
+def run_engine(sizes: dict, seed: int) -> dict:
+    return {
+        "is_playable": bench_is_playable(calls=sizes["calls"], seed=seed),
+        "play_turn": [bench_turns(num_players=n, games=sizes["games"], seed=seed) for n in PLAYER_COUNTS],
+        "rule_based_games": [bench_games(num_players=n, games=sizes["games"], seed=seed) for n in PLAYER_COUNTS],
+    }
+
+
+def run_env(sizes: dict, seed: int) -> dict:
+    return {
+        "uno_env_step": bench_steps(steps=sizes["steps"], seed=seed),
+        "encode_state": bench_encode_state(calls=sizes["encode"], seed=seed),
+        "encode_state_out": bench_encode_state(calls=sizes["encode"], seed=seed, use_out=True),
+    }
+
+
+def run_api(sizes: dict, seed: int) -> dict:
+    return {
+        "play_turn": bench_play_turn(requests=sizes["requests"], seed=seed),
+        "load_test": load_test_api(concurrency=sizes["clients"], requests_per_client=sizes["requests"] // sizes["clients"],
+                                   seed=seed),
+    }
+
+
+def run_snapshot(sizes: dict, seed: int) -> dict:
+    return {"game_checkpoint": bench_snapshot(repeats=sizes["snapshots"], seed=seed)}
+
+
+def run_policy(sizes: dict, seed: int) -> dict:
+    return {"ppo_inference": bench_policy(repeats=sizes["inferences"], seed=seed)}
+
+
+SUITES = {"engine": run_engine, "env": run_env, "api": run_api, "snapshot": run_snapshot, "policy": run_policy}
+
+
+def git_revision() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10)
+        return out.stdout.strip() or "unknown"
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+
+
+def run(suites, quick: bool = False, seed: int = 0) -> dict:
+    """
+    Run the selected suites.
+
+    Args:
+        suites (Iterable[str]): Names from SUITES.
+        quick (bool): Use the reduced sizes.
+        seed (int): Base seed for every benchmark.
+
+    Returns:
+        dict: Metadata (time, git revision, Python, platform) and one entry per suite.
+    """
+    sizes = SIZES["quick" if quick else "full"]
+    results = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "quick": quick,
+        "seed": seed,
+        "results": {},
+    }
+    for name in suites:
+        results["results"][name] = SUITES[name](sizes, seed)
+    return results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the UNO throughput benchmark suite and emit JSON.")
+    parser.add_argument("--only", nargs="+", choices=sorted(SUITES), default=list(SUITES),
+                        help="Suites to run (default: all).")
+    parser.add_argument("--quick", action="store_true", help="Smaller runs, for a quick check.")
+    parser.add_argument("-s", "--seed", type=int, default=0, help="Base seed.")
+    parser.add_argument("-o", "--output", help="Write the JSON to this file instead of stdout.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = run(args.only, quick=args.quick, seed=args.seed)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
@@ -0,0 +1,345 @@
+"""
+league.py
+
+Adaptive league between UNO agents, with TrueSkill ratings.
+
+Instead of playing every pairing the same number of games (evaluate.py), the
+league plays rounds: each round picks the pairings whose result is the most
+informative, i.e. the closest matches (TrueSkill match quality) between the
+most uncertain agents (largest sigma), and plays a chunk of games for each
+of them on a ProcessPoolExecutor. Ratings are updated after every round,
+and the league stops when every sigma is below the target or the game
+budget is spent.
+
+Everything is kept in one SQLite file:
+- matches: results cached by (setup hash, agent hash, agent hash, seed). An
+  agent hash covers its kind, its code and its weights; the setup hash
+  covers the game engine (app/models/uno), the evaluate.py harness and
+  max_turns. A result is never replayed while the agents and the setup are
+  unchanged, across runs and leagues, and is never reused once either
+  changes.
+- ratings: the ratings table (mu, sigma, conservative rating mu - 3 sigma,
+  games) of each setup, rewritten after every round.
+
+Ratings are rebuilt at startup by replaying the cached matches of the
+league's agents in insertion order, so adding an agent to a league reuses
+every game already played between the others.
+
+    python Stage4/app/scripts/eval/league.py --agents rulesbased random first numpy:ppo_uno.npz -w 8
+"""
+
+import os
+import sys
+import math
+import time
+import hashlib
+import sqlite3
+import argparse
+import itertools
+from contextlib import closing
+from typing import Dict, List, Optional, Sequence, Tuple
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
+
+from app.scripts.evaluate import DEFAULT_MAX_TURNS, DRAW, iter_chunks
+
+# Paramètres TrueSkill usuels
+MU = 25.0
+SIGMA = MU / 3
+BETA = SIGMA / 2
+TAU = SIGMA / 100
+
+# Sources qui décident des coups de chaque sorte d'agent ("first" est dans evaluate.py)
+AGENT_MODULES = {
+    "rulesbased": ["app/models/agents/rules_agent.py"],
+    "random": ["app/models/agents/random_agent.py"],
+    "first": [],
+    "ppo": ["app/models/agents/ppo_agent.py", "app/models/agents/inference.py"],
+    "numpy": ["app/models/agents/numpy_policy.py"],
+}
+APP_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../'))
+# Code qui décide du résultat d'une partie, en plus des agents
+ENGINE_DIR = "app/models/uno"
+HARNESS_MODULE = "app/scripts/evaluate.py"
+
+
+def agent_hash(spec: str) -> str:
+    """
+    Identity of an agent for the match cache: its kind, the source of its
+    modules (AGENT_MODULES) and the bytes of its weights file.
+
+    Args:
+        spec (str): Agent spec (see evaluate.make_agent).
+
+    Returns:
+        str: 16 hex digits.
+    """
+    kind, _, path = spec.partition(":")
+    if kind not in AGENT_MODULES:
+        raise ValueError(f"Unknown agent: {spec}")
+    digest = hashlib.sha256(kind.encode())
+    files = [os.path.join(APP_ROOT, module) for module in AGENT_MODULES[kind]]
+    if path:
+        # PPO.save("x") écrit x.zip
+        files.append(path if os.path.exists(path) or kind != "ppo" else path + ".zip")
+    for file in files:
+        with open(file, "rb") as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()[:16]
+
+
+def setup_hash(max_turns: int) -> str:
+    """
+    Identity of the game setup for the match cache: the source of the engine
+    modules, of the evaluate.py harness and the max_turns limit.
+
+    Args:
+        max_turns (int): Turns after which a game is a draw.
+
+    Returns:
+        str: 16 hex digits.
+    """
+    engine_dir = os.path.join(APP_ROOT, ENGINE_DIR)
+    files = sorted(os.path.join(engine_dir, name) for name in os.listdir(engine_dir) if name.endswith(".py"))
+    files.append(os.path.join(APP_ROOT, HARNESS_MODULE))
+    digest = hashlib.sha256(f"max_turns={max_turns}".encode())
+    for file in files:
+        with open(file, "rb") as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()[:16]
+
+
+class Rating:
+    """Gaussian skill estimate."""
+
+    def __init__(self, mu: float = MU, sigma: float = SIGMA):
+        self.mu = mu
+        self.sigma = sigma
+        self.games = 0
+
+    @property
+    def conservative(self) -> float:
+        return self.mu - 3 * self.sigma
+
+
+def _pdf(x: float) -> float:
+    return math.exp(-x * x / 2) / math.sqrt(2 * math.pi)
+
+
+def _cdf(x: float) -> float:
+    return (1 + math.erf(x / math.sqrt(2))) / 2
+
+
+def update_ratings(winner: Rating, loser: Rating) -> None:
+    """Two-player TrueSkill update for one decisive game (in place)."""
+    winner_var = winner.sigma ** 2 + TAU ** 2
+    loser_var = loser.sigma ** 2 + TAU ** 2
+    c = math.sqrt(2 * BETA ** 2 + winner_var + loser_var)
+    t = (winner.mu - loser.mu) / c
+    # cdf(t) s'annule pour une grosse surprise : limite asymptotique de v
+    v = _pdf(t) / _cdf(t) if t > -30 else -t
+    w = v * (v + t)
+    winner.mu += winner_var / c * v
+    loser.mu -= loser_var / c * v
+    winner.sigma = math.sqrt(winner_var * max(1 - winner_var / c ** 2 * w, 1e-6))
+    loser.sigma = math.sqrt(loser_var * max(1 - loser_var / c ** 2 * w, 1e-6))
+    winner.games += 1
+    loser.games += 1
+
+
+def match_quality(a: Rating, b: Rating) -> float:
+    """TrueSkill match quality: 1 for equal certain skills, 0 for a foregone result."""
+    c2 = 2 * BETA ** 2 + a.sigma ** 2 + b.sigma ** 2
+    return math.sqrt(2 * BETA ** 2 / c2) * math.exp(-(a.mu - b.mu) ** 2 / (2 * c2))
+
+
+class League:
+    """
+    Agents, their ratings and the match cache of one SQLite file.
+
+    Args:
+        agents (Sequence[str]): Agent specs (see evaluate.make_agent).
+        db_path (str): SQLite file of the match cache and the ratings table.
+        seed (int): First seed of every pairing.
+        max_turns (int): Turns after which a game is a draw (part of the setup hash).
+    """
+
+    def __init__(self, agents: Sequence[str], db_path: str = "uno_league.db", seed: int = 0,
+                 max_turns: int = DEFAULT_MAX_TURNS):
+        if len(set(agents)) < 2:
+            raise ValueError("At least two different agents are needed")
+        self.specs = list(dict.fromkeys(agents))
+        self.hashes = {spec: agent_hash(spec) for spec in self.specs}
+        if len(set(self.hashes.values())) < len(self.specs):
+            raise ValueError("Two agents have the same hash (same kind and weights)")
+        self.seed = seed
+        self.max_turns = max_turns
+        self.setup = setup_hash(max_turns)
+        self.db = sqlite3.connect(db_path)
+        with self.db:
+            self.db.execute("CREATE TABLE IF NOT EXISTS matches ("
+                            "setup TEXT NOT NULL, a TEXT NOT NULL, b TEXT NOT NULL, seed INTEGER NOT NULL, "
+                            "winner INTEGER NOT NULL, turns INTEGER NOT NULL, PRIMARY KEY (setup, a, b, seed))")
+            self.db.execute("CREATE TABLE IF NOT EXISTS ratings ("
+                            "setup TEXT NOT NULL, hash TEXT NOT NULL, spec TEXT NOT NULL, mu REAL NOT NULL, "
+                            "sigma REAL NOT NULL, rating REAL NOT NULL, games INTEGER NOT NULL, updated REAL NOT NULL, "
+                            "PRIMARY KEY (setup, hash))")
+        # Les bases d'avant le setup hash ne disent pas avec quel moteur leurs parties ont été jouées
+        for table in ("matches", "ratings"):
+            if "setup" not in {row[1] for row in self.db.execute(f"PRAGMA table_info({table})")}:
+                self.db.close()
+                raise ValueError(f"{db_path} has no setup hash (older league.py): use a new database")
+        self.ratings: Dict[str, Rating] = {spec: Rating() for spec in self.specs}
+        # Seeds déjà joués par paire (a, b) de specs, a ayant le plus petit hash
+        self.played: Dict[Tuple[str, str], set] = {pairing: set() for pairing in self.pairings()}
+        # Parties du cache réutilisées au lieu d'être rejouées
+        self.cache_hits = 0
+        self._replay_cache()
+
+    def pairings(self) -> List[Tuple[str, str]]:
+        """Every pairing, ordered by agent hash (winner 0 of a cached match is the first agent)."""
+        return [tuple(sorted(pair, key=self.hashes.get)) for pair in itertools.combinations(self.specs, 2)]
+
+    def _replay_cache(self) -> None:
+        by_hash = {h: spec for spec, h in self.hashes.items()}
+        hashes = list(by_hash)
+        marks = ",".join("?" * len(hashes))
+        rows = self.db.execute(f"SELECT a, b, seed, winner FROM matches WHERE setup = ? AND a IN ({marks}) "
+                               f"AND b IN ({marks}) ORDER BY rowid", [self.setup] + hashes + hashes)
+        for a, b, seed, winner in rows:
+            pairing = (by_hash[a], by_hash[b])
+            self.played[pairing].add(seed)
+            self._record(pairing, winner)
+            self.cache_hits += 1
+
+    def _record(self, pairing: Tuple[str, str], winner: int) -> None:
+        if winner != DRAW:
+            update_ratings(self.ratings[pairing[winner]], self.ratings[pairing[1 - winner]])
+
+    def next_seeds(self, pairing: Tuple[str, str], count: int) -> List[int]:
+        """The first `count` seeds from self.seed not yet played by the pairing."""
+        seeds, seed = [], self.seed
+        while len(seeds) < count:
+            if seed not in self.played[pairing]:
+                seeds.append(seed)
+            seed += 1
+        return seeds
+
+    def schedule(self, pairings_per_round: int, games_per_pairing: int,
+                 max_games: Optional[int] = None) -> List[Tuple[Tuple[str, str], List[int]]]:
+        """
+        Work units of the next round: the pairings with the largest
+        match quality x (sigma_a^2 + sigma_b^2), with their next seeds.
+        max_games caps the games of the whole round, split evenly between
+        the pairings.
+        """
+        def information(pairing):
+            a, b = self.ratings[pairing[0]], self.ratings[pairing[1]]
+            return match_quality(a, b) * (a.sigma ** 2 + b.sigma ** 2)
+
+        ranked = sorted(self.pairings(), key=information, reverse=True)[:pairings_per_round]
+        counts = [games_per_pairing] * len(ranked)
+        if max_games is not None:
+            # Répartition du budget, les paires les plus informatives d'abord
+            share, extra = divmod(max_games, len(ranked))
+            counts = [min(games_per_pairing, share + (i < extra)) for i in range(len(ranked))]
+        return [(pairing, self.next_seeds(pairing, count)) for pairing, count in zip(ranked, counts) if count > 0]
+
+    def add_results(self, pairing: Tuple[str, str], games: Sequence[tuple]) -> None:
+        """Cache games (seed, winner, turns) of a pairing and update the ratings, in seed order."""
+        a, b = self.hashes[pairing[0]], self.hashes[pairing[1]]
+        with self.db:
+            self.db.executemany("INSERT OR IGNORE INTO matches (setup, a, b, seed, winner, turns) "
+                                "VALUES (?, ?, ?, ?, ?, ?)",
+                                [(self.setup, a, b, seed, winner, turns) for seed, winner, turns in sorted(games)])
+        for seed, winner, _ in sorted(games):
+            if seed not in self.played[pairing]:
+                self.played[pairing].add(seed)
+                self._record(pairing, winner)
+
+    def save_ratings(self) -> None:
+        now = time.time()
+        with self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO ratings (setup, hash, spec, mu, sigma, rating, games, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(self.setup, self.hashes[spec], spec, r.mu, r.sigma, r.conservative, r.games, now)
+                 for spec, r in self.ratings.items()])
+
+    def table(self) -> List[dict]:
+        """Ratings of the league's agents, best conservative rating first."""
+        rows = [{"agent": spec, "hash": self.hashes[spec], "mu": r.mu, "sigma": r.sigma,
+                 "rating": r.conservative, "games": r.games} for spec, r in self.ratings.items()]
+        return sorted(rows, key=lambda row: row["rating"], reverse=True)
+
+    def close(self) -> None:
+        self.db.close()
+
+
+def run_league(agents: Sequence[str], db_path: str = "uno_league.db", max_games: int = 2000,
+               target_sigma: float = 1.0, workers: int = 1, pairings_per_round: Optional[int] = None,
+               games_per_pairing: int = 20, seed: int = 0, max_turns: int = DEFAULT_MAX_TURNS) -> dict:
+    """
+    Rate agents with adaptively scheduled games.
+
+    Args:
+        agents (Sequence[str]): Agent specs.
+        db_path (str): SQLite file (match cache and ratings table).
+        max_games (int): Budget of new games for this run (cache hits are free).
+        target_sigma (float): Stop when every agent's sigma is below it.
+        workers (int): Worker processes.
+        pairings_per_round (Optional[int]): Pairings played per round
+            (default: enough to keep the workers busy).
+        games_per_pairing (int): Games per pairing and round (one work unit).
+        seed (int): First seed of every pairing.
+        max_turns (int): Turns after which a game is a draw (ignored by the ratings).
+
+    Returns:
+        dict: Ratings table, rounds, new games played, cache hits and seconds.
+    """
+    if pairings_per_round is None:
+        pairings_per_round = max(2 * workers, 1)
+    played = rounds = 0
+    start = time.perf_counter()
+    with closing(League(agents, db_path, seed, max_turns)) as league:
+        while played < max_games and max(r.sigma for r in league.ratings.values()) > target_sigma:
+            units = league.schedule(pairings_per_round, games_per_pairing, max_games - played)
+            for chunk in iter_chunks(units, workers, max_turns):
+                league.add_results(chunk["pairing"], chunk["games"])
+                played += len(chunk["games"])
+            rounds += 1
+            league.save_ratings()
+        league.save_ratings()
+        return {
+            "ratings": league.table(),
+            "rounds": rounds,
+            "games": played,
+            "cache_hits": league.cache_hits,
+            "seconds": time.perf_counter() - start,
+        }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Classement TrueSkill d'agents UNO par ligue adaptative.")
+    parser.add_argument("--agents", nargs="+", required=True,
+                        help="Agents : rulesbased, random, first, ppo:<modèle>, numpy:<politique .npz>.")
+    parser.add_argument("--db", default="uno_league.db", help="Fichier SQLite (cache des parties et classement).")
+    parser.add_argument("--max-games", type=int, default=2000, help="Budget de nouvelles parties.")
+    parser.add_argument("--target-sigma", type=float, default=1.0, help="Incertitude visée pour chaque agent.")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1, help="Nombre de process.")
+    parser.add_argument("--pairings", type=int, help="Paires jouées par tour (défaut : 2 x workers).")
+    parser.add_argument("-c", "--chunk-size", type=int, default=20, help="Parties par paire et par tour.")
+    parser.add_argument("-s", "--seed", type=int, default=0, help="Premier seed de chaque paire.")
+    parser.add_argument("--max-turns", type=int, default=DEFAULT_MAX_TURNS, help="Tours avant match nul.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    report = run_league(args.agents, args.db, args.max_games, args.target_sigma, args.workers, args.pairings,
+                        args.chunk_size, args.seed, args.max_turns)
+    for rank, row in enumerate(report["ratings"], 1):
+        print(f"{rank:3d}. {row['agent']:<30s} rating {row['rating']:7.2f}  mu {row['mu']:6.2f}  "
+              f"sigma {row['sigma']:5.2f}  ({row['games']} games)")
+    print(f"{report['games']} new games in {report['rounds']} rounds ({report['cache_hits']} cached), "
+          f"{report['seconds']:.2f}s")
@@ -3,6 +3,238 @@ evaluate.py
 
 UNO Agent Evaluation Script
 
-This script evaluates a trained agent by running multiple episodes against a benchmark opponent.
+Tournament runner: plays M games for every pairing of the given agents on a
+ProcessPoolExecutor and reports win rates with 95% confidence intervals,
+games/sec and the parallel efficiency per core.
+
+Game i of every pairing uses seed `seed + i` (the same deals for all
+pairings), and the seats are swapped on odd games to cancel the
+first-player advantage. Games are grouped in chunks, one task per chunk, so
+the results do not depend on the number of workers or the chunk size.
+
+Agents: "rulesbased", "random", "first" (plays the first playable card,
+the engine's built-in policy), "ppo:<model path>" and
+"numpy:<.npz policy path>".
+
+    python Stage4/app/scripts/evaluate.py --agents rulesbased random first -m 1000 -w 8
 """
-# Joue plusieurs parties pour évaluer la performance d’un agent
\ No newline at end of file
+
+import os
+import sys
+import math
+import json
+import time
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from app.models.uno.game import Game
+
+DEFAULT_MAX_TURNS = 2000
+DRAW = -1
+
+
+def make_agent(spec: str, seed: Optional[int] = None):
+    """
+    Build an agent from its spec.
+
+    Args:
+        spec (str): "rulesbased", "random", "first", "ppo:<path>" or "numpy:<path>".
+        seed (Optional[int]): Seed of the agent's own RNG (random agent).
+
+    Returns:
+        Agent with choose_action(state, player), or None for "first".
+    """
+    kind, _, path = spec.partition(":")
+    if kind == "rulesbased":
+        from app.models.agents.rules_agent import RuleBasedAgent
+        return RuleBasedAgent()
+    if kind == "random":
+        from app.models.agents.random_agent import RandomAgent
+        return RandomAgent(seed)
+    if kind == "first":
+        return None
+    if kind == "ppo":
+        from app.models.agents.ppo_agent import PPOAgent
+        # Un seul joueur par process : inutile d'attendre d'autres observations
+        return PPOAgent(path, max_wait=0.0) if path else PPOAgent(max_wait=0.0)
+    if kind == "numpy":
+        from app.models.agents.numpy_policy import NumpyPolicyAgent
+        return NumpyPolicyAgent(path) if path else NumpyPolicyAgent()
+    raise ValueError(f"Unknown agent: {spec}")
+
+
+def play_game(specs: Sequence[str], seed: int, max_turns: int = DEFAULT_MAX_TURNS) -> Tuple[int, int]:
+    """
+    Play one game between agents, seat i taken by specs[i].
+
+    Returns:
+        Tuple[int, int]: Winning seat (DRAW if max_turns is reached) and turns played.
+    """
+    agents = [make_agent(spec, seed * len(specs) + seat) for seat, spec in enumerate(specs)]
+    game = Game(num_players=len(specs), seed=seed, agents=agents)
+    game.start()
+    while game.winner is None and game.turn < max_turns:
+        game.play_turn()
+    return (DRAW if game.winner is None else game.winner), game.turn
+
+
+def play_chunk(pairing: Tuple[str, str], seeds: Sequence[int], max_turns: int = DEFAULT_MAX_TURNS) -> dict:
+    """
+    Work unit run in a worker: the games of one pairing for the given seeds.
+    Odd seeds put the second agent in the first seat.
+
+    Returns:
+        dict: pairing, one (seed, winner, turns) per game with winner 0 for
+        pairing[0], 1 for pairing[1] or DRAW, and the worker's elapsed seconds.
+    """
+    start = time.perf_counter()
+    games = []
+    for seed in seeds:
+        swapped = seed % 2 == 1
+        specs = (pairing[1], pairing[0]) if swapped else pairing
+        winner, turns = play_game(specs, seed, max_turns)
+        if swapped and winner != DRAW:
+            winner = 1 - winner
+        games.append((seed, winner, turns))
+    return {"pairing": tuple(pairing), "games": games, "seconds": time.perf_counter() - start}
+
+
+def wilson_interval(successes: float, n: int, z: float = 1.96) -> Tuple[float, float]:
+    """Wilson score interval of a proportion (95% with z = 1.96)."""
+    if n == 0:
+        return 0.0, 1.0
+    p = successes / n
+    denom = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+def work_units(agents: Sequence[str], games: int, seed: int, chunk_size: int) -> List[Tuple[Tuple[str, str], List[int]]]:
+    """Chunks (pairing, seeds) covering `games` games of every pairing of agents."""
+    units = []
+    for pairing in itertools.combinations(agents, 2):
+        for start in range(0, games, chunk_size):
+            units.append((pairing, list(range(seed + start, seed + min(start + chunk_size, games)))))
+    return units
+
+
+def iter_chunks(units, workers: int = 1, max_turns: int = DEFAULT_MAX_TURNS) -> Iterator[dict]:
+    """
+    Play work units and yield each chunk result as soon as it is done
+    (completion order). workers <= 1 plays them in this process.
+    """
+    if workers <= 1:
+        for pairing, seeds in units:
+            yield play_chunk(pairing, seeds, max_turns)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(play_chunk, pairing, seeds, max_turns) for pairing, seeds in units]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def summarize(pairing: Tuple[str, str], games: List[tuple]) -> dict:
+    wins = sum(1 for _, winner, _ in games if winner == 0)
+    losses = sum(1 for _, winner, _ in games if winner == 1)
+    draws = len(games) - wins - losses
+    low, high = wilson_interval(wins, len(games))
+    return {
+        "agent": pairing[0],
+        "opponent": pairing[1],
+        "games": len(games),
+        "wins": wins,
+        "losses": losses,
+        "draws": draws,
+        "win_rate": wins / len(games) if games else 0.0,
+        "ci95": [low, high],
+        "mean_turns": sum(turns for _, _, turns in games) / len(games) if games else 0.0,
+    }
+
+
+def run_tournament(agents: Sequence[str], games: int = 100, workers: int = 1, chunk_size: int = 25, seed: int = 0,
+                   max_turns: int = DEFAULT_MAX_TURNS, on_chunk: Optional[Callable[[dict], None]] = None) -> dict:
+    """
+    Play `games` games for every pairing of `agents`.
+
+    Args:
+        agents (Sequence[str]): Agent specs (see make_agent).
+        games (int): Games per pairing.
+        workers (int): Worker processes (1 = in this process).
+        chunk_size (int): Games per work unit.
+        seed (int): Seed of the first game of each pairing.
+        max_turns (int): Turns after which a game is a draw.
+        on_chunk (Optional[Callable[[dict], None]]): Called with each chunk
+            result as it arrives.
+
+    Returns:
+        dict: One summary per pairing (wins, losses, draws, win rate and its
+        95% CI for the first agent), games/sec, and efficiency: wall-clock
+        games/sec divided by workers x the games/sec of one worker.
+    """
+    if len(set(agents)) < 2:
+        raise ValueError("At least two different agents are needed")
+    units = work_units(agents, games, seed, chunk_size)
+    results: Dict[Tuple[str, str], List[tuple]] = {}
+    busy = 0.0
+    start = time.perf_counter()
+    for chunk in iter_chunks(units, workers, max_turns):
+        results.setdefault(chunk["pairing"], []).extend(chunk["games"])
+        busy += chunk["seconds"]
+        if on_chunk is not None:
+            on_chunk(chunk)
+    elapsed = time.perf_counter() - start
+
+    total = sum(len(g) for g in results.values())
+    per_core = total / busy if busy else 0.0
+    rate = total / elapsed if elapsed else 0.0
+    pairings = [summarize(pairing, sorted(results[pairing])) for pairing in itertools.combinations(agents, 2)]
+    return {
+        "pairings": pairings,
+        "games": total,
+        "workers": max(workers, 1),
+        "seconds": elapsed,
+        "games_per_sec": rate,
+        "games_per_sec_per_core": per_core,
+        "efficiency": rate / (max(workers, 1) * per_core) if per_core else 0.0,
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Tournoi entre agents UNO sur plusieurs process.")
+    parser.add_argument("--agents", nargs="+", default=["rulesbased", "random", "first"],
+                        help="Agents : rulesbased, random, first, ppo:<modèle>, numpy:<politique .npz>.")
+    parser.add_argument("-m", "--games", type=int, default=200, help="Parties par paire d'agents.")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1, help="Nombre de process.")
+    parser.add_argument("-c", "--chunk-size", type=int, default=25, help="Parties par unité de travail.")
+    parser.add_argument("-s", "--seed", type=int, default=0, help="Seed de la première partie.")
+    parser.add_argument("--max-turns", type=int, default=DEFAULT_MAX_TURNS, help="Tours avant match nul.")
+    parser.add_argument("-o", "--output", help="Écrit le rapport JSON dans ce fichier.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    total_units = len(work_units(args.agents, args.games, args.seed, args.chunk_size))
+    done = [0]
+
+    def progress(chunk):
+        done[0] += 1
+        print(f"\r{done[0]}/{total_units} chunks", end="", file=sys.stderr, flush=True)
+
+    report = run_tournament(args.agents, args.games, args.workers, args.chunk_size, args.seed, args.max_turns, progress)
+    print(file=sys.stderr)
+    for p in report["pairings"]:
+        low, high = p["ci95"]
+        print(f"{p['agent']:>20s} vs {p['opponent']:<20s} {p['wins']:5d}-{p['losses']:<5d} ({p['draws']} draws)  "
+              f"win rate {p['win_rate']:.3f} [{low:.3f}, {high:.3f}]")
+    print(f"{report['games']} games in {report['seconds']:.2f}s: {report['games_per_sec']:,.0f} games/sec, "
+          f"{report['games_per_sec_per_core']:,.0f} games/sec/core, "
+          f"efficiency {report['efficiency']:.0%} on {report['workers']} workers")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,284 @@
+import os
+import json
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+import pytest
+from app import create_app
+
+
+@pytest.fixture()
+def client():
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+
+def start(client, num_players=3, seed=4):
+    resp = client.post('/api/start_game', json={'num_players': num_players, 'seed': seed})
+    return resp.get_json()['data']
+
+
+def test_play_turn_delta(client):
+    data = start(client)
+    game_id, turn = data['game_id'], data['state']['turn']
+    played = 0
+    for _ in range(10):
+        resp = client.post('/api/play_turn', json={'game_id': game_id, 'since': turn})
+        delta = resp.get_json()['data']['delta']
+        assert 'state' not in resp.get_json()['data']
+        assert all(event['turn'] >= turn for event in delta['events'])
+        played += sum(event['type'] == 'play' for event in delta['events'])
+        turn = delta['turn']
+
+    state = client.get(f'/api/game_state/{game_id}').get_json()['data']['state']
+    assert len(state['discard_pile']) == 1 + played
+    assert state['cards_left'] == delta['cards_left']
+    assert state['discard_pile'][-1] == delta['top_card']
+
+
+def test_game_state_compact_and_etag(client):
+    game_id = start(client)['game_id']
+    resp = client.get(f'/api/game_state/{game_id}?fields=compact')
+    state = resp.get_json()['data']['state']
+    assert 'discard_pile' not in state and 'top_card' in state
+    etag = resp.headers['ETag']
+
+    assert client.get(f'/api/game_state/{game_id}?fields=compact', headers={'If-None-Match': etag}).status_code == 304
+    client.post('/api/play_turn', json={'game_id': game_id})
+    assert client.get(f'/api/game_state/{game_id}?fields=compact', headers={'If-None-Match': etag}).status_code == 200
+    assert client.get(f'/api/game_state/{game_id}?fields=all').status_code == 400
+
+
+def test_auto_play_runs_bots_until_human_turn(client):
+    data = start(client, num_players=10, seed=3)
+    game_id = data['game_id']
+    client.post('/api/play_turn', json={'game_id': game_id})  # coup du joueur humain (0)
+
+    resp = client.post('/api/auto_play', json={'game_id': game_id, 'fields': 'compact'}).get_json()['data']
+    assert resp['stopped'] in ('human_turn', 'game_over')
+    assert resp['turns_played'] >= 1
+    assert all(event['player'] != 0 for event in resp['events'] if event['type'] == 'play')
+    if resp['stopped'] == 'human_turn':
+        assert resp['state']['current_player'] == 0
+
+    again = client.post('/api/auto_play', json={'game_id': game_id}).get_json()['data']
+    assert again['turns_played'] == 0 and again['events'] == []
+    assert client.post('/api/auto_play', json={'game_id': game_id, 'max_turns': 0}).status_code == 400
+
+
+def read_sse(chunks):
+    # Le flux produit un message SSE complet par morceau : (event, data)
+    text = next(chunks)
+    text = text.decode() if isinstance(text, bytes) else text
+    fields = dict(line.split(': ', 1) for line in text.strip().split('\n'))
+    return fields['event'], json.loads(fields['data'])
+
+
+def test_game_events_stream(client):
+    data = start(client)
+    game_id = data['game_id']
+    resp = client.get(f'/api/game_events/{game_id}?fields=compact')
+    assert resp.mimetype == 'text/event-stream'
+    chunks = iter(resp.response)
+
+    event, sync = read_sse(chunks)
+    assert event == 'sync' and 'top_card' in sync['state']
+
+    played = client.post('/api/play_turn', json={'game_id': game_id, 'since': 0}).get_json()['data']
+    event, update = read_sse(chunks)
+    assert event in ('update', 'game_over')
+    assert update['events'] == played['delta']['events']
+    assert update['cards_left'] == played['delta']['cards_left']
+
+    client.delete(f'/api/delete_game/{game_id}')
+    event, _ = read_sse(chunks)
+    assert event == 'closed'
+    resp.close()
+    assert client.get('/api/stream_stats').get_json()['data']['subscribers'] == 0
+
+
+def test_broadcaster_drops_lagging_subscriber():
+    from app.v1.broadcast import GameBroadcaster
+
+    broadcaster = GameBroadcaster(queue_size=2)
+    slow = broadcaster.subscribe('g')
+    fast = broadcaster.subscribe('g')
+    for i in range(2):
+        assert broadcaster.publish('g', {'event': 'update', 'id': i, 'data': {}}) == 2
+        fast.get(timeout=0)
+    # La file de 'slow' est pleine : il est retiré, 'fast' continue de recevoir
+    assert broadcaster.publish('g', {'event': 'update', 'id': 2, 'data': {}}) == 1
+    assert slow.lagged and not fast.lagged
+    assert broadcaster.subscriber_count('g') == 1
+    assert fast.get(timeout=0)['id'] == 2
+    assert broadcaster.metrics()['dropped'] == 1
+
+
+def test_asgi_app_serves_same_api():
+    import asyncio
+    from app import create_asgi_app
+    from app.v1.asgi import call_asgi
+
+    app = create_asgi_app()
+
+    async def scenario():
+        status, _, body = await call_asgi(app, 'POST', '/api/start_game', {'num_players': 3, 'seed': 4})
+        game_id = json.loads(body)['data']['game_id']
+        # Requêtes concurrentes sur la même partie : exécutées l'une après l'autre
+        replies = await asyncio.gather(*(call_asgi(app, 'POST', '/api/play_turn', {'game_id': game_id})
+                                         for _ in range(10)))
+        assert all(status == 200 for status, _, _ in replies)
+        status, headers, body = await call_asgi(app, 'GET', f'/api/game_state/{game_id}')
+        state = json.loads(body)['data']['state']
+        assert state['turn'] == 10
+        assert sum(state['cards_left']) + len(state['discard_pile']) + state['deck_size'] == 108
+        status, _, _ = await call_asgi(app, 'GET', f'/api/game_state/{game_id}',
+                                       headers={'If-None-Match': headers['etag']})
+        assert status == 304
+        status, _, body = await call_asgi(app, 'POST', '/api/play_turn', {'game_id': 'nope'})
+        assert status == 404 and json.loads(body)['error'] == 'Invalid game_id'
+        return game_id
+
+    game_id = asyncio.run(scenario())
+    assert asyncio.run(call_asgi(app, 'DELETE', f'/api/delete_game/{game_id}'))[0] == 200
+
+
+def test_concurrent_requests_keep_cards_consistent(client, monkeypatch):
+    import threading
+    import time
+    from collections import Counter
+    from app.models.uno.game import Game
+
+    # Mesure les appels simultanés au moteur, par partie et au total ; la pause
+    # libère le GIL pour que les requêtes se chevauchent vraiment
+    active, peak = Counter(), Counter()
+    probe_lock = threading.Lock()
+    local = threading.local()
+
+    def probed(method):
+        def wrapper(self, *args, **kwargs):
+            if getattr(local, 'inside', False):
+                # play_turn appelle draw_cards : seul l'appel extérieur compte
+                return method(self, *args, **kwargs)
+            local.inside = True
+            with probe_lock:
+                active[id(self)] += 1
+                active['all'] += 1
+                peak[id(self)] = max(peak[id(self)], active[id(self)])
+                peak['all'] = max(peak['all'], active['all'])
+            time.sleep(0.0002)
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                local.inside = False
+                with probe_lock:
+                    active[id(self)] -= 1
+                    active['all'] -= 1
+        return wrapper
+
+    monkeypatch.setattr(Game, 'play_turn', probed(Game.play_turn))
+    monkeypatch.setattr(Game, 'draw_cards', probed(Game.draw_cards))
+
+    game_ids = [start(client, num_players=4, seed=seed)['game_id'] for seed in range(2)]
+    plays = Counter()
+    errors = []
+
+    def worker(rank):
+        own = client.application.test_client()
+        game_id = game_ids[rank % 2]
+        for i in range(30):
+            if i % 3 == 2:
+                resp = own.post('/api/draw_cards', json={'game_id': game_id, 'player_idx': rank % 4})
+            else:
+                resp = own.post('/api/play_turn', json={'game_id': game_id})
+                if resp.status_code == 200:
+                    with probe_lock:
+                        plays[game_id] += 1
+            if resp.status_code not in (200, 400):
+                errors.append(resp.status_code)
+            own.get(f'/api/game_state/{game_id}?fields=compact')
+
+    threads = [threading.Thread(target=worker, args=(rank,)) for rank in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    # Jamais deux requêtes en même temps sur une partie, mais les deux parties en parallèle
+    assert max(count for key, count in peak.items() if key != 'all') == 1
+    assert peak['all'] == 2
+    for game_id in game_ids:
+        state = client.get(f'/api/game_state/{game_id}').get_json()['data']['state']
+        assert sum(state['cards_left']) + len(state['discard_pile']) + state['deck_size'] == 108
+        assert [len(hand) for hand in state['hands']] == state['cards_left']
+        if state['winner'] is None:
+            assert state['turn'] == plays[game_id]
+
+
+@pytest.fixture(scope='module')
+def masked_model(tmp_path_factory):
+    from sb3_contrib import MaskablePPO
+    from app.models.envs.uno_env import UnoEnv
+
+    path = str(tmp_path_factory.mktemp('ppo') / 'masked')
+    MaskablePPO('MultiInputPolicy', UnoEnv(seed=0), seed=0, device='cpu').save(path)
+    return path
+
+
+def use_ppo_model(monkeypatch, model_path, **server_options):
+    # agent_type "ppo" avec le modèle de test au lieu de UNO_PPO_MODEL / UNO_PPO_POLICY
+    from app.models.agents.ppo_agent import PPOAgent
+    from app.models.uno import game as game_module
+
+    monkeypatch.setattr(game_module, 'make_ppo_agent', lambda: PPOAgent(model_path, **server_options))
+
+
+def test_ppo_bot_plays_cards(client, masked_model, monkeypatch):
+    use_ppo_model(monkeypatch, masked_model)
+    data = client.post('/api/start_game', json={'num_players': 2, 'seed': 1, 'agent_type': 'ppo'}).get_json()['data']
+    game_id = data['game_id']
+    bot_plays = 0
+    for _ in range(10):
+        client.post('/api/play_turn', json={'game_id': game_id})  # coup du joueur humain (0)
+        resp = client.post('/api/auto_play', json={'game_id': game_id}).get_json()['data']
+        bot_plays += sum(event['type'] == 'play' and event['player'] == 1 for event in resp['events'])
+        if resp['winner'] is not None:
+            break
+    assert bot_plays > 0
+
+
+def test_asgi_ppo_turns_of_concurrent_games_share_batches(masked_model, monkeypatch):
+    import asyncio
+    from app import create_asgi_app
+    from app.models.agents.inference import get_inference_server
+    from app.v1 import handlers
+    from app.v1.asgi import call_asgi
+
+    # Fenêtre de batch large : les tours des parties concurrentes se rejoignent
+    use_ppo_model(monkeypatch, masked_model, max_wait=0.2)
+    app = create_asgi_app(offload=False)
+
+    async def scenario():
+        game_ids = []
+        for seed in range(4):
+            _, _, body = await call_asgi(app, 'POST', '/api/start_game',
+                                         {'num_players': 2, 'seed': seed, 'agent_type': 'ppo'})
+            game_id = json.loads(body)['data']['game_id']
+            await call_asgi(app, 'POST', '/api/play_turn', {'game_id': game_id})  # joueur 0
+            game_ids.append(game_id)
+        # Décidé sur la boucle sans passer par le LRU ni les compteurs du store
+        stats = handlers.store_stats()
+        assert app.uses_policy({'game_id': game_ids[0]}) and not app.uses_policy({'game_id': 'nope'})
+        assert handlers.store_stats() == stats
+        # Tours des bots PPO en parallèle : hors de la boucle, dans le pool de threads
+        replies = await asyncio.gather(*(call_asgi(app, 'POST', '/api/play_turn', {'game_id': game_id})
+                                         for game_id in game_ids))
+        assert all(status == 200 for status, _, _ in replies)
+
+    asyncio.run(scenario())
+    metrics = get_inference_server(masked_model, 64, 0.2).metrics()
+    assert metrics['requests'] >= 2 and metrics['largest_batch'] >= 2
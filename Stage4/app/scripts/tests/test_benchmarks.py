@@ -0,0 +1,17 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+from app.scripts.benchmarks.run_benchmarks import SIZES, run
+
+
+def test_benchmark_suite_emits_json(monkeypatch):
+    monkeypatch.setitem(SIZES, "quick", {"calls": 100, "games": 2, "steps": 50, "encode": 50, "requests": 10,
+                                              "snapshots": 10, "clients": 2})
+    results = json.loads(json.dumps(run(["engine", "env", "api"], quick=True)))
+    assert set(results["results"]) == {"engine", "env", "api"}
+    assert [r["num_players"] for r in results["results"]["engine"]["play_turn"]] == [2, 4, 10]
+    assert results["results"]["api"]["play_turn"]["requests"] == 10
+    assert results["results"]["api"]["load_test"]["asgi"]["requests"] == 10
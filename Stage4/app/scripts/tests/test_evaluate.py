@@ -0,0 +1,26 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+from app.scripts.evaluate import run_tournament, wilson_interval
+
+
+def test_tournament_results_do_not_depend_on_workers_or_chunks():
+    agents = ["rulesbased", "random", "first"]
+    chunks = []
+    serial = run_tournament(agents, games=12, workers=1, chunk_size=12, seed=5)
+    parallel = run_tournament(agents, games=12, workers=2, chunk_size=5, seed=5, on_chunk=chunks.append)
+
+    assert serial["pairings"] == parallel["pairings"]
+    assert len(chunks) == 3 * 3 and sum(len(c["games"]) for c in chunks) == parallel["games"] == 36
+    for p in parallel["pairings"]:
+        assert p["wins"] + p["losses"] + p["draws"] == 12
+        assert p["ci95"][0] <= p["win_rate"] <= p["ci95"][1]
+    assert parallel["games_per_sec"] > 0 and 0 < parallel["efficiency"]
+
+
+def test_wilson_interval():
+    low, high = wilson_interval(50, 100)
+    assert abs(low - 0.4038) < 1e-3 and abs(high - 0.5962) < 1e-3
+    assert wilson_interval(0, 10)[0] == 0.0
@@ -0,0 +1,113 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+from app.models.uno.game import Game
+
+
+def play_out(game, max_turns=400):
+    winner = None
+    for _ in range(max_turns):
+        winner = game.play_turn()
+        if winner is not None:
+            break
+    return winner, game.turn, [list(h) for h in game.hands], list(game.deck)
+
+
+def test_seeded_games_independent_of_interleaving():
+    # Deux parties seedées jouées en alternance donnent le même résultat que jouées seules
+    expected = []
+    for seed in (3, 4):
+        game = Game(num_players=3, seed=seed, agents=[None] * 3)
+        game.start()
+        expected.append(play_out(game))
+
+    games = [Game(num_players=3, seed=seed, agents=[None] * 3) for seed in (3, 4)]
+    for game in games:
+        game.start()
+    for _ in range(400):
+        for game in games:
+            if game.get_winner() is None:
+                game.play_turn()
+            random.random()  # le module random global ne doit pas influencer les parties
+    assert [play_out(g, 0)[1:] for g in games] == [e[1:] for e in expected]
+
+
+def test_reset_replays_same_game():
+    game = Game(num_players=2, seed=7, agents=[None] * 2)
+    game.start()
+    first = play_out(game)
+    game.reset(7)
+    game.start()
+    assert play_out(game) == first
+
+
+def test_state_view_tracks_game():
+    game = Game(num_players=3, seed=11, agents=[None] * 3)
+    game.start()
+    for _ in range(400):
+        state = game.get_state()
+        assert game.get_state() is state
+        assert list(state["cards_left"]) == [len(h) for h in game.hands]
+        assert state["deck_size"] == len(game.deck)
+        assert state["winner"] == next((i for i, h in enumerate(game.hands) if not h), None)
+        if game.play_turn() is not None:
+            break
+    assert game.get_state()["winner"] == game.get_winner() is not None
+    assert not game.hands[game.get_winner()]
+
+
+def test_snapshot_restore_and_clone():
+    for bitset in (False, True):
+        game = Game(num_players=3, seed=13, agents=[None] * 3, bitset_hands=bitset)
+        game.start()
+        for _ in range(25):
+            game.play_turn()
+        data = game.snapshot()
+        assert len(data) == len(game.snapshot()) == 24 + 3 + 108  # en-tête + tailles des mains + 108 cartes
+
+        clone = game.clone()
+        expected = play_out(game)
+        assert play_out(clone) == expected
+
+        restored = Game.from_snapshot(data, agents=[None] * 3)
+        assert restored.snapshot() == data
+        clone.restore(data)
+        assert clone.snapshot() == data and clone.get_state()["cards_left"] == restored.get_state()["cards_left"]
+
+
+def test_auto_play_waits_for_human_wild_color():
+    from app.models.agents.rules_agent import RuleBasedAgent
+    from app.models.uno.encodings import WILD
+
+    game = Game(num_players=2, seed=2, agents=[None, RuleBasedAgent()])
+    game.start()
+    game.draw_four_next = game.draw_two_next = 0
+    game.hands[0][0] = WILD
+    game.play_turn(human_input=0)
+    assert game.awaiting_color and game.auto_play() == 0
+    assert Game.from_snapshot(game.snapshot()).awaiting_color
+
+    game.set_current_color("Red")
+    assert not game.awaiting_color
+    assert game.auto_play() >= 1
+    assert game.winner is not None or game.current_player == 0
+
+
+def test_agent_games_play_cards_and_finish():
+    from app.models.agents.random_agent import RandomAgent
+    from app.models.agents.rules_agent import RuleBasedAgent
+
+    for bitset_hands in (False, True):
+        for seed in range(20):
+            agents = [RuleBasedAgent(), RandomAgent(seed), RuleBasedAgent()]
+            game = Game(num_players=3, seed=seed, agents=agents, bitset_hands=bitset_hands, record_events=True)
+            game.start()
+            winner, turns, hands, deck = play_out(game, max_turns=3000)
+            # Les agents renvoient des ids de carte : ils jouent, la partie se termine
+            assert winner is not None and not hands[winner]
+            assert sum(len(h) for h in hands) + len(deck) + len(game.discard_pile) == 108
+            plays = [e for e in game.events if e[2] == "play"]
+            assert len(plays) > turns // 3
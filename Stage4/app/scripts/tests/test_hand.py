@@ -0,0 +1,62 @@
+import os
+import sys
+import random
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+from app.models.uno.deck import create_deck
+from app.models.uno.game import Game
+from app.models.uno.hand import BitsetHand
+from app.models.uno.rules import get_playable_cards_with_indices
+from app.models.uno.utils import encode_hand, encode_state, state_vector_size
+
+
+def test_bitset_hand_behaves_like_sorted_list():
+    rng = random.Random(0)
+    cards = create_deck(seed=1)[:20]
+    hand = BitsetHand(cards)
+    ref = sorted(cards)
+    for _ in range(15):
+        assert list(hand) == ref
+        assert len(hand) == len(ref)
+        assert (encode_hand(hand) == encode_hand(ref)).all()
+        for top in (0, 20, 52):
+            for color in range(4):
+                assert hand.playable_indices(top, color) == get_playable_cards_with_indices(ref, top, color)
+        idx = rng.randrange(len(ref))
+        assert hand[idx] == ref[idx]
+        assert hand.index(ref[idx]) == ref.index(ref[idx])
+        del hand[idx]
+        del ref[idx]
+
+
+def test_game_with_bitset_hands_conserves_cards():
+    for seed in range(20):
+        game = Game(num_players=4, seed=seed, agents=[None] * 4, bitset_hands=True)
+        game.start()
+        for _ in range(500):
+            if game.play_turn() is not None:
+                break
+            total = len(game.deck) + len(game.discard_pile) + sum(len(h) for h in game.hands)
+            assert total == 108
+
+
+def test_encode_into_buffer_matches_allocating_encoder():
+    for bitset in (False, True):
+        game = Game(num_players=3, seed=5, agents=[None] * 3, bitset_hands=bitset)
+        game.start()
+        hand_buf = np.full(54, 9.0, dtype=np.float32)
+        state_buf = np.full(state_vector_size(3), 9.0, dtype=np.float32)
+        for _ in range(30):
+            if game.play_turn() is not None:
+                break
+            state = game.get_state()
+            assert encode_hand(state["hands"][1], out=hand_buf) is hand_buf
+            assert (hand_buf == encode_hand(state["hands"][1])).all()
+            assert encode_state(state, 1, out=state_buf) is state_buf
+            assert (state_buf == encode_state(state, 1)).all()
+            # [main | top_card one-hot sur les 54 types | tailles des mains]
+            assert state_buf.shape == (54 + 54 + 3,) and state_buf[54 + state["discard_pile"][-1]] == 1.0
+            assert state_buf[54:108].sum() == 1.0
@@ -0,0 +1,147 @@
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+import pytest
+
+from app.models.uno.game import Game
+
+
+@pytest.fixture(scope="module")
+def model_path(tmp_path_factory):
+    from stable_baselines3 import PPO
+    from app.models.envs.uno_env import UnoEnv
+
+    path = str(tmp_path_factory.mktemp("ppo") / "ppo_uno")
+    PPO("MultiInputPolicy", UnoEnv(seed=0), seed=0, device="cpu").save(path)
+    return path
+
+
+def test_batched_inference_matches_single_predictions(model_path):
+    from app.models.agents.inference import BatchInferenceServer, load_policy
+    from app.models.uno.utils import encode_observation
+
+    model = load_policy(model_path)
+    assert load_policy(model_path) is model
+    server = BatchInferenceServer(model, max_batch_size=16, max_wait=0.05)
+
+    observations = []
+    for seed in range(24):
+        game = Game(num_players=3, seed=seed)
+        game.start()
+        observations.append(encode_observation(game.get_state(), 1))
+    expected = [int(model.predict({k: v[None] for k, v in obs.items()}, deterministic=True)[0][0])
+                for obs in observations]
+
+    # Les soumissions concurrentes partagent les passes avant
+    results = [None] * len(observations)
+    def submit(i):
+        results[i] = server.predict(observations[i], timeout=10)
+    threads = [threading.Thread(target=submit, args=(i,)) for i in range(len(observations))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    server.close()
+
+    assert results == expected
+    metrics = server.metrics()
+    assert metrics["requests"] == 24
+    assert metrics["batches"] < 24 and metrics["largest_batch"] <= 16
+
+
+def test_ppo_agents_share_one_server(model_path):
+    from app.models.agents.ppo_agent import PPOAgent
+    from app.models.uno.encodings import DRAW_ACTION
+
+    agents = [None, PPOAgent(model_path), PPOAgent(model_path)]
+    assert agents[1].server is agents[2].server
+    game = Game(num_players=3, seed=3, agents=agents)
+    game.start()
+    action = agents[1].choose_action(game.get_state(), 1)
+    assert 0 <= action < 54 or action == DRAW_ACTION
+    for _ in range(30):
+        game.play_turn()
+    assert sum(game.hand_sizes) + len(game.deck) + len(game.discard_pile) == 108
+
+
+def test_numpy_policy_matches_torch_policy(model_path, tmp_path):
+    import numpy as np
+    import torch
+    from app.models.agents.inference import load_policy
+    from app.models.agents.numpy_policy import NumpyPolicy, NumpyPolicyAgent, legal_action_mask
+    from app.models.agents.ppo_agent import PPOAgent
+    from app.models.uno.utils import encode_observation
+    from app.scripts.training.export_policy import export_policy
+
+    policy_path = export_policy(model_path, str(tmp_path / "ppo_uno.npz"))
+    policy = NumpyPolicy.load(policy_path)
+    model = load_policy(model_path)
+
+    states = []
+    for seed in range(40):
+        game = Game(num_players=2 + seed % 3, seed=seed)
+        game.start()
+        for _ in range(seed % 9):
+            game.play_turn()
+        states.append((game.get_state(), game.current_player))
+    observations = [encode_observation(state, player) for state, player in states]
+    batch = {key: np.stack([obs[key] for obs in observations]) for key in observations[0]}
+
+    # Log-probabilités identiques à la précision float32 près
+    with torch.no_grad():
+        expected = model.policy.get_distribution(model.policy.obs_to_tensor(batch)[0]).distribution.logits.numpy()
+    logits = policy.logits(batch)
+    log_probs = logits - logits.max(axis=1, keepdims=True)
+    log_probs -= np.log(np.exp(log_probs).sum(axis=1, keepdims=True))
+    np.testing.assert_allclose(log_probs, expected, atol=1e-4)
+
+    numpy_agent, torch_agent = NumpyPolicyAgent(policy_path), PPOAgent(model_path)
+    assert [numpy_agent.choose_action(s, p) for s, p in states] == [torch_agent.choose_action(s, p) for s, p in states]
+
+    masked = NumpyPolicyAgent(policy_path, mask_actions=True)
+    for state, player in states:
+        action = masked.choose_action(state, player)
+        assert legal_action_mask(state, player)[min(action, 54)]
+
+
+def test_masked_model_only_plays_legal_actions(tmp_path):
+    from sb3_contrib import MaskablePPO
+    from app.models.agents.numpy_policy import NumpyPolicyAgent, legal_action_mask
+    from app.models.agents.ppo_agent import PPOAgent
+    from app.models.envs.uno_env import UnoEnv
+    from app.scripts.training.export_policy import export_policy
+
+    model_path = str(tmp_path / "masked")
+    MaskablePPO("MultiInputPolicy", UnoEnv(seed=0), seed=0, device="cpu").save(model_path)
+    policy_path = export_policy(model_path, str(tmp_path / "masked.npz"))
+
+    torch_agent, numpy_agent = PPOAgent(model_path), NumpyPolicyAgent(policy_path)
+    assert torch_agent.server.masked and numpy_agent.mask_actions
+    for seed in range(20):
+        game = Game(num_players=2, seed=seed)
+        game.start()
+        state, player = game.get_state(), game.current_player
+        action = torch_agent.choose_action(state, player)
+        assert legal_action_mask(state, player)[min(action, 54)]
+        assert numpy_agent.choose_action(state, player) == action
+
+
+def test_failing_batch_fails_its_callers_and_keeps_serving():
+    import numpy as np
+    from app.models.agents.inference import BatchInferenceServer
+
+    class FirstAction:
+        def predict(self, obs, deterministic=True):
+            return np.zeros(len(obs["hand"]), dtype=np.int64), None
+
+    server = BatchInferenceServer(FirstAction(), max_batch_size=2, max_wait=1.0)
+    # Observations de formes différentes : np.stack échoue pour tout le batch
+    bad = [server.submit({"hand": np.zeros(54)}), server.submit({"hand": np.zeros(3)})]
+    for future in bad:
+        with pytest.raises(ValueError):
+            future.result(timeout=5)
+    assert server.predict({"hand": np.zeros(54)}, timeout=5) == 0
+    server.close()
@@ -0,0 +1,62 @@
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+from app.scripts.eval.league import League, Rating, run_league, update_ratings
+
+
+def test_trueskill_update():
+    winner, loser = Rating(), Rating()
+    update_ratings(winner, loser)
+    assert winner.mu > 25 > loser.mu and winner.sigma < 25 / 3 and loser.sigma < 25 / 3
+
+
+def test_league_caches_matches_and_rebuilds_ratings(tmp_path):
+    db = str(tmp_path / "league.db")
+    report = run_league(["rulesbased", "random"], db, max_games=40, target_sigma=0.0, workers=2,
+                        games_per_pairing=10)
+    assert report["games"] == 40 and report["rounds"] == 4 and report["cache_hits"] == 0
+
+    # Les notes sont reconstruites depuis le cache, et les seeds joués ne sont pas rejoués
+    league = League(["rulesbased", "random", "first"], db)
+    assert league.cache_hits == 40
+    first = league.ratings["first"]
+    assert (first.mu, first.games) == (25.0, 0)
+    old = {row["agent"]: row for row in report["ratings"]}
+    assert league.ratings["random"].mu == old["random"]["mu"]
+    pairing = tuple(sorted(("rulesbased", "random"), key=league.hashes.get))
+    assert league.next_seeds(pairing, 3) == [40, 41, 42]
+    # Le nouvel agent est le plus incertain : ses paires passent en premier
+    assert all("first" in pairing for pairing, _ in league.schedule(2, 10))
+    league.close()
+
+    run_league(["rulesbased", "random", "first"], db, max_games=40, target_sigma=0.0, games_per_pairing=10)
+    with sqlite3.connect(db) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM matches").fetchone()[0] == 80
+        assert conn.execute("SELECT COUNT(*) FROM ratings").fetchone()[0] == 3
+
+
+def test_league_cache_is_keyed_by_setup(tmp_path, monkeypatch):
+    from app.scripts.eval import league as league_module
+
+    db = str(tmp_path / "league.db")
+    run_league(["rulesbased", "random"], db, max_games=10, target_sigma=0.0, games_per_pairing=10)
+
+    def cache_hits(**kwargs):
+        league = League(["rulesbased", "random"], db, **kwargs)
+        league.close()
+        return league.cache_hits
+
+    assert cache_hits() == 10
+    # Autre limite de tours, ou autre code moteur : les parties du cache ne comptent plus
+    assert cache_hits(max_turns=50) == 0
+    monkeypatch.setattr(league_module, "ENGINE_DIR", "app/models/agents")
+    assert cache_hits() == 0
+
+
+def test_league_round_stays_within_budget(tmp_path):
+    report = run_league(["rulesbased", "random", "first"], str(tmp_path / "league.db"), max_games=25,
+                        target_sigma=0.0, pairings_per_round=3, games_per_pairing=10)
+    assert report["games"] == 25 and report["rounds"] == 1
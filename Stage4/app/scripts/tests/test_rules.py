@@ -0,0 +1,81 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+from app.models.uno.constants import COLORS
+from app.models.uno.deck import create_deck
+from app.models.uno.encodings import ALL_CARDS, card_to_str, str_to_card
+from app.models.uno.rules import (
+    PLAYABLE_MASK, PLAYABLE_TABLE, is_playable, calculate_card_points,
+    get_playable_cards_with_indices, legal_action_mask
+)
+from app.models.uno.hand import BitsetHand
+
+
+def legacy_is_playable(card, top_card, current_color):
+    # Reference implementation on card names (pre card-id engine)
+    card_parts = card.split()
+    top_parts = top_card.split()
+    if card_parts[0] == 'Wild':
+        return True
+    card_value = " ".join(card_parts[1:]) if len(card_parts) > 1 else None
+    top_value = " ".join(top_parts[1:]) if len(top_parts) > 1 else None
+    return card_parts[0] == current_color or card_value == top_value
+
+
+def test_card_round_trip():
+    for card_id, name in enumerate(ALL_CARDS):
+        assert str_to_card(name) == card_id
+        assert card_to_str(card_id) == name
+    assert str_to_card("Red Wild +4") == str_to_card("Wild +4")
+
+
+def test_deck_composition():
+    deck = create_deck(seed=0)
+    assert len(deck) == 108
+    assert sorted(deck) == sorted(create_deck(seed=1))
+    assert deck == create_deck(seed=0)
+
+
+def test_is_playable_matches_legacy():
+    for card_id, card in enumerate(ALL_CARDS):
+        for top_id, top in enumerate(ALL_CARDS):
+            for color_idx, color in enumerate(COLORS):
+                expected = legacy_is_playable(card, top, color)
+                assert is_playable(card_id, top_id, color_idx) == expected, (card, top, color)
+
+
+def test_playable_tables_agree():
+    assert PLAYABLE_TABLE.shape == (len(ALL_CARDS), len(ALL_CARDS), len(COLORS))
+    for top in range(len(ALL_CARDS)):
+        for color in range(len(COLORS)):
+            mask = PLAYABLE_MASK[top][color]
+            for card in range(len(ALL_CARDS)):
+                assert bool(mask >> card & 1) == PLAYABLE_TABLE[card, top, color]
+
+
+def test_playable_indices():
+    hand = [str_to_card(c) for c in ["Red 5", "Blue 7", "Wild", "Green 5"]]
+    top = str_to_card("Yellow 5")
+    assert get_playable_cards_with_indices(hand, top, COLORS.index("Blue")) == [0, 1, 2, 3]
+    assert get_playable_cards_with_indices(hand, str_to_card("Yellow 1"), COLORS.index("Yellow")) == [2]
+
+
+def test_legal_action_mask():
+    hand = [str_to_card(c) for c in ["Red 5", "Blue 7", "Wild", "Red 5"]]
+    draw = len(ALL_CARDS)
+    for h in (hand, BitsetHand(hand)):
+        mask = legal_action_mask(h, str_to_card("Yellow 1"), COLORS.index("Yellow"))
+        assert mask.shape == (draw + 1,) and list(mask.nonzero()[0]) == [str_to_card("Wild")]
+        mask = legal_action_mask(h, str_to_card("Red 1"), COLORS.index("Red"))
+        assert sorted(mask.nonzero()[0]) == sorted({str_to_card("Red 5"), str_to_card("Wild")})
+    # Rien de jouable : seule la pioche est légale
+    mask = legal_action_mask([str_to_card("Blue 7")], str_to_card("Yellow 1"), COLORS.index("Yellow"))
+    assert list(mask.nonzero()[0]) == [draw]
+
+
+def test_card_points():
+    assert calculate_card_points(str_to_card("Red 7")) == 7
+    assert calculate_card_points(str_to_card("Blue Skip")) == 20
+    assert calculate_card_points(str_to_card("Wild +4")) == 50
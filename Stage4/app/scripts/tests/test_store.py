@@ -0,0 +1,201 @@
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+from app.models.uno.game import Game
+from app.v1.store import GameStore, MemoryGameStore, SQLiteGameStore, dump_game, load_game
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_game_store_is_abstract():
+    with pytest.raises(TypeError):
+        GameStore()
+
+    class NoMetrics(GameStore):
+        get = put = delete = lambda self, *args: None
+
+    with pytest.raises(TypeError):
+        NoMetrics()
+
+
+def test_lru_eviction():
+    store = MemoryGameStore(max_games=2, ttl=None)
+    store.put("a", "game a")
+    store.put("b", "game b")
+    assert store.get("a") == "game a"  # "b" devient le moins récemment utilisé
+    store.put("c", "game c")
+    assert store.get("b") is None
+    assert store.get("a") == "game a" and store.get("c") == "game c"
+    metrics = store.metrics()
+    assert metrics["live"] == 2 and metrics["evicted_lru"] == 1
+    assert metrics["hits"] == 3 and metrics["misses"] == 1
+
+
+def test_idle_ttl_eviction():
+    clock = FakeClock()
+    store = MemoryGameStore(max_games=10, ttl=60, clock=clock)
+    store.put("a", "game a")
+    store.put("b", "game b")
+    clock.now = 50
+    assert store.get("a") == "game a"
+    clock.now = 100
+    assert store.get("b") is None
+    store.put("c", "game c")
+    assert len(store) == 2
+    clock.now = 200
+    store.put("d", "game d")
+    assert len(store) == 1 and store.metrics()["evicted_ttl"] == 3
+    assert store.delete("d") and not store.delete("d")
+
+
+def play(game, turns):
+    for _ in range(turns):
+        if game.play_turn() is not None:
+            break
+    return game.turn, [list(h) for h in game.hands], list(game.deck), list(game.discard_pile)
+
+
+def test_dump_load_round_trip():
+    for bitset in (False, True):
+        game = Game(num_players=3, seed=9, agents=[None] * 3, bitset_hands=bitset)
+        game.start()
+        play(game, 40)
+        data = dump_game(game)
+        copy = load_game(data)
+        copy.agents = [None] * 3
+        assert dump_game(copy) == data
+        assert play(copy, 300) == play(game, 300)
+
+
+def test_sqlite_store_shared_between_workers(tmp_path):
+    path = str(tmp_path / "games.db")
+    worker_a = SQLiteGameStore(path, max_games=2, ttl=None)
+    worker_b = SQLiteGameStore(path, max_games=2, ttl=None)
+    game = Game(num_players=2, seed=1)
+    game.start()
+    worker_a.put("g1", game)
+    with worker_b.checkout("g1") as loaded:
+        loaded.play_turn()
+        turn = loaded.turn
+    assert worker_a.get("g1").turn == turn
+    worker_a.put("g2", game)
+    worker_a.put("g3", game)
+    assert worker_b.get("g1") is None and len(worker_b) == 2
+    assert worker_b.delete("g3") and worker_a.get("g3") is None
+
+
+def test_sqlite_checkout_is_optimistic(tmp_path):
+    from app.v1.handlers import retry_conflicts
+    from app.v1.store import GameConflict
+
+    path = str(tmp_path / "games.db")
+    worker_a = SQLiteGameStore(path, ttl=None)
+    worker_b = SQLiteGameStore(path, ttl=None)
+    game = Game(num_players=2, seed=1, agents=[None] * 2)
+    game.start()
+    worker_a.put("g1", game)
+
+    # Pas de verrou pendant la requête : l'autre worker écrit, la réécriture de A échoue
+    with pytest.raises(GameConflict):
+        with worker_a.checkout("g1") as loaded:
+            loaded.play_turn()
+            worker_b.put("g1", game)
+    assert worker_b.get("g1").turn == game.turn
+
+    attempts = []
+
+    @retry_conflicts
+    def play(game_id):
+        with worker_a.checkout(game_id) as loaded:
+            attempts.append(loaded.turn)
+            loaded.play_turn()
+            if len(attempts) == 1:
+                with worker_b.checkout(game_id) as other:
+                    other.play_turn()
+        return loaded.turn
+
+    # Rejouée sur la partie relue : les deux tours sont enregistrés
+    assert play("g1") == game.turn + 2 == worker_b.get("g1").turn
+    assert attempts == [game.turn, game.turn + 1]
+
+
+def test_sqlite_store_keeps_event_log(tmp_path):
+    from app.v1.serializers import serialize_delta
+
+    path = str(tmp_path / "games.db")
+    worker_a = SQLiteGameStore(path, ttl=None)
+    worker_b = SQLiteGameStore(path, ttl=None)
+    game = Game(num_players=2, seed=3, agents=[None] * 2, record_events=True)
+    game.start()
+    worker_a.put("g1", game)
+    for _ in range(29):
+        with worker_a.checkout("g1") as loaded:
+            loaded.play_turn()
+    with worker_b.checkout("g1") as loaded:
+        loaded.play_turn()
+    for _ in range(30):
+        game.play_turn()
+
+    loaded = worker_a.get("g1")
+    assert loaded.events == game.events and loaded.events_start_turn == game.events_start_turn
+    assert any(kind == "draw" for _, _, kind, _ in loaded.events)
+    assert serialize_delta(loaded, 2) == serialize_delta(game, 2) is not None
+
+
+def test_sqlite_memory_store_is_shared_between_threads():
+    import threading
+
+    store = SQLiteGameStore(":memory:", ttl=None)
+    game = Game(num_players=2, seed=1)
+    game.start()
+    store.put("a", game)
+    found = []
+    thread = threading.Thread(target=lambda: found.append((store.get("a"), store.put("b", game))))
+    thread.start()
+    thread.join()
+    assert found[0][0].turn == game.turn and len(store) == 2
+
+
+def test_sqlite_event_log_is_appended_and_trimmed(tmp_path):
+    from app.v1.serializers import serialize_delta
+
+    clock = FakeClock()
+    store = SQLiteGameStore(str(tmp_path / "games.db"), ttl=None, clock=clock, event_log_turns=5)
+    game = Game(num_players=2, seed=3, agents=[None] * 2, record_events=True)
+    game.start()
+    store.put("g1", game)
+    for _ in range(30):
+        with store.checkout("g1") as loaded:
+            loaded.play_turn()
+        game.play_turn()
+
+    loaded = store.get("g1")
+    assert loaded.events_start_turn == game.turn - 5
+    assert loaded.events == game.events_since(game.turn - 5)
+    assert serialize_delta(loaded, game.turn - 3) == serialize_delta(game, game.turn - 3) is not None
+    # Trop ancien pour le journal gardé : l'appelant renvoie l'état complet
+    assert serialize_delta(loaded, 2) is None
+    with sqlite3.connect(str(tmp_path / "games.db")) as db:
+        turns = [turn for turn, in db.execute("SELECT turn FROM events WHERE game_id = 'g1'")]
+    assert min(turns) >= game.turn - 6 and len(turns) < len(game.events)
+
+    # Une lecture ne réécrit le dernier accès qu'au plus une fois par touch_interval
+    clock.now = 0.5
+    store.get("g1")
+    with sqlite3.connect(str(tmp_path / "games.db")) as db:
+        assert db.execute("SELECT last_access FROM games").fetchone()[0] == 0.0
+    clock.now = 2.0
+    store.get("g1")
+    with sqlite3.connect(str(tmp_path / "games.db")) as db:
+        assert db.execute("SELECT last_access FROM games").fetchone()[0] == 2.0
@@ -0,0 +1,222 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+import numpy as np
+
+from app.models.envs.uno_env import UnoEnv
+from app.models.envs.vec_uno_env import VecUnoEnv
+from app.models.uno.batch import BatchedGames, DRAW_ACTION
+
+
+def check_invariants(engine):
+    cards = engine.hands.sum(axis=(1, 2)) + (engine.deck_size - engine.deck_pos) + engine.discard.sum(axis=1)
+    assert (cards == 108).all()
+    assert (engine.hands >= 0).all()
+    assert (engine.hand_sizes == engine.hands.sum(axis=2)).all()
+    bits = ((engine.hands > 0) * (np.uint64(1) << np.arange(engine.hands.shape[2], dtype=np.uint64))).sum(axis=2, dtype=np.uint64)
+    assert (bits == engine.hand_bits).all()
+
+
+def test_batched_games_run_to_completion():
+    for num_players in (2, 3, 4):
+        engine = BatchedGames(32, num_players=num_players, seed=num_players)
+        engine.reset()
+        check_invariants(engine)
+        games = np.arange(32)
+        for _ in range(2000):
+            running = games[engine.winner < 0]
+            if not running.size:
+                break
+            engine.apply_actions(running, engine.rule_based_actions(running))
+            check_invariants(engine)
+        assert (engine.winner >= 0).all()
+
+
+def test_illegal_card_draws_and_passes():
+    engine = BatchedGames(4, seed=0)
+    engine.reset()
+    games = np.arange(4)
+    mask = engine.playable_mask(games, engine.current_player)
+    illegal = np.array([np.flatnonzero(~row)[0] for row in mask])
+    played, _ = engine.apply_actions(games, illegal)
+    assert not played.any()
+    assert (engine.hand_sizes[:, 0] == 8).all()
+    assert (engine.current_player == 1).all()
+
+
+def test_vec_env_step_and_autoreset():
+    env = VecUnoEnv(num_envs=16, seed=0, max_steps=50)
+    obs, _ = env.reset(seed=0)
+    assert env.observation_space.contains(obs)
+    rng = np.random.default_rng(0)
+    done_seen = False
+    for _ in range(300):
+        actions = np.where(rng.random(16) < 0.8, env.engine.rule_based_actions(np.arange(16)), DRAW_ACTION)
+        obs, rewards, terminated, truncated, _ = env.step(actions)
+        assert env.observation_space.contains(obs)
+        check_invariants(env.engine)
+        done = terminated | truncated
+        if done.any():
+            done_seen = True
+            obs, rewards, terminated, truncated, _ = env.step(actions)
+            # Finished sub-envs come back freshly dealt with a zero reward
+            assert (rewards[done] == 0).all()
+            assert (env.engine.turn[done] == 0).all()
+    assert done_seen
+
+
+def test_uno_env_action_masks_allow_only_legal_actions():
+    for bitset_hands in (False, True):
+        env = UnoEnv(seed=1, bitset_hands=bitset_hands)
+        rng = np.random.default_rng(0)
+        obs, info = env.reset()
+        for _ in range(500):
+            mask = env.action_masks()
+            assert (info["action_mask"] == mask).all() and mask.any()
+            # Une action légale n'est jamais pénalisée comme illégale
+            obs, reward, done, _, info = env.step(int(rng.choice(np.flatnonzero(mask))))
+            assert reward > -1.0
+            if done:
+                obs, info = env.reset()
+
+
+def test_self_play_trains_against_pool_snapshots():
+    from sb3_contrib import MaskablePPO
+    from app.models.envs.self_play_vec_env import SelfPlayVecEnv
+    from app.scripts.training.callbacks import SnapshotCallback
+    from app.scripts.training.opponent_pool import OpponentPool
+
+    pool = OpponentPool(max_size=2, seed=0)
+    env = SelfPlayVecEnv(pool, num_envs=4, seed=0, max_steps=100)
+    model = MaskablePPO("MultiInputPolicy", env, n_steps=32, batch_size=64, n_epochs=1, seed=0, device="cpu")
+    pool.add(model)
+    model.learn(32 * 4 * 3, callback=SnapshotCallback(pool, every=1))
+    assert pool.added == 4 and len(pool) == 2 and pool.snapshots[0].masked
+
+    # C'est toujours au tour de l'apprenant, et aucune carte n'est perdue
+    for i, sub in enumerate(env.envs):
+        game = sub.game
+        assert game.current_player == env.learners[i]
+        assert sum(len(hand) for hand in game.hands) + len(game.deck) + len(game.discard_pile) == 108
+    obs, rewards, dones, infos = env.step(np.array([mask.nonzero()[0][0] for mask in env.env_method("action_masks")]))
+    assert env.observation_space.contains({key: value[0] for key, value in obs.items()})
+    assert all((info["action_mask"] == mask).all() for info, mask in zip(infos, env.env_method("action_masks")))
+
+
+def test_uno_env_opponent_turns_do_not_recurse():
+    from app.models.agents.rules_agent import RuleBasedAgent
+
+    rules = RuleBasedAgent()
+    calls = []
+    def opponent(env, state):
+        calls.append(state["current_player"])
+        return rules.choose_action(state, state["current_player"])
+
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(200)
+    try:
+        for num_players in (2, 4, 10):
+            env = UnoEnv(seed=num_players, opponent_agent_fn=opponent, num_players=num_players)
+            obs, info = env.reset()
+            learner = env.game.current_player
+            done, steps = False, 0
+            while not done and steps < 2000:
+                calls.clear()
+                obs, reward, done, _, info = env.step(int(np.flatnonzero(info["action_mask"])[0]))
+                steps += 1
+                # Les adversaires jouent à plat, jamais à la place de l'apprenant
+                assert learner not in calls
+                assert env.observation_space.contains(obs)
+                if not done:
+                    assert env.game.current_player == learner
+            assert done
+    finally:
+        sys.setrecursionlimit(limit)
+
+
+def test_uno_env_resets_deal_new_hands_unless_seeded():
+    env = UnoEnv(seed=3)
+    hands = [tuple(env.reset()[0]["hand"]) for _ in range(4)]
+    assert len(set(hands)) == 4
+    # Un seed explicite rejoue la même donne
+    assert tuple(env.reset(seed=7)[0]["hand"]) == tuple(env.reset(seed=7)[0]["hand"])
+    # Deux envs de même seed restent identiques d'un épisode à l'autre
+    other = UnoEnv(seed=3)
+    assert [tuple(other.reset()[0]["hand"]) for _ in range(4)] == hands
+
+
+def test_uno_env_fast_reset_deals_fresh_full_game():
+    for bitset_hands in (False, True):
+        env = UnoEnv(seed=5, bitset_hands=bitset_hands, num_players=3)
+        obs, info = env.reset()
+        game = env.game
+        for episode in range(5):
+            previous = [sorted(hand) for hand in game.hands]
+            for _ in range(20):
+                obs, _, done, _, info = env.step(int(np.flatnonzero(info["action_mask"])[0]))
+                if done:
+                    break
+            obs, info = env.reset()
+            # Même Game réutilisé, remis à neuf : 108 cartes, 7 par main, une carte retournée
+            assert env.game is game and game.winner is None and game.turn == 0
+            assert [len(hand) for hand in game.hands] == [7, 7, 7] and game.hand_sizes == [7, 7, 7]
+            assert len(game.discard_pile) == 1
+            assert sum(len(hand) for hand in game.hands) + len(game.deck) + len(game.discard_pile) == 108
+            assert [sorted(hand) for hand in game.hands] != previous
+
+
+def test_uno_env_terminal_observation_survives_reset():
+    # Comme un worker SubprocVecEnv : terminal_observation gardée, puis reset() avant l'envoi
+    env = UnoEnv(seed=2, copy_obs=False)
+    obs, info = env.reset()
+    done = False
+    while not done:
+        obs, reward, done, _, info = env.step(int(np.flatnonzero(info["action_mask"])[0]))
+    terminal = obs
+    reset_obs, _ = env.reset()
+    assert terminal["hand"] is not reset_obs["hand"]
+    # Sans adversaire actif, seul l'apprenant gagne : main vide à la fin
+    assert terminal["hand"].sum() == 0 and reset_obs["hand"].sum() == 7
+
+
+def test_self_play_rewards_learner_wins_from_every_seat():
+    from sb3_contrib import MaskablePPO
+    from app.models.envs.self_play_vec_env import LOSS_REWARD, WIN_REWARD, SelfPlayVecEnv
+    from app.scripts.training.opponent_pool import OpponentPool
+
+    pool = OpponentPool(seed=0)
+    env = SelfPlayVecEnv(pool, num_envs=8, seed=0, max_steps=200)
+    pool.add(MaskablePPO("MultiInputPolicy", env, n_steps=32, batch_size=32, seed=0, device="cpu"))
+    env.reset()
+    wins_by_seat = set()
+    for _ in range(400):
+        learners = list(env.learners)
+        obs, rewards, dones, infos = env.step(np.array([mask.nonzero()[0][0] for mask in env.env_method("action_masks")]))
+        for i in np.flatnonzero(dones):
+            if infos[i]["winner"] == learners[i]:
+                assert rewards[i] == WIN_REWARD
+                wins_by_seat.add(learners[i])
+            elif infos[i]["winner"] is not None:
+                assert rewards[i] == LOSS_REWARD
+    assert wins_by_seat == {0, 1}
+
+
+def test_shared_memory_vec_env_addresses_only_given_indices():
+    from app.models.envs.shared_memory_vec_env import SharedMemoryVecEnv
+    from app.models.uno.constants import COLORS
+
+    env = SharedMemoryVecEnv([lambda i=i: UnoEnv(seed=i) for i in range(3)], context="fork")
+    try:
+        env.reset()
+        env.set_attr("verbose", True, indices=[1])
+        assert env.get_attr("verbose") == [False, True, False]
+
+        colors = [game.current_color for game in env.get_attr("game")]
+        color = next(c for c in range(len(COLORS)) if c not in colors)
+        assert env.env_method("set_current_color", COLORS[color], indices=[2]) == [True]
+        assert [game.current_color for game in env.get_attr("game")] == colors[:2] + [color]
+        assert len(env.env_method("action_masks", indices=[0, 2])) == 2
+    finally:
+        env.close()
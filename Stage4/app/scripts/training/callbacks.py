@@ -0,0 +1,59 @@
+# callbacks.py
+
+import time
+import logging
+
+from stable_baselines3.common.callbacks import BaseCallback
+
+
+class ThroughputCallback(BaseCallback):
+    """
+    Mesure le temps de chaque rollout et le débit de l'environnement.
+
+    Enregistre `time/rollout_seconds` et `time/env_steps_per_sec` dans le
+    logger SB3 (console + TensorBoard) et les écrit dans les logs.
+    """
+
+    def __init__(self, verbose: int = 0):
+        super().__init__(verbose)
+        self._rollout_start = 0.0
+        self._rollout_steps = 0
+
+    def _on_rollout_start(self) -> None:
+        self._rollout_start = time.perf_counter()
+        self._rollout_steps = self.num_timesteps
+
+    def _on_step(self) -> bool:
+        return True
+
+    def _on_rollout_end(self) -> None:
+        elapsed = time.perf_counter() - self._rollout_start
+        steps = self.num_timesteps - self._rollout_steps
+        steps_per_sec = steps / elapsed if elapsed > 0 else 0.0
+        self.logger.record("time/rollout_seconds", elapsed)
+        self.logger.record("time/env_steps_per_sec", steps_per_sec)
+        logging.info("Rollout: %d env steps in %.2fs (%.0f steps/sec)", steps, elapsed, steps_per_sec)
+
+
+class SnapshotCallback(BaseCallback):
+    """
+    Ajoute un instantané de la politique au pool d'adversaires du self-play
+    tous les `every` rollouts.
+    """
+
+    def __init__(self, pool, every: int = 5, verbose: int = 0):
+        super().__init__(verbose)
+        self.pool = pool
+        self.every = every
+        self._rollouts = 0
+
+    def _on_step(self) -> bool:
+        return True
+
+    def _on_rollout_end(self) -> None:
+        self._rollouts += 1
+        if self._rollouts % self.every == 0:
+            self.pool.add(self.model)
+            self.logger.record("self_play/pool_size", len(self.pool))
+            logging.info("Self-play: snapshot %d added to the pool (%d kept, %d KB)",
+                         self.pool.added, len(self.pool), self.pool.nbytes() // 1024)
@@ -0,0 +1,100 @@
+# export_policy.py
+
+import os
+import sys
+import json
+import argparse
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
+
+from gymnasium import spaces
+
+from app.models.agents.inference import DEFAULT_MODEL_PATH, load_model
+from app.models.agents.numpy_policy import DEFAULT_POLICY_PATH, POLICY_FORMAT_VERSION
+
+# Modules d'activation torch -> nom dans numpy_policy.ACTIVATIONS
+ACTIVATION_NAMES = {"Tanh": "tanh", "ReLU": "relu", "Identity": "identity"}
+
+
+def policy_arrays(model) -> dict:
+    """
+    Poids de l'acteur d'un modèle PPO (MultiInputPolicy) en tableaux NumPy,
+    au format lu par NumpyPolicy. Un modèle MaskablePPO est marqué "masked" :
+    NumpyPolicyAgent choisit alors parmi les actions légales.
+
+    Args:
+        model (PPO | MaskablePPO): modèle stable_baselines3 / sb3_contrib
+
+    Returns:
+        dict: tableaux à écrire avec np.savez
+    """
+    import torch
+
+    policy = model.policy
+    layout = []
+    for key, space in policy.observation_space.spaces.items():
+        if isinstance(space, spaces.Discrete):
+            layout.append((key, "discrete", int(space.n)))
+        elif isinstance(space, spaces.Box):
+            layout.append((key, "box", int(np.prod(space.shape))))
+        else:
+            raise ValueError(f"Unsupported observation space for {key}: {space}")
+
+    arrays = {}
+    activations = []
+    linear = None
+    for module in policy.mlp_extractor.policy_net:
+        if isinstance(module, torch.nn.Linear):
+            linear = module
+        elif type(module).__name__ in ACTIVATION_NAMES and linear is not None:
+            i = len(activations)
+            arrays[f"w{i}"] = linear.weight.detach().cpu().numpy().astype(np.float32)
+            arrays[f"b{i}"] = linear.bias.detach().cpu().numpy().astype(np.float32)
+            activations.append(ACTIVATION_NAMES[type(module).__name__])
+            linear = None
+        else:
+            raise ValueError(f"Unsupported policy layer: {module}")
+    if linear is not None:
+        raise ValueError("Policy network ends with a Linear layer without activation")
+
+    arrays["action_w"] = policy.action_net.weight.detach().cpu().numpy().astype(np.float32)
+    arrays["action_b"] = policy.action_net.bias.detach().cpu().numpy().astype(np.float32)
+    arrays["meta"] = np.array(json.dumps({
+        "version": POLICY_FORMAT_VERSION,
+        "layout": layout,
+        "activations": activations,
+        "masked": type(policy).__module__.startswith("sb3_contrib"),
+    }))
+    return arrays
+
+
+def export_policy(model_path: str = DEFAULT_MODEL_PATH, output_path: str = DEFAULT_POLICY_PATH) -> str:
+    """
+    Exporte la politique d'un modèle PPO sauvegardé vers un fichier .npz.
+
+    Args:
+        model_path (str): modèle sauvegardé par train_ppo.py (PPO ou MaskablePPO)
+        output_path (str): fichier .npz à écrire
+
+    Returns:
+        str: chemin du fichier écrit
+    """
+    model = load_model(model_path)
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    np.savez(output_path, **policy_arrays(model))
+    return output_path
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Exporte la politique PPO entraînée en NumPy (.npz), sans torch à l'inférence.")
+    parser.add_argument("-m", "--model", default=DEFAULT_MODEL_PATH, help="Modèle PPO sauvegardé (ppo_uno).")
+    parser.add_argument("-o", "--output", default=DEFAULT_POLICY_PATH, help="Fichier .npz à écrire.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    path = export_policy(args.model, args.output)
+    print(f"✅ Politique exportée dans {path}")
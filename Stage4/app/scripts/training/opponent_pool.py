@@ -0,0 +1,58 @@
+# opponent_pool.py
+
+import random
+from typing import List, Optional
+
+from app.models.agents.numpy_policy import NumpyPolicy
+from app.scripts.training.export_policy import policy_arrays
+
+
+class OpponentPool:
+    """
+    Instantanés figés de la politique en cours d'entraînement, adversaires
+    de l'entraînement en self-play (SelfPlayVecEnv).
+
+    Chaque instantané est l'acteur exporté en tableaux NumPy float32
+    (NumpyPolicy, quelques dizaines de Ko) : pas de copie du modèle torch
+    ni de l'optimiseur, et l'inférence des adversaires se fait sans torch.
+
+    Args:
+        max_size (int): nombre d'instantanés gardés (les plus anciens sont retirés)
+        latest_ratio (float): probabilité de tirer le plus récent, sinon tirage
+            uniforme parmi les précédents
+        seed (Optional[int]): seed du tirage des adversaires
+    """
+
+    def __init__(self, max_size: int = 20, latest_ratio: float = 0.5, seed: Optional[int] = None):
+        if max_size < 1:
+            raise ValueError("max_size must be >= 1")
+        self.max_size = max_size
+        self.latest_ratio = latest_ratio
+        self.rng = random.Random(seed)
+        self.snapshots: List[NumpyPolicy] = []
+        self.added = 0
+
+    def add(self, model) -> NumpyPolicy:
+        """Ajoute un instantané de la politique d'un modèle PPO / MaskablePPO."""
+        policy = NumpyPolicy(policy_arrays(model))
+        self.snapshots.append(policy)
+        self.added += 1
+        if len(self.snapshots) > self.max_size:
+            del self.snapshots[0]
+        return policy
+
+    def sample(self) -> NumpyPolicy:
+        """Tire la politique d'un adversaire."""
+        if not self.snapshots:
+            raise RuntimeError("Opponent pool is empty")
+        if len(self.snapshots) == 1 or self.rng.random() < self.latest_ratio:
+            return self.snapshots[-1]
+        return self.rng.choice(self.snapshots[:-1])
+
+    def nbytes(self) -> int:
+        """Mémoire occupée par les poids des instantanés."""
+        return sum(w.nbytes + b.nbytes for policy in self.snapshots for w, b, _ in policy.layers) + \
+            sum(policy.action_w.nbytes + policy.action_b.nbytes for policy in self.snapshots)
+
+    def __len__(self) -> int:
+        return len(self.snapshots)
@@ -9,37 +9,104 @@ import logging
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
 
 from stable_baselines3 import PPO
-from stable_baselines3.common.vec_env import DummyVecEnv
+from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv
 from app.models.envs.uno_env import UnoEnv
+from app.models.envs.shared_memory_vec_env import SharedMemoryVecEnv
+from app.models.envs.self_play_vec_env import SelfPlayVecEnv
+from app.scripts.training.callbacks import SnapshotCallback, ThroughputCallback
+from app.scripts.training.opponent_pool import OpponentPool
 
-logging.basicConfig(level=logging.INFO)
-log_dir = f"./Stage4/app/logs/ppo/run_{int(time.time())}"
+VEC_ENV_BACKENDS = {
+    "dummy": DummyVecEnv,
+    "subproc": SubprocVecEnv,
+    "shmem": SharedMemoryVecEnv,
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--timesteps", type=int, default=500_000, help="Nombre de pas d'entraînement PPO")
+    parser.add_argument("--n-envs", type=int, default=1, help="Nombre d'environnements en parallèle")
+    parser.add_argument("--vec-env", choices=VEC_ENV_BACKENDS.keys(), default="dummy",
+                        help="Backend de vectorisation : dummy (un seul process), subproc (un process par env), "
+                             "shmem (un process par env, observations en mémoire partagée)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed de base, l'env i utilise seed + i")
+    parser.add_argument("--masked", action="store_true",
+                        help="MaskablePPO (sb3_contrib) : la politique ne choisit que des actions légales "
+                             "(UnoEnv.action_masks)")
+    parser.add_argument("--self-play", action="store_true",
+                        help="Self-play : les adversaires jouent avec des instantanés figés de la politique "
+                             "(SelfPlayVecEnv, remplace --vec-env)")
+    parser.add_argument("--num-players", type=int, default=2, help="Joueurs par partie (2 à 10)")
+    parser.add_argument("--pool-size", type=int, default=20, help="Instantanés gardés dans le pool d'adversaires")
+    parser.add_argument("--snapshot-every", type=int, default=5, help="Rollouts entre deux instantanés du pool")
+    return parser.parse_args()
 
-# Argument CLI
-parser = argparse.ArgumentParser()
-parser.add_argument("--timesteps", type=int, default=500_000, help="Nombre de pas d'entraînement PPO")
-args = parser.parse_args()
 
 # Crée un environnement Gym compatible SB3
-def make_env():
-    return UnoEnv(opponent_agent_fn=None)
+def make_env(rank: int = 0, seed: int = 0, copy_obs: bool = True, num_players: int = 2):
+    def _init():
+        return UnoEnv(seed=seed + rank, opponent_agent_fn=None, copy_obs=copy_obs, num_players=num_players)
+    return _init
+
+
+def make_vec_env(backend: str = "dummy", n_envs: int = 1, seed: int = 0, num_players: int = 2):
+    # Les workers subproc/shmem sérialisent l'observation à chaque pas : le tampon de l'env peut
+    # être réutilisé (l'observation terminale, gardée avant l'autoreset, est toujours une copie).
+    # DummyVecEnv garde les observations dans les infos sans les copier.
+    copy_obs = backend == "dummy"
+    env_fns = [make_env(rank, seed, copy_obs, num_players) for rank in range(n_envs)]
+    return VEC_ENV_BACKENDS[backend](env_fns)
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO)
+    log_dir = f"./Stage4/app/logs/ppo/run_{int(time.time())}"
+
+    if args.self_play:
+        pool = OpponentPool(max_size=args.pool_size, seed=args.seed)
+        env = SelfPlayVecEnv(pool, args.n_envs, args.seed, num_players=args.num_players)
+        logging.info("Self-play vec env: %d games, pool of %d snapshots", args.n_envs, args.pool_size)
+    else:
+        env = make_vec_env(args.vec_env, args.n_envs, args.seed, args.num_players)
+        logging.info("Vec env: %s x %d (seeds %d..%d)", args.vec_env, args.n_envs, args.seed, args.seed + args.n_envs - 1)
+
+    # Crée le modèle PPO avec TensorBoard activé
+    if args.masked:
+        # Import ici : sb3_contrib n'est requis que pour l'entraînement masqué
+        from sb3_contrib import MaskablePPO
+        algorithm = MaskablePPO
+    else:
+        algorithm = PPO
+    model = algorithm(
+        "MultiInputPolicy",
+        env,
+        verbose=1,
+        seed=args.seed,
+        tensorboard_log=log_dir
+    )
+
+    callbacks = [ThroughputCallback()]
+    if args.self_play:
+        # Premier adversaire : la politique initiale
+        pool.add(model)
+        callbacks.append(SnapshotCallback(pool, args.snapshot_every))
 
-env = DummyVecEnv([make_env])
+    # Entraîne le modèle
+    start = time.perf_counter()
+    model.learn(total_timesteps=args.timesteps, callback=callbacks)
+    elapsed = time.perf_counter() - start
+    env.close()
+    logging.info("Training: %d timesteps in %.1fs (%.0f steps/sec)", model.num_timesteps, elapsed, model.num_timesteps / elapsed)
 
-# Crée le modèle PPO avec TensorBoard activé
-model = PPO(
-    "MultiInputPolicy",
-    env,
-    verbose=1,
-    tensorboard_log=log_dir
-)
+    # Sauvegarde le modèle
+    save_path = "Stage4/app/models/agents/ppo"
+    os.makedirs(save_path, exist_ok=True)
+    model.save(os.path.join(save_path, "ppo_uno"))
 
-# Entraîne le modèle
-model.learn(total_timesteps=args.timesteps)
+    print(f"✅ Modèle entraîné ({args.timesteps} étapes) et sauvegardé dans {save_path}")
 
-# Sauvegarde le modèle
-save_path = "Stage4/app/models/agents/ppo"
-os.makedirs(save_path, exist_ok=True)
-model.save(os.path.join(save_path, "ppo_uno"))
 
-print(f"✅ Modèle entraîné ({args.timesteps} étapes) et sauvegardé dans {save_path}")
+if __name__ == "__main__":
+    main()
@@ -59,3 +59,35 @@ export function isPlayableAPI(card, topCard, currentColor) {
         body: JSON.stringify({ card, top_card: topCard, current_color: currentColor })
     }).then(res => res.json());
 }
+
+// Fait jouer les IA côté serveur jusqu'au prochain tour humain (un seul aller-retour)
+export function autoPlayAPI(gameId, maxTurns = 1000) {
+    return fetch(`${API_BASE}/auto_play`, {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ game_id: gameId, max_turns: maxTurns, fields: "compact" })
+    }).then(res => res.json());
+}
+
+// Suit une partie en direct (Server-Sent Events) au lieu de sonder /game_state.
+// onUpdate reçoit (type, data) pour sync / update / game_over ; retourne l'EventSource (à fermer avec .close())
+export function subscribeGameEvents(gameId, onUpdate, since = null) {
+    const query = since === null ? "?fields=compact" : `?fields=compact&since=${since}`;
+    const source = new EventSource(`${API_BASE}/game_events/${gameId}${query}`);
+    let lastTurn = since;
+    for (const type of ["sync", "update", "game_over"]) {
+        source.addEventListener(type, e => {
+            const data = JSON.parse(e.data);
+            lastTurn = (data.delta || data.state || data).turn;
+            onUpdate(type, data);
+            if (type === "game_over") source.close();
+        });
+    }
+    source.addEventListener("closed", () => source.close());
+    // Client décroché : nouvel abonnement à partir du dernier tour vu
+    source.addEventListener("resync", () => {
+        source.close();
+        subscribeGameEvents(gameId, onUpdate, lastTurn);
+    });
+    return source;
+}
@@ -0,0 +1,318 @@
+"""
+asgi.py
+
+ASGI application serving the same /api routes as the Flask blueprint
+(routes.py), on the same handlers, game store and broadcaster.
+
+Requests are handled on the event loop, so a slow client (or a
+/game_events spectator) holds no worker thread. Requests on one game take
+that game's lock (AsyncGameLocks) and run one at a time; requests on
+different games interleave. Handlers that may block the loop run in the
+loop's thread pool while the game lock is held: auto_play, bot turns and
+game creation with PPO agents (policy loading and inference), and every
+handler when games are stored in SQLite. PPO turns of concurrent games
+then wait on the shared BatchInferenceServer from pool threads, so they
+share forward passes.
+
+The app has no dependency beyond the standard library. Serve it with any
+ASGI server, e.g. `uvicorn asgi:app` from Stage4 (see asgi.py there).
+"""
+
+import asyncio
+import json
+import logging
+import re
+from contextlib import nullcontext
+from functools import partial
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl
+
+from app.v1 import handlers
+from app.v1.broadcast import AsyncSubscription
+from app.v1.handlers import STREAM_KEEPALIVE, ApiError, broadcaster, format_sse
+from app.v1.locks import AsyncGameLocks
+from app.v1.store import MemoryGameStore, SQLiteGameStore
+
+logger = logging.getLogger(__name__)
+
+# Même en-têtes CORS que flask_cors avec sa configuration par défaut
+CORS_HEADERS = [(b"access-control-allow-origin", b"*")]
+PREFLIGHT_HEADERS = CORS_HEADERS + [
+    (b"access-control-allow-methods", b"GET, POST, DELETE, OPTIONS"),
+    (b"access-control-allow-headers", b"Content-Type, If-None-Match, Last-Event-ID"),
+]
+
+
+class Request:
+    """Method, path, query parameters, headers and body of an ASGI HTTP request."""
+
+    def __init__(self, scope: dict, receive: Callable[[], Awaitable[dict]]):
+        self.method = scope["method"]
+        self.path = scope["path"]
+        self.headers = {name.decode("latin-1"): value.decode("latin-1") for name, value in scope["headers"]}
+        # Comme request.args.get de Flask : la première valeur d'un paramètre répété
+        self.query: Dict[str, str] = {}
+        for key, value in parse_qsl(scope.get("query_string", b"").decode("latin-1")):
+            self.query.setdefault(key, value)
+        self.receive = receive
+
+    async def body(self) -> bytes:
+        chunks = []
+        more_body = True
+        while more_body:
+            message = await self.receive()
+            chunks.append(message.get("body", b""))
+            more_body = message.get("more_body", False)
+        return b"".join(chunks)
+
+    async def json(self) -> dict:
+        try:
+            data = json.loads(await self.body())
+        except ValueError:
+            raise ApiError("Request body must be a JSON object")
+        if not isinstance(data, dict):
+            raise ApiError("Request body must be a JSON object")
+        return data
+
+
+async def send_response(send, status: int, body: bytes = b"", headers: Optional[List[Tuple[bytes, bytes]]] = None,
+                        content_type: bytes = b"application/json") -> None:
+    headers = list(headers or []) + CORS_HEADERS
+    if body:
+        headers.append((b"content-type", content_type))
+    headers.append((b"content-length", str(len(body)).encode()))
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def send_api_response(send, success: bool, data=None, error=None, code: int = 200, headers=None) -> None:
+    body = json.dumps({"success": success, "data": {} if data is None else data, "error": error})
+    await send_response(send, code, body.encode(), headers)
+
+
+def parse_etags(header: Optional[str]) -> List[str]:
+    # If-None-Match: "a", W/"b"  ->  ["a", "b"]
+    if not header:
+        return []
+    return [tag.strip().removeprefix("W/").strip('"') for tag in header.split(",")]
+
+
+class ApiApp:
+    """
+    ASGI app of the /api routes.
+
+    Args:
+        offload (Optional[bool]): Run every handler in the thread pool.
+            Defaults to True when games are stored in SQLite (blocking I/O).
+    """
+
+    def __init__(self, offload: Optional[bool] = None):
+        if offload is None:
+            offload = isinstance(handlers.games, SQLiteGameStore)
+        self.offload = offload
+        self.locks = AsyncGameLocks()
+        self.routes = [
+            ("POST", r"/api/start_game", self.start_game),
+            ("GET", r"/api/game_state/(?P<game_id>[^/]+)", self.game_state),
+            ("POST", r"/api/play_turn", self.body_handler(handlers.play_turn, slow=self.uses_policy)),
+            ("POST", r"/api/auto_play", self.body_handler(handlers.auto_play, slow=True)),
+            ("POST", r"/api/is_playable", self.is_playable),
+            ("DELETE", r"/api/delete_game/(?P<game_id>[^/]+)", self.path_handler(handlers.delete_game)),
+            ("POST", r"/api/draw_cards", self.body_handler(handlers.draw_cards)),
+            ("POST", r"/api/choose_color", self.body_handler(handlers.choose_color)),
+            ("GET", r"/api/get_scores/(?P<game_id>[^/]+)", self.path_handler(handlers.get_scores)),
+            ("GET", r"/api/store_stats", self.stats_handler(handlers.store_stats)),
+            ("GET", r"/api/game_events/(?P<game_id>[^/]+)", self.game_events),
+            ("GET", r"/api/stream_stats", self.stats_handler(handlers.stream_stats)),
+        ]
+        self.routes = [(method, re.compile(pattern), endpoint) for method, pattern, endpoint in self.routes]
+
+    async def __call__(self, scope: dict, receive, send) -> None:
+        if scope["type"] == "lifespan":
+            await self.lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        request = Request(scope, receive)
+        if request.method == "OPTIONS":
+            await send_response(send, 200, headers=PREFLIGHT_HEADERS)
+            return
+
+        path_matched = False
+        for method, pattern, endpoint in self.routes:
+            match = pattern.fullmatch(request.path)
+            if match is None:
+                continue
+            path_matched = True
+            if method == request.method:
+                try:
+                    await endpoint(request, send, **match.groupdict())
+                except ApiError as e:
+                    await send_api_response(send, False, error=e.message, code=e.code)
+                except Exception:
+                    logger.exception("Error in %s %s", request.method, request.path)
+                    await send_api_response(send, False, error="Internal server error", code=500)
+                return
+        if path_matched:
+            await send_api_response(send, False, error="Method not allowed", code=405)
+        else:
+            await send_api_response(send, False, error="Not found", code=404)
+
+    async def lifespan(self, receive, send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def run(self, game_id: Optional[str], handler: Callable, *args, slow: bool = False):
+        """
+        Run a handler, holding the game's lock if game_id is given, in the
+        thread pool if it may block the loop.
+        """
+        lock = self.locks.hold(game_id) if isinstance(game_id, str) else nullcontext()
+        async with lock:
+            if self.offload or slow:
+                return await asyncio.get_running_loop().run_in_executor(None, partial(handler, *args))
+            return handler(*args)
+
+    def uses_policy(self, data: dict) -> bool:
+        """
+        True if the play_turn request may block the loop: the game has PPO
+        bots (policy inference), or the store does I/O. Runs on the loop, so
+        it only peeks at an in-memory game (no LRU or counter update, and
+        agent_type never changes, so the game lock is not needed).
+        """
+        if self.offload or not isinstance(handlers.games, MemoryGameStore):
+            return True
+        game_id = data.get("game_id")
+        game = handlers.games.peek(game_id) if isinstance(game_id, str) else None
+        return game is not None and game.agent_type == "ppo"
+
+    def body_handler(self, handler: Callable, slow=False):
+        # POST avec game_id dans le corps JSON ; slow : booléen ou fonction du corps
+        async def endpoint(request, send):
+            data = await request.json()
+            is_slow = slow(data) if callable(slow) else slow
+            result = await self.run(data.get("game_id"), handler, data, slow=is_slow)
+            await send_api_response(send, True, data=result)
+        return endpoint
+
+    def path_handler(self, handler: Callable):
+        async def endpoint(request, send, game_id):
+            await send_api_response(send, True, data=await self.run(game_id, handler, game_id))
+        return endpoint
+
+    def stats_handler(self, handler: Callable):
+        async def endpoint(request, send):
+            await send_api_response(send, True, data=await self.run(None, handler))
+        return endpoint
+
+    async def start_game(self, request, send):
+        data = await request.json()
+        # agent_type "ppo" : chargement de la politique (torch) hors de la boucle
+        slow = data.get("agent_type") == "ppo"
+        await send_api_response(send, True, data=await self.run(None, handlers.start_game, data, slow=slow))
+
+    async def is_playable(self, request, send):
+        data = await request.json()
+        await send_api_response(send, True, data=handlers.check_is_playable(data))
+
+    async def game_state(self, request, send, game_id):
+        etags = parse_etags(request.headers.get("if-none-match"))
+        not_modified = lambda etag: etag in etags or "*" in etags
+        data, etag = await self.run(game_id, handlers.game_state, game_id, request.query, not_modified)
+        headers = [(b"etag", f'"{etag}"'.encode())]
+        if data is None:
+            await send_response(send, 304, headers=headers)
+        else:
+            await send_api_response(send, True, data=data, headers=headers)
+
+    async def game_events(self, request, send, game_id):
+        subscription = AsyncSubscription(game_id, broadcaster.queue_size)
+        _, sync, finished = await self.run(game_id, handlers.open_game_events, game_id, request.query,
+                                           request.headers.get("last-event-id"), subscription)
+        try:
+            await send({"type": "http.response.start", "status": 200, "headers": CORS_HEADERS + [
+                (b"content-type", b"text/event-stream; charset=utf-8"),
+                (b"cache-control", b"no-cache"),
+                (b"x-accel-buffering", b"no"),
+            ]})
+
+            async def chunk(text):
+                await send({"type": "http.response.body", "body": text.encode(), "more_body": True})
+
+            async def stream():
+                await chunk(format_sse(sync))
+                if finished:
+                    return
+                while True:
+                    message = await subscription.get(timeout=STREAM_KEEPALIVE)
+                    if subscription.lagged:
+                        # Client trop lent : il se reconnecte avec 'since' pour rattraper
+                        await chunk(format_sse({"event": "resync", "data": {"reason": "lagged"}}))
+                        return
+                    if message is None:
+                        await chunk(": keepalive\n\n")
+                        continue
+                    await chunk(format_sse(message))
+                    if message["event"] in ("game_over", "closed"):
+                        return
+
+            async def disconnected():
+                while (await request.receive())["type"] != "http.disconnect":
+                    pass
+
+            streaming = asyncio.ensure_future(stream())
+            watching = asyncio.ensure_future(disconnected())
+            done, pending = await asyncio.wait({streaming, watching}, return_when=asyncio.FIRST_COMPLETED)
+            for task in pending:
+                task.cancel()
+            if streaming in done:
+                streaming.result()
+                await send({"type": "http.response.body", "body": b""})
+        finally:
+            broadcaster.unsubscribe(subscription)
+
+
+async def call_asgi(app, method: str, path: str, json_body=None, headers: Optional[Dict[str, str]] = None,
+                    query: str = "") -> Tuple[int, Dict[str, str], bytes]:
+    """
+    In-process ASGI client for tests and benchmarks: send one request to
+    `app` and collect the whole response (not for streams).
+
+    Returns:
+        Tuple[int, Dict[str, str], bytes]: Status, headers and body.
+    """
+    body = b"" if json_body is None else json.dumps(json_body).encode()
+    header_list = [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in (headers or {}).items()]
+    if json_body is not None:
+        header_list.append((b"content-type", b"application/json"))
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": query.encode(), "headers": header_list,
+        "client": ("127.0.0.1", 0), "server": ("127.0.0.1", 80),
+    }
+    sent = False
+    response = {"status": 0, "headers": {}, "body": []}
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = {k.decode("latin-1"): v.decode("latin-1") for k, v in message["headers"]}
+        elif message["type"] == "http.response.body":
+            response["body"].append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return response["status"], response["headers"], b"".join(response["body"])
@@ -0,0 +1,192 @@
+"""
+broadcast.py
+
+In-process publish/subscribe of game updates for the push channel
+(Server-Sent Events, see /api/game_events in routes.py).
+
+Each game has its own subscriber list. publish() never blocks: every
+subscriber has a bounded queue, and a subscriber whose queue is full is
+dropped and flagged as lagged. Its stream then sends a "resync" event and
+closes, so the client reconnects with `since` and catches up from a delta.
+One slow spectator therefore costs neither memory nor time to the others.
+
+Subscribers only receive updates published by the same process: with
+several workers (SQLite store), spectators must connect to the worker that
+serves the moves, or poll.
+"""
+
+import asyncio
+import queue
+import threading
+from typing import Dict, List, Optional
+
+DEFAULT_QUEUE_SIZE = 256
+
+
+class Subscription:
+    """
+    One subscriber of a game: a bounded queue of messages.
+
+    Args:
+        game_id (str): Game followed by this subscriber.
+        maxsize (int): Messages buffered before the subscriber is dropped.
+    """
+
+    def __init__(self, game_id: str, maxsize: int = DEFAULT_QUEUE_SIZE):
+        self.game_id = game_id
+        self.lagged = False
+        self._queue: "queue.Queue[dict]" = queue.Queue(maxsize)
+
+    def push(self, message: dict) -> bool:
+        """Queue a message without blocking. Returns False if the queue is full."""
+        try:
+            self._queue.put_nowait(message)
+            return True
+        except queue.Full:
+            self.lagged = True
+            return False
+
+    def get(self, timeout: Optional[float] = None) -> Optional[dict]:
+        """Next message, or None if none arrived within `timeout` seconds."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class AsyncSubscription:
+    """
+    Subscriber read from an asyncio event loop (ASGI streams). push() may
+    be called from any thread; messages are handed to the loop.
+
+    Args:
+        game_id (str): Game followed by this subscriber.
+        maxsize (int): Messages buffered before the subscriber is dropped.
+        loop (Optional[asyncio.AbstractEventLoop]): Loop of the reader, the
+            running loop if None.
+    """
+
+    def __init__(self, game_id: str, maxsize: int = DEFAULT_QUEUE_SIZE,
+                 loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.game_id = game_id
+        self.lagged = False
+        self.maxsize = maxsize
+        self._loop = loop or asyncio.get_running_loop()
+        self._queue: "asyncio.Queue[dict]" = asyncio.Queue()
+        # Messages poussés mais pas encore lus (asyncio.Queue n'est pas thread-safe)
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def push(self, message: dict) -> bool:
+        """Queue a message without blocking. Returns False if the queue is full."""
+        with self._lock:
+            if self._pending >= self.maxsize:
+                self.lagged = True
+                return False
+            self._pending += 1
+        try:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, message)
+        except RuntimeError:
+            # Boucle fermée : le lecteur est parti
+            self.lagged = True
+            return False
+        return True
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[dict]:
+        """Next message, or None if none arrived within `timeout` seconds."""
+        try:
+            message = await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        with self._lock:
+            self._pending -= 1
+        return message
+
+
+class GameBroadcaster:
+    """
+    Per-game subscriber lists with non-blocking fan-out.
+
+    Args:
+        queue_size (int): Queue size of each subscriber.
+        max_subscribers (int): Maximum subscribers per game.
+    """
+
+    def __init__(self, queue_size: int = DEFAULT_QUEUE_SIZE, max_subscribers: int = 10000):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self._subscribers: Dict[str, List[Subscription]] = {}
+        self._lock = threading.Lock()
+        self._published = 0
+        self._dropped = 0
+
+    def subscribe(self, game_id: str, subscription: Optional[Subscription] = None) -> Optional[Subscription]:
+        """
+        Register a subscriber for a game.
+
+        Args:
+            game_id (str): Game to follow.
+            subscription (Optional[Subscription]): Subscriber to register
+                (any object with push()); a new Subscription if None.
+
+        Returns:
+            Optional[Subscription]: The subscription, or None if the game
+            already has max_subscribers subscribers.
+        """
+        if subscription is None:
+            subscription = Subscription(game_id, self.queue_size)
+        with self._lock:
+            subscribers = self._subscribers.setdefault(game_id, [])
+            if len(subscribers) >= self.max_subscribers:
+                return None
+            subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.game_id)
+            if subscribers and subscription in subscribers:
+                subscribers.remove(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.game_id]
+
+    def publish(self, game_id: str, message: dict) -> int:
+        """
+        Send a message to every subscriber of a game, dropping the ones
+        whose queue is full.
+
+        Returns:
+            int: Number of subscribers that received the message.
+        """
+        with self._lock:
+            subscribers = self._subscribers.get(game_id)
+            if not subscribers:
+                return 0
+            subscribers = list(subscribers)
+        lagging = [sub for sub in subscribers if not sub.push(message)]
+        if lagging:
+            with self._lock:
+                current = self._subscribers.get(game_id, [])
+                for sub in lagging:
+                    if sub in current:
+                        current.remove(sub)
+                if not current:
+                    self._subscribers.pop(game_id, None)
+                self._dropped += len(lagging)
+        with self._lock:
+            self._published += 1
+        return len(subscribers) - len(lagging)
+
+    def subscriber_count(self, game_id: str) -> int:
+        with self._lock:
+            return len(self._subscribers.get(game_id, ()))
+
+    def metrics(self) -> Dict[str, int]:
+        """Games with subscribers, total subscribers, messages published and lagging subscribers dropped."""
+        with self._lock:
+            return {
+                "games": len(self._subscribers),
+                "subscribers": sum(len(subs) for subs in self._subscribers.values()),
+                "published": self._published,
+                "dropped": self._dropped,
+            }
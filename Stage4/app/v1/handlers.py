@@ -0,0 +1,386 @@
+"""
+handlers.py
+
+Endpoint logic of the /api routes, independent of the web framework.
+
+Each handler takes the request fields (JSON body, query parameters or path
+arguments) and returns the `data` of a successful response, or raises
+ApiError with the error message and HTTP status. The Flask blueprint
+(routes.py) and the ASGI app (asgi.py) only parse requests and format
+responses around these functions, so both serve the same API on the same
+game store.
+"""
+
+import functools
+import hashlib
+import json
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional, Tuple
+
+from app.models.uno.constants import COLORS
+from app.models.uno.encodings import COLOR2IDX, card_to_str, str_to_card
+from app.models.uno.game import Game
+from app.models.uno.rules import is_playable
+from app.v1.broadcast import GameBroadcaster
+from app.v1.locks import GameLocks
+from app.v1.serializers import (serialize_compact_state, serialize_delta, serialize_events, serialize_state,
+                                serialize_update)
+from app.v1.store import GameConflict, create_store
+
+# Parties en cours (voir store.py) : mémoire ou SQLite selon UNO_GAME_STORE,
+# LRU borné + expiration après inactivité (UNO_MAX_GAMES, UNO_GAME_TTL)
+games = create_store()
+
+# Un verrou par partie : les requêtes sur une même partie passent l'une après
+# l'autre, celles sur des parties différentes en parallèle (serveur WSGI multi-thread)
+game_locks = GameLocks()
+
+# Abonnés du flux /game_events, par partie (voir broadcast.py)
+broadcaster = GameBroadcaster()
+
+STATE_FIELDS = ("full", "compact")
+
+# Commentaire SSE envoyé quand rien ne se passe, pour garder la connexion ouverte
+STREAM_KEEPALIVE = 15.0
+MAX_AUTO_PLAY_TURNS = 10000
+# Tentatives d'une requête d'écriture quand d'autres workers modifient la même partie (SQLite)
+MAX_CONFLICT_RETRIES = 5
+
+
+class ApiError(Exception):
+    """
+    Error returned to the client as {"success": false, "error": message}.
+
+    Args:
+        message (str): Error message.
+        code (int): HTTP status.
+    """
+
+    def __init__(self, message: str, code: int = 400):
+        super().__init__(message)
+        self.message = message
+        self.code = code
+
+
+def parse_state_options(params):
+    """
+    Lit les options de réponse 'since' (tour connu du client) et 'fields'
+    (full | compact). Retourne (since, fields, erreur).
+    """
+    since = params.get("since")
+    fields = params.get("fields") or "full"
+    if since is not None:
+        try:
+            since = int(since)
+        except (TypeError, ValueError):
+            return None, None, "since must be an integer"
+        if since < 0:
+            return None, None, "since must be >= 0"
+    if fields not in STATE_FIELDS:
+        return None, None, f"fields must be one of {', '.join(STATE_FIELDS)}"
+    return since, fields, None
+
+def state_options(params):
+    since, fields, error = parse_state_options(params)
+    if error:
+        raise ApiError(error)
+    return since, fields
+
+def state_payload(game, since=None, fields="full"):
+    """
+    Delta depuis le tour 'since' si le journal le couvre, sinon l'état
+    (complet ou compact sans l'historique de la défausse).
+    """
+    if since is not None:
+        delta = serialize_delta(game, since)
+        if delta is not None:
+            return {"delta": delta}
+    state = game.get_state()
+    if fields == "compact":
+        return {"state": serialize_compact_state(state)}
+    return {"state": serialize_state(state)}
+
+def state_etag(game, since, fields):
+    # Dérivé du contenu de la partie : identique d'un worker à l'autre
+    key = game.snapshot() + f"|{since}|{fields}".encode()
+    return hashlib.blake2b(key, digest_size=12).hexdigest()
+
+def event_count(game):
+    return len(game.events) if game.events is not None else 0
+
+def publish_update(game_id, game, first_event):
+    """
+    Pousse aux abonnés de la partie les événements ajoutés depuis
+    first_event. Ne sérialise rien si personne n'écoute.
+    """
+    if not game.events or len(game.events) <= first_event:
+        return
+    if not broadcaster.subscriber_count(game_id):
+        return
+    kind = "game_over" if game.winner is not None else "update"
+    data = serialize_update(game, game.events[first_event:])
+    if game.winner is not None:
+        data["scores"] = game.calculate_scores()
+    broadcaster.publish(game_id, {"event": kind, "id": game.turn, "data": data})
+
+def format_sse(message):
+    # Sans 'id', le navigateur garde le dernier id reçu pour se reconnecter
+    payload = json.dumps(message["data"], separators=(",", ":"))
+    text = f"event: {message['event']}\ndata: {payload}\n\n"
+    if message.get("id") is not None:
+        text = f"id: {message['id']}\n" + text
+    return text
+
+def require_game(game):
+    if not game:
+        raise ApiError("Invalid game_id", 404)
+    return game
+
+@contextmanager
+def locked_game(game_id, write=False) -> Iterator[Game]:
+    """
+    Partie 'game_id' sous son verrou, pour toute la durée du bloc. Avec
+    write=True, elle est relue et réécrite dans le store (checkout), puis
+    les nouveaux événements sont poussés aux abonnés une fois la partie
+    enregistrée. La réécriture peut lever GameConflict (voir retry_conflicts).
+    """
+    if not isinstance(game_id, str):
+        raise ApiError("Invalid game_id", 404)
+    with game_locks.hold(game_id):
+        if write:
+            with games.checkout(game_id) as game:
+                first_event = event_count(require_game(game))
+                yield game
+            publish_update(game_id, game, first_event)
+        else:
+            yield require_game(games.get(game_id))
+
+def retry_conflicts(handler):
+    """
+    Rejoue une requête d'écriture si un autre worker a enregistré la partie
+    entre sa lecture et sa réécriture (concurrence optimiste du store SQLite).
+    """
+    @functools.wraps(handler)
+    def wrapper(*args, **kwargs):
+        for _ in range(MAX_CONFLICT_RETRIES):
+            try:
+                return handler(*args, **kwargs)
+            except GameConflict:
+                continue
+        raise ApiError("Game modified concurrently, please retry", 409)
+    return wrapper
+
+
+def start_game(data):
+    num_players = data.get("num_players", 2)
+    seed = data.get("seed")
+    agent_type = data.get("agent_type", "rulesbased") # <--- Valeur par défaut
+
+    if not isinstance(num_players, int) or num_players < 2 or num_players > 10:
+        raise ApiError("num_players must be an integer between 2 and 10")
+
+    if agent_type not in ["rulesbased", "random", "ppo"]:
+        raise ApiError(f"Unknown agent_type: {agent_type}")
+
+    try:
+        game = Game(num_players=num_players, seed=seed, agent_type=agent_type, record_events=True)
+    except FileNotFoundError:
+        # agent_type "ppo" sans modèle entraîné (UNO_PPO_MODEL)
+        raise ApiError("PPO model not available on this server", 503)
+    game.start()
+    game_id = str(uuid.uuid4())
+    games.put(game_id, game)
+
+    return {
+        "game_id": game_id,
+        "agent_type": agent_type,
+        "message": f"Game started vs {agent_type} agent",
+        "discard_pile": card_to_str(game.discard_pile[-1]),
+        "hands": [len(hand) for hand in game.hands],
+        "state": serialize_state(game.get_state())
+    }
+
+def game_state(game_id, params, not_modified: Callable[[str], bool]) -> Tuple[Optional[dict], str]:
+    """
+    État (ou delta) de la partie et son ETag. Retourne (None, etag) si
+    not_modified(etag) : le client a déjà cette version.
+    """
+    since, fields = state_options(params)
+    with locked_game(game_id) as game:
+        etag = state_etag(game, since, fields)
+        if not_modified(etag):
+            return None, etag
+        return state_payload(game, since, fields), etag
+
+@retry_conflicts
+def play_turn(data):
+    game_id = data.get("game_id")
+    human_input = data.get("human_input")
+    since, fields = state_options(data)
+
+    with locked_game(game_id, write=True) as game:
+        if human_input is not None:
+            try:
+                human_input = int(human_input)
+            except Exception:
+                raise ApiError("human_input must be an integer or null")
+
+            hand = game.hands[game.current_player]
+            if human_input < 0 or human_input >= len(hand):
+                raise ApiError("human_input out of bounds")
+
+        try:
+            winner = game.play_turn(human_input=human_input)
+        except ValueError as e:
+            raise ApiError(str(e))
+
+        response = state_payload(game, since, fields)
+        response["winner"] = winner
+        response["scores"] = game.calculate_scores() if winner is not None else None
+        return response
+
+@retry_conflicts
+def auto_play(data):
+    game_id = data.get("game_id")
+    max_turns = data.get("max_turns", 1000)
+    since, fields = state_options(data)
+    if not isinstance(max_turns, int) or max_turns < 1 or max_turns > MAX_AUTO_PLAY_TURNS:
+        raise ApiError(f"max_turns must be an integer between 1 and {MAX_AUTO_PLAY_TURNS}")
+
+    with locked_game(game_id, write=True) as game:
+        # Joue les tours des IA jusqu'à ce qu'une décision humaine soit nécessaire
+        first_event = event_count(game)
+        turns_played = game.auto_play(max_turns)
+        events = game.events[first_event:] if game.events is not None else []
+
+        if game.winner is not None:
+            reason = "game_over"
+        elif game.awaiting_color:
+            reason = "awaiting_color"
+        elif turns_played >= max_turns:
+            reason = "max_turns"
+        else:
+            reason = "human_turn"
+
+        response = state_payload(game, since, fields)
+        response["events"] = serialize_events(events)
+        response["turns_played"] = turns_played
+        response["stopped"] = reason
+        response["winner"] = game.winner
+        response["scores"] = game.calculate_scores() if game.winner is not None else None
+        return response
+
+def check_is_playable(data):
+    card = data.get("card")
+    top_card = data.get("top_card")
+    current_color = data.get("current_color")
+
+    # Vérifie présence et type des champs requis
+    if not isinstance(card, str) or not card.strip():
+        raise ApiError("Field 'card' must be a non-empty string")
+    if not isinstance(top_card, str) or not top_card.strip():
+        raise ApiError("Field 'top_card' must be a non-empty string")
+    if not isinstance(current_color, str) or not current_color.strip():
+        raise ApiError("Field 'current_color' must be a non-empty string")
+
+    if current_color not in COLORS:
+        raise ApiError(f"Invalid current_color: {current_color}")
+
+    try:
+        card_id = str_to_card(card)
+    except KeyError:
+        raise ApiError(f"Invalid card: {card}")
+    try:
+        top_card_id = str_to_card(top_card)
+    except KeyError:
+        raise ApiError(f"Invalid top_card: {top_card}")
+
+    playable = is_playable(card_id, top_card_id, COLOR2IDX[current_color])
+    return {"playable": playable}
+
+def delete_game(game_id):
+    if not isinstance(game_id, str):
+        raise ApiError("Invalid game_id", 404)
+    with game_locks.hold(game_id):
+        if not games.delete(game_id):
+            raise ApiError("Invalid game_id", 404)
+    broadcaster.publish(game_id, {"event": "closed", "data": {"game_id": game_id}})
+    return {"message": f"Game {game_id} deleted."}
+
+@retry_conflicts
+def draw_cards(data):
+    game_id = data.get("game_id")
+    player_idx = data.get("player_idx")
+    count = data.get("count", 1)
+    since, fields = state_options(data)
+
+    with locked_game(game_id, write=True) as game:
+        if not isinstance(player_idx, int) or player_idx < 0 or player_idx >= game.num_players:
+            raise ApiError("Invalid player index")
+        try:
+            count = int(count)
+        except Exception:
+            raise ApiError("count must be an integer")
+        if count < 1:
+            raise ApiError("count must be >= 1")
+
+        if game.get_winner() is not None:
+            raise ApiError("Game is already over")
+
+        drawn = game.draw_cards(player_idx, count)
+        data = state_payload(game, since, fields)
+        if drawn < count:
+            data["warning"] = "No more cards left to draw."
+        return data
+
+@retry_conflicts
+def choose_color(data):
+    game_id = data.get("game_id")
+    color = data.get("color")
+
+    with locked_game(game_id, write=True) as game:
+        if not isinstance(color, str) or not color.strip():
+            raise ApiError("Field 'color' must be a non-empty string")
+
+        if color not in COLORS:
+            raise ApiError(f"Invalid color: {color}")
+
+        if game.get_winner() is not None:
+            raise ApiError("Game is already over")
+
+        game.set_current_color(color)
+        return {"current_color": color}
+
+def get_scores(game_id):
+    with locked_game(game_id) as game:
+        return {"scores": game.calculate_scores()}
+
+def store_stats():
+    return games.metrics()
+
+def stream_stats():
+    return broadcaster.metrics()
+
+def open_game_events(game_id, params, last_event_id=None, subscription=None):
+    """
+    Abonne un client au flux d'une partie. Retourne (abonnement, message
+    'sync' initial, partie terminée). L'appelant doit désabonner à la fin.
+    """
+    # Reprise après déconnexion : le navigateur renvoie le dernier id reçu
+    params = dict(params)
+    if "since" not in params and last_event_id:
+        params["since"] = last_event_id
+    since, fields = state_options(params)
+
+    # Abonnement avant la lecture de l'état : aucun événement ne peut être manqué
+    subscription = broadcaster.subscribe(game_id, subscription)
+    if subscription is None:
+        raise ApiError("Too many subscribers for this game", 503)
+    try:
+        with locked_game(game_id) as game:
+            sync = {"event": "sync", "id": game.turn, "data": state_payload(game, since, fields)}
+            return subscription, sync, game.winner is not None
+    except ApiError:
+        broadcaster.unsubscribe(subscription)
+        raise
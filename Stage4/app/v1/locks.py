@@ -0,0 +1,74 @@
+"""
+locks.py
+
+Per-game locks: requests on the same game run one at a time, requests on
+different games run in parallel. A game's lock only exists while requests
+hold or wait for it, so the registry does not grow with the number of
+games served.
+"""
+
+import asyncio
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Dict, Iterator, List
+
+
+class GameLocks:
+    """
+    Per-game thread locks, for handlers running in the threads of a WSGI
+    server (or the thread pool of the ASGI app). There is no global lock
+    held while a request runs: the registry lock only guards the lookup.
+    """
+
+    def __init__(self):
+        # game_id -> [verrou, nombre de requêtes qui le tiennent ou l'attendent]
+        self._locks: Dict[str, List] = {}
+        self._registry = threading.Lock()
+
+    @contextmanager
+    def hold(self, game_id: str) -> Iterator[None]:
+        """Hold the lock of a game for the duration of the block."""
+        with self._registry:
+            entry = self._locks.get(game_id)
+            if entry is None:
+                entry = self._locks[game_id] = [threading.Lock(), 0]
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._registry:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._locks[game_id]
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+
+class AsyncGameLocks:
+    """
+    Per-game asyncio locks, for handlers running on one event loop.
+    """
+
+    def __init__(self):
+        # game_id -> [verrou, nombre de requêtes qui le tiennent ou l'attendent]
+        self._locks: Dict[str, List] = {}
+
+    @asynccontextmanager
+    async def hold(self, game_id: str) -> AsyncIterator[None]:
+        """Hold the lock of a game for the duration of the block."""
+        entry = self._locks.get(game_id)
+        if entry is None:
+            entry = self._locks[game_id] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._locks[game_id]
+
+    def __len__(self) -> int:
+        return len(self._locks)
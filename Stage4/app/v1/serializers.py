@@ -0,0 +1,115 @@
+"""
+serializers.py
+
+Conversion of engine state to the JSON form served by the API.
+
+The engine works on int card ids and color indices; the API keeps returning
+card names ("Red 5") and color names so clients are unaffected.
+"""
+
+from typing import List, Optional
+
+from app.models.uno.encodings import card_to_str, cards_to_str, color_to_str
+from app.models.uno.game import EVENT_COLOR, EVENT_DRAW, EVENT_PLAY
+
+
+def serialize_state(state: dict) -> dict:
+    """
+    Convert a Game.get_state() dict to its JSON form.
+
+    Args:
+        state (dict): State as returned by Game.get_state().
+
+    Returns:
+        dict: Same fields with card and color names instead of ids.
+    """
+    data = dict(state)
+    data["discard_pile"] = cards_to_str(state["discard_pile"])
+    data["hands"] = [cards_to_str(hand) for hand in state["hands"]]
+    data["current_color"] = color_to_str(state["current_color"])
+    return data
+
+
+def serialize_compact_state(state) -> dict:
+    """
+    Compact JSON form of a state: the discard pile history is replaced by
+    its top card, so the payload does not grow with the game length.
+
+    Args:
+        state (GameState): State as returned by Game.get_state().
+
+    Returns:
+        dict: serialize_state fields with top_card instead of discard_pile.
+    """
+    data = {key: state[key] for key in state if key not in ("discard_pile", "hands")}
+    data["top_card"] = card_to_str(state["discard_pile"][-1])
+    data["hands"] = [cards_to_str(hand) for hand in state["hands"]]
+    data["current_color"] = color_to_str(state["current_color"])
+    return data
+
+
+def serialize_event(event: tuple) -> dict:
+    """
+    Convert a Game event tuple (turn, player, type, value) to its JSON form.
+    """
+    turn, player, kind, value = event
+    data = {"turn": turn, "player": player, "type": kind}
+    if kind == EVENT_PLAY:
+        data["card"] = card_to_str(value)
+    elif kind == EVENT_DRAW:
+        data["cards"] = cards_to_str(value)
+    elif kind == EVENT_COLOR:
+        data["color"] = color_to_str(value)
+    return data
+
+
+def serialize_delta(game, since: int) -> Optional[dict]:
+    """
+    Changes since turn `since`: the events (cards played, cards drawn, color
+    choices) of that turn and later, plus the small fields a client needs to
+    stay in sync (next player, color, top card, hand sizes, winner).
+
+    Args:
+        game (Game): The game, created with record_events=True.
+        since (int): Turn number the client last saw.
+
+    Returns:
+        Optional[dict]: The delta, or None if the event log does not cover
+        `since` (the caller should send the full state instead).
+    """
+    events = game.events_since(since)
+    if events is None:
+        return None
+    delta = {"since": since}
+    delta.update(serialize_update(game, events))
+    return delta
+
+
+def serialize_update(game, events: List[tuple]) -> dict:
+    """
+    Events of a game plus the fields a client needs to stay in sync. Used
+    for deltas and for the messages pushed to /api/game_events subscribers.
+
+    Args:
+        game (Game): The game, after the events.
+        events (List[tuple]): Game event tuples to send.
+
+    Returns:
+        dict: turn, events, current_player, current_color, direction,
+        top_card, cards_left, deck_size and winner.
+    """
+    return {
+        "turn": game.turn,
+        "events": serialize_events(events),
+        "current_player": game.current_player,
+        "current_color": color_to_str(game.current_color),
+        "direction": game.direction,
+        "top_card": card_to_str(game.discard_pile[-1]),
+        "cards_left": list(game.hand_sizes),
+        "deck_size": len(game.deck),
+        "winner": game.winner,
+    }
+
+
+def serialize_events(events: List[tuple]) -> List[dict]:
+    return [serialize_event(event) for event in events]
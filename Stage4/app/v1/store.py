@@ -0,0 +1,461 @@
+"""
+store.py
+
+Storage for the games served by the API.
+
+Two backends share the GameStore interface:
+
+- MemoryGameStore keeps live Game objects in an LRU-ordered dict. It is
+  bounded: when it is full the least recently used game is evicted, and a
+  game left idle longer than the TTL is dropped on the next access or
+  insertion. Every operation is O(1) (amortized for the TTL sweep) and runs
+  under a lock, so the store can be shared by the threads of a WSGI server.
+- SQLiteGameStore keeps games in an SQLite file in a compact binary form
+  (dump_game / load_game), with the recent turns of their event log in an
+  append-only table (so `since=` deltas keep working across workers), so
+  several worker processes can serve the same game ids and games survive a
+  restart.
+
+Routes use checkout() for requests that modify a game: the game is read and
+written back once per request. SQLite uses optimistic concurrency: the read
+takes no lock, and the write only succeeds if the row still has the version
+that was read; otherwise checkout raises GameConflict and the caller retries
+the request on the reloaded game (handlers.retry_conflicts).
+
+create_store() picks the backend from the environment:
+UNO_GAME_STORE=memory|sqlite, UNO_GAME_DB (SQLite file), UNO_MAX_GAMES,
+UNO_GAME_TTL and UNO_EVENT_LOG_TURNS (SQLite event log).
+"""
+
+import abc
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from app.models.uno.game import EVENT_DRAW, Game
+
+DEFAULT_MAX_GAMES = int(os.environ.get("UNO_MAX_GAMES", "10000"))
+DEFAULT_GAME_TTL = float(os.environ.get("UNO_GAME_TTL", "3600"))
+# Tours du journal d'événements gardés par partie en SQLite (deltas 'since=')
+DEFAULT_EVENT_LOG_TURNS = int(os.environ.get("UNO_EVENT_LOG_TURNS", "200"))
+
+
+def dump_game(game: Game) -> bytes:
+    """
+    Serialize a game for storage: Game.snapshot() with the RNG state, so a
+    reloaded game keeps drawing the same cards (card ids as uint8, no pickle).
+
+    Args:
+        game (Game): The game to serialize.
+
+    Returns:
+        bytes: The encoded game.
+    """
+    return game.snapshot(include_rng=True)
+
+
+def load_game(data: bytes) -> Game:
+    """
+    Rebuild a game serialized by dump_game. Agents are recreated from the
+    stored agent type.
+
+    Args:
+        data (bytes): The encoded game.
+
+    Returns:
+        Game: A new game in the same state.
+    """
+    return Game.from_snapshot(data)
+
+
+class GameConflict(Exception):
+    """The game was modified by another worker between checkout's read and write."""
+
+
+class GameStore(abc.ABC):
+    """Interface of the game storage backends."""
+
+    @abc.abstractmethod
+    def get(self, game_id: str) -> Optional[Game]:
+        """Return the game, or None if unknown or evicted."""
+
+    @abc.abstractmethod
+    def put(self, game_id: str, game: Game) -> None:
+        """Insert or replace a game."""
+
+    @abc.abstractmethod
+    def delete(self, game_id: str) -> bool:
+        """Remove a game. Returns False if it was not stored."""
+
+    @abc.abstractmethod
+    def metrics(self) -> Dict[str, int]:
+        """Store counters (live games, evictions, hits/misses)."""
+
+    @contextmanager
+    def checkout(self, game_id: str) -> Iterator[Optional[Game]]:
+        """
+        Load a game for a request that modifies it and save it back when the
+        block exits (one read and one write per request). Yields None if the
+        game does not exist.
+
+        Raises:
+            GameConflict: On exit, if another worker saved the game meanwhile
+                (the changes of the block are not saved).
+        """
+        game = self.get(game_id)
+        yield game
+        if game is not None:
+            self.put(game_id, game)
+
+    def __contains__(self, game_id: str) -> bool:
+        return self.get(game_id) is not None
+
+
+class MemoryGameStore(GameStore):
+    """
+    Bounded in-memory game store with LRU and idle-TTL eviction.
+
+    Args:
+        max_games (int): Maximum number of live games; inserting beyond it
+            evicts the least recently used game.
+        ttl (Optional[float]): Idle time in seconds after which a game is
+            evicted. None or 0 disables the TTL.
+        clock (Callable[[], float]): Time source (monotonic seconds).
+    """
+
+    def __init__(self, max_games: int = DEFAULT_MAX_GAMES, ttl: Optional[float] = DEFAULT_GAME_TTL,
+                 clock: Callable[[], float] = time.monotonic):
+        if max_games < 1:
+            raise ValueError("max_games must be >= 1")
+        self.max_games = max_games
+        self.ttl = ttl or None
+        self._clock = clock
+        # game_id -> (game, last access time), du moins au plus récemment utilisé
+        self._games: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evicted_lru = 0
+        self._evicted_ttl = 0
+
+    def get(self, game_id: str) -> Optional[Game]:
+        """Return the game and mark it as recently used, or None if unknown or expired."""
+        with self._lock:
+            entry = self._games.get(game_id)
+            if entry is None:
+                self._misses += 1
+                return None
+            now = self._clock()
+            if self.ttl is not None and now - entry[1] > self.ttl:
+                del self._games[game_id]
+                self._evicted_ttl += 1
+                self._misses += 1
+                return None
+            self._games[game_id] = (entry[0], now)
+            self._games.move_to_end(game_id)
+            self._hits += 1
+            return entry[0]
+
+    def peek(self, game_id: str) -> Optional[Game]:
+        """Return the game without marking it as used nor counting a hit or miss, or None if unknown."""
+        with self._lock:
+            entry = self._games.get(game_id)
+        return entry[0] if entry is not None else None
+
+    def put(self, game_id: str, game: Game) -> None:
+        """Insert or replace a game, evicting expired then least recently used games if needed."""
+        with self._lock:
+            now = self._clock()
+            self._games[game_id] = (game, now)
+            self._games.move_to_end(game_id)
+            self._expire(now)
+            while len(self._games) > self.max_games:
+                self._games.popitem(last=False)
+                self._evicted_lru += 1
+
+    def delete(self, game_id: str) -> bool:
+        """Remove a game. Returns False if it was not stored."""
+        with self._lock:
+            return self._games.pop(game_id, None) is not None
+
+    @contextmanager
+    def checkout(self, game_id: str) -> Iterator[Optional[Game]]:
+        # Les objets Game vivent dans le store : rien à réécrire
+        yield self.get(game_id)
+
+    def _expire(self, now: float) -> None:
+        # Les entrées sont triées par dernier accès : on ne regarde que la tête
+        if self.ttl is None:
+            return
+        games = self._games
+        while games:
+            game_id, (_, last_access) = next(iter(games.items()))
+            if now - last_access <= self.ttl:
+                break
+            del games[game_id]
+            self._evicted_ttl += 1
+
+    def metrics(self) -> Dict[str, int]:
+        """Live games, evictions (LRU / TTL) and lookup hits/misses since startup."""
+        with self._lock:
+            return {
+                "live": len(self._games),
+                "max_games": self.max_games,
+                "evicted_lru": self._evicted_lru,
+                "evicted_ttl": self._evicted_ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+    def __len__(self) -> int:
+        return len(self._games)
+
+
+class SQLiteGameStore(GameStore):
+    """
+    Game store backed by an SQLite file, shareable between worker processes.
+
+    Games are stored with dump_game. Their event log (Game.events, left out
+    by dump_game) goes to an append-only table, one compact row per event:
+    a request only appends its new events, and rows older than
+    event_log_turns turns are trimmed, so `since=` deltas are served for the
+    recent turns and older `since=` get the full state.
+
+    Eviction follows MemoryGameStore (LRU beyond max_games, idle TTL) using
+    a wall-clock last-access column, since the clock must agree across
+    processes; expired games are deleted by the next write. Hit/miss and
+    eviction counters are per process.
+
+    Reads take no write lock: get() only refreshes last_access when it is
+    more than touch_interval seconds old. checkout() holds no lock while the
+    request runs: each row has a version, bumped on every write, and the
+    write back is a compare-and-swap on the version that was read
+    (GameConflict if another worker wrote first).
+
+    Args:
+        path (str): SQLite database file (":memory:" for a private database,
+            shared by the threads of this store).
+        max_games (int): Maximum number of stored games.
+        ttl (Optional[float]): Idle time in seconds after which a game is
+            evicted. None or 0 disables the TTL.
+        clock (Callable[[], float]): Time source (wall-clock seconds).
+        event_log_turns (int): Turns of event log kept per game.
+        touch_interval (float): Seconds between two last_access updates of
+            a game by get().
+    """
+
+    def __init__(self, path: str = "uno_games.db", max_games: int = DEFAULT_MAX_GAMES,
+                 ttl: Optional[float] = DEFAULT_GAME_TTL, clock: Callable[[], float] = time.time,
+                 event_log_turns: int = DEFAULT_EVENT_LOG_TURNS, touch_interval: float = 1.0):
+        if max_games < 1:
+            raise ValueError("max_games must be >= 1")
+        self.path = path
+        self.max_games = max_games
+        self.ttl = ttl or None
+        self.event_log_turns = event_log_turns
+        self.touch_interval = touch_interval
+        self._clock = clock
+        self._local = threading.local()
+        # ":memory:" : une base par connexion, donc une seule connexion partagée sous verrou
+        self._shared_db = None
+        self._shared_lock = threading.RLock()
+        if path == ":memory:":
+            self._shared_db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._counter_lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evicted_lru = 0
+        self._evicted_ttl = 0
+        with self._transaction() as db:
+            db.execute("CREATE TABLE IF NOT EXISTS games ("
+                       "id TEXT PRIMARY KEY, data BLOB NOT NULL, last_access REAL NOT NULL, "
+                       "version INTEGER NOT NULL DEFAULT 0, events_start INTEGER, "
+                       "event_count INTEGER NOT NULL DEFAULT 0)")
+            db.execute("CREATE INDEX IF NOT EXISTS games_last_access ON games (last_access)")
+            # Journal des parties : seq est le rang de l'événement dans le journal de la partie
+            db.execute("CREATE TABLE IF NOT EXISTS events ("
+                       "game_id TEXT NOT NULL, seq INTEGER NOT NULL, turn INTEGER NOT NULL, player INTEGER, "
+                       "kind TEXT NOT NULL, value BLOB NOT NULL, PRIMARY KEY (game_id, seq)) WITHOUT ROWID")
+            # Bases créées avant les versions et le journal
+            columns = {row[1] for row in db.execute("PRAGMA table_info(games)")}
+            for column, kind in (("version", "INTEGER NOT NULL DEFAULT 0"), ("events_start", "INTEGER"),
+                                 ("event_count", "INTEGER NOT NULL DEFAULT 0")):
+                if column not in columns:
+                    db.execute(f"ALTER TABLE games ADD COLUMN {column} {kind}")
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._shared_db is not None:
+            return self._shared_db
+        # Une connexion par thread (sqlite3 ne partage pas une connexion entre threads)
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    @contextmanager
+    def _reading(self) -> Iterator[sqlite3.Connection]:
+        # Lectures en autocommit : un SELECT seul est cohérent et ne bloque pas les écritures (WAL)
+        if self._shared_db is None:
+            yield self._connection()
+            return
+        with self._shared_lock:
+            yield self._shared_db
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        # Écritures courtes en BEGIN IMMEDIATE : jamais pendant le traitement d'une requête
+        with self._reading() as db:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                yield db
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            db.execute("COMMIT")
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._counter_lock:
+            setattr(self, name, getattr(self, name) + n)
+
+    def _load(self, game_id: str, now: float) -> Tuple[Optional[Game], int, float]:
+        # Retourne la partie, sa version et son dernier accès ; une partie expirée est
+        # une absence (elle est supprimée par la prochaine écriture, voir _evict)
+        with self._reading() as db:
+            row = db.execute("SELECT data, version, last_access, events_start, event_count FROM games WHERE id = ?",
+                             (game_id,)).fetchone()
+            if row is None or (self.ttl is not None and now - row[2] > self.ttl):
+                self._count("_misses")
+                return None, 0, 0.0
+            game = load_game(row[0])
+            if game.events is not None and row[3] is not None:
+                first_turn = max(row[3], game.turn - self.event_log_turns)
+                rows = db.execute("SELECT turn, player, kind, value FROM events "
+                                  "WHERE game_id = ? AND seq < ? AND turn >= ? ORDER BY seq",
+                                  (game_id, row[4], first_turn))
+                game.events = [(turn, player, kind, _decode_event_value(kind, value))
+                               for turn, player, kind, value in rows]
+                game.events_start_turn = first_turn
+        self._count("_hits")
+        return game, row[1], row[2]
+
+    def _append_events(self, db: sqlite3.Connection, game_id: str, game: Game, first_seq: int,
+                       events: list) -> None:
+        db.executemany("INSERT INTO events (game_id, seq, turn, player, kind, value) VALUES (?, ?, ?, ?, ?, ?)",
+                       [(game_id, first_seq + k, turn, player, kind, _encode_event_value(value))
+                        for k, (turn, player, kind, value) in enumerate(events)])
+        db.execute("DELETE FROM events WHERE game_id = ? AND turn < ?", (game_id, game.turn - self.event_log_turns))
+
+    def _save(self, db: sqlite3.Connection, game_id: str, game: Game, now: float) -> None:
+        events = game.events or []
+        events_start = game.events_start_turn if game.events is not None else None
+        db.execute("INSERT INTO games (id, data, last_access, events_start, event_count) VALUES (?, ?, ?, ?, ?) "
+                   "ON CONFLICT (id) DO UPDATE SET data = excluded.data, last_access = excluded.last_access, "
+                   "events_start = excluded.events_start, event_count = excluded.event_count, "
+                   "version = version + 1",
+                   (game_id, dump_game(game), now, events_start, len(events)))
+        db.execute("DELETE FROM events WHERE game_id = ?", (game_id,))
+        self._append_events(db, game_id, game, 0, events)
+        self._evict(db, now)
+
+    def _evict(self, db: sqlite3.Connection, now: float) -> None:
+        if self.ttl is not None:
+            expired = db.execute("DELETE FROM games WHERE last_access < ? RETURNING id",
+                                 (now - self.ttl,)).fetchall()
+            self._drop_events(db, expired, "_evicted_ttl")
+        excess = db.execute("SELECT COUNT(*) FROM games").fetchone()[0] - self.max_games
+        if excess > 0:
+            evicted = db.execute("DELETE FROM games WHERE id IN "
+                                 "(SELECT id FROM games ORDER BY last_access LIMIT ?) RETURNING id",
+                                 (excess,)).fetchall()
+            self._drop_events(db, evicted, "_evicted_lru")
+
+    def _drop_events(self, db: sqlite3.Connection, rows: list, counter: str) -> None:
+        if rows:
+            db.executemany("DELETE FROM events WHERE game_id = ?", rows)
+            self._count(counter, len(rows))
+
+    def get(self, game_id: str) -> Optional[Game]:
+        now = self._clock()
+        game, _, last_access = self._load(game_id, now)
+        if game is not None and now - last_access > self.touch_interval:
+            # Mise à jour du dernier accès au plus une fois par touch_interval : la plupart des
+            # lectures n'écrivent rien
+            with self._reading() as db:
+                db.execute("UPDATE games SET last_access = ? WHERE id = ? AND last_access < ?",
+                           (now, game_id, now))
+        return game
+
+    def put(self, game_id: str, game: Game) -> None:
+        with self._transaction() as db:
+            self._save(db, game_id, game, self._clock())
+
+    def delete(self, game_id: str) -> bool:
+        with self._transaction() as db:
+            db.execute("DELETE FROM events WHERE game_id = ?", (game_id,))
+            return db.execute("DELETE FROM games WHERE id = ?", (game_id,)).rowcount > 0
+
+    @contextmanager
+    def checkout(self, game_id: str) -> Iterator[Optional[Game]]:
+        # Concurrence optimiste : aucun verrou pendant la requête, la réécriture
+        # échoue si un autre worker a écrit la partie depuis la lecture
+        game, version, _ = self._load(game_id, self._clock())
+        logged = len(game.events) if game is not None and game.events is not None else 0
+        yield game
+        if game is None:
+            return
+        with self._transaction() as db:
+            now = self._clock()
+            new_events = game.events[logged:] if game.events is not None else []
+            row = db.execute("UPDATE games SET data = ?, last_access = ?, version = version + 1, "
+                             "event_count = event_count + ? WHERE id = ? AND version = ? RETURNING event_count",
+                             (dump_game(game), now, len(new_events), game_id, version)).fetchone()
+            if row is None:
+                raise GameConflict(game_id)
+            # Seuls les nouveaux événements sont écrits, en un lot
+            self._append_events(db, game_id, game, row[0] - len(new_events), new_events)
+            self._evict(db, now)
+
+    def metrics(self) -> Dict[str, int]:
+        live = len(self)
+        with self._counter_lock:
+            return {
+                "live": live,
+                "max_games": self.max_games,
+                "evicted_lru": self._evicted_lru,
+                "evicted_ttl": self._evicted_ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+    def __len__(self) -> int:
+        with self._reading() as db:
+            return db.execute("SELECT COUNT(*) FROM games").fetchone()[0]
+
+
+def _encode_event_value(value) -> bytes:
+    # Carte jouée ou couleur : un octet ; pioche : les ids des cartes piochées
+    return bytes(value) if isinstance(value, tuple) else bytes((value,))
+
+
+def _decode_event_value(kind: str, value: bytes):
+    return tuple(value) if kind == EVENT_DRAW else value[0]
+
+
+def create_store() -> GameStore:
+    """
+    Build the game store configured by UNO_GAME_STORE ("memory", the
+    default, or "sqlite") and UNO_GAME_DB (SQLite file, default uno_games.db).
+    """
+    backend = os.environ.get("UNO_GAME_STORE", "memory")
+    if backend == "memory":
+        return MemoryGameStore()
+    if backend == "sqlite":
+        return SQLiteGameStore(os.environ.get("UNO_GAME_DB", "uno_games.db"))
+    raise ValueError(f"Unknown UNO_GAME_STORE: {backend}")
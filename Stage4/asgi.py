@@ -0,0 +1,8 @@
+from app import create_asgi_app
+
+# uvicorn asgi:app (un seul worker avec le store mémoire, plusieurs avec UNO_GAME_STORE=sqlite)
+app = create_asgi_app()
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="127.0.0.1", port=5000)
@@ -11,6 +11,8 @@ from typing import List, Optional
 
 from app.models.uno.game import Game
 from app.models.uno.display import print_board, print_hand  # <-- ici
+from app.models.uno.encodings import card_to_str, cards_to_str
+from app.models.uno.rules import get_playable_cards
 from app.models.agents.human_agent import ask_playable_choice, ask_draw
 
 NUM_PLAYERS = 3
@@ -38,7 +40,7 @@ def main(seed: Optional[int] = None) -> None:
         print(f"\n=== Round {game_number} ===")
         game = Game(num_players=NUM_PLAYERS, seed=seed)
         game.start()
-        print(f"First card: {game.discard_pile[-1]}")
+        print(f"First card: {card_to_str(game.discard_pile[-1])}")
 
         while True:
             print_board(game.turn, game.current_player, game.discard_pile[-1], len(game.deck))
@@ -48,15 +50,9 @@ def main(seed: Optional[int] = None) -> None:
             player_playing = game.current_player
 
             if game.current_player == HUMAN_PLAYER_IDX:
-                playable = [
-                    card for card in game.hands[game.current_player]
-                    if game.discard_pile and
-                       (
-                           card.split()[0] == game.discard_pile[-1].split()[0] or
-                           (len(card.split()) > 1 and len(game.discard_pile[-1].split()) > 1 and card.split()[1] == game.discard_pile[-1].split()[1]) or
-                           card.startswith("Wild")
-                       )
-                ]
+                playable = cards_to_str(get_playable_cards(
+                    game.hands[game.current_player], game.discard_pile[-1], game.current_color
+                ))
                 if playable:
                     print("Playable cards:", playable)
                     while True:
@@ -90,7 +86,7 @@ def main(seed: Optional[int] = None) -> None:
         print("\nRemaining cards for other players:")
         for i in range(NUM_PLAYERS):
             if i != winner:
-                print(f"Player {i}: {game.hands[i]}")
+                print(f"Player {i}: {cards_to_str(game.hands[i])}")
 
         if winner != -1:
             print(f"\nPlayer {winner} earns {round_scores[winner]} points.")